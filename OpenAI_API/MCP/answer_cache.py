@@ -0,0 +1,134 @@
+# ---------------------------------------------------------
+# responses_db_api용 로컬 답변 캐시 (SQLite)
+# ---------------------------------------------------------
+# 같은 질문이 반복되면 모델 호출 + MCP Tool 왕복 없이 저장된 답변을 돌려줍니다.
+# - 키: 정규화한 질문 + Chinook.db 상태 지문(fingerprint)
+#   지문 = (쓰기 세대, PRAGMA schema_version, DB 파일과 -wal 파일의 수정 시각/크기)
+#   - 쓰기 세대: mcp_db_server가 쓰기를 커밋할 때 같은 트랜잭션에서 올리는
+#     PRAGMA user_version 값 (db_pool.bump_write_generation)
+#   - 파일 정보: sqlite3 CLI, 노트북, 다른 스크립트 등 서버 밖에서 커밋한 변경도
+#     잡기 위함. 커밋은 -wal 파일(또는 체크포인트 후 DB 파일)을 바꿈
+#     서버를 켜고 끄기만 해도 빈 -wal 파일이 생기고 지워지므로
+#     비어 있는 -wal 파일은 없는 것과 같게 취급 -> 재시작만으로는 지문이 바뀌지 않음
+#   -> 데이터가 바뀌면 지문이 달라져 이전 답변은 더 이상 적중하지 않음
+# - 만료: ttl 초가 지난 답변은 사용하지 않음
+# - 크기 제한: max_entries를 넘으면 가장 오래 사용하지 않은 답변부터 삭제 (LRU)
+# - 통계: 적중/미스 수, 절약한 시간(원래 응답 시간 - 캐시 조회 시간)
+#
+# 질문은 대화 맥락과 무관한 독립 질문으로 취급합니다.
+# ---------------------------------------------------------
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from typing import Optional
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key         TEXT PRIMARY KEY,
+    question    TEXT NOT NULL,
+    answer      TEXT NOT NULL,
+    response_id TEXT,
+    seconds     REAL NOT NULL,      -- 원래 응답에 걸린 시간
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers(last_used);
+"""
+
+
+def normalize_question(question: str) -> str:
+    """대소문자, 공백, 끝의 문장부호 차이를 없앰"""
+    text = re.sub(r"\s+", " ", question).strip().lower()
+    return text.rstrip("?!.。？！ ")
+
+
+def _file_state(path: str) -> str:
+    """수정 시각과 크기 (없거나 빈 파일은 "-")"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "-"
+    return f"{st.st_mtime_ns}:{st.st_size}" if st.st_size else "-"
+
+
+def db_fingerprint(conn: sqlite3.Connection, db_path: str) -> str:
+    """쓰기 세대(user_version), 스키마 버전, DB/-wal 파일 상태로 만든 DB 상태 지문"""
+    generation = conn.execute("PRAGMA user_version").fetchone()[0]
+    schema = conn.execute("PRAGMA schema_version").fetchone()[0]
+    return f"{generation}:{schema}|{_file_state(db_path)}|{_file_state(db_path + '-wal')}"
+
+
+class AnswerCache:
+    """정규화된 질문 + DB 지문 -> 답변"""
+
+    def __init__(self, path: str, db_path: str, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        # 지문을 읽는 용도로만 쓰는 Chinook.db 커넥션
+        # (mode=ro는 서버가 꺼져 -shm 파일이 없는 WAL DB를 열지 못하므로 query_only 사용)
+        self.db_conn = sqlite3.connect(db_path)
+        self.db_conn.execute("PRAGMA query_only = ON")
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def _key(self, question: str) -> str:
+        raw = normalize_question(question) + "\0" + db_fingerprint(self.db_conn, self.db_path)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, question: str) -> Optional[dict]:
+        """적중하면 {"answer", "response_id", "seconds", "lookup_seconds"}, 아니면 None"""
+        started = time.perf_counter()
+        key = self._key(question)
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT answer, response_id, seconds, created_at FROM answers WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or now - row[3] > self.ttl:
+            if row is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+        with self.conn:
+            self.conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+        lookup = time.perf_counter() - started
+        self.hits += 1
+        self.saved_seconds += max(row[2] - lookup, 0.0)
+        return {"answer": row[0], "response_id": row[1], "seconds": row[2], "lookup_seconds": lookup}
+
+    def put(self, question: str, answer: str, response_id: Optional[str], seconds: float):
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(question), question, answer, response_id, seconds, now, now),
+            )
+            self.conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl,))
+            # LRU: 가장 오래 사용하지 않은 항목부터 정리
+            self.conn.execute(
+                """DELETE FROM answers WHERE key IN (
+                       SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)""",
+                (self.max_entries,),
+            )
+
+    def stats_line(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (f"캐시 적중 {self.hits}/{total} ({rate:.0%}), "
+                f"절약한 시간 {self.saved_seconds:.1f}초")
+
+    def close(self):
+        self.db_conn.close()
+        self.conn.close()
@@ -0,0 +1,82 @@
+# ---------------------------------------------------------
+# 결과 인코딩별 크기 측정 (바이트 / 토큰)
+# ---------------------------------------------------------
+# 대표적인 Chinook 조회 결과를 table/json/csv/structured로 인코딩했을 때
+# 응답 크기를 비교합니다. tiktoken이 설치되어 있으면 토큰 수도 셉니다.
+#
+# 실행 예:
+#   python bench_db_format.py
+#   python bench_db_format.py --max-cell-chars 40
+# ---------------------------------------------------------
+
+import argparse
+import os
+import sqlite3
+
+from db_format import FORMATS, render
+from db_paging import Page
+
+try:
+    import tiktoken
+except ImportError:     # 토큰 수 없이 바이트만 측정
+    tiktoken = None
+
+# (이름, 쿼리) - 에이전트가 실제로 보내는 형태의 조회
+QUERIES = [
+    ("top_artists", """SELECT ar.Name AS Artist, SUM(il.UnitPrice * il.Quantity) AS Sales
+        FROM InvoiceLine il JOIN Track t ON t.TrackId = il.TrackId
+        JOIN Album al ON al.AlbumId = t.AlbumId JOIN Artist ar ON ar.ArtistId = al.ArtistId
+        GROUP BY ar.ArtistId ORDER BY Sales DESC LIMIT 20"""),
+    ("invoices_by_country", """SELECT BillingCountry, COUNT(*) AS Invoices, SUM(Total) AS Total
+        FROM Invoice GROUP BY BillingCountry ORDER BY Total DESC"""),
+    ("customers", "SELECT * FROM Customer"),
+    ("tracks_200", "SELECT TrackId, Name, Composer, Milliseconds, UnitPrice FROM Track LIMIT 200"),
+    ("invoice_lines_1000", "SELECT * FROM InvoiceLine LIMIT 1000"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB MCP 결과 인코딩 크기 비교")
+    parser.add_argument("--max-cell-chars", type=int, default=0, help="긴 텍스트 셀 자르기 (0: 자르지 않음)")
+    parser.add_argument("--encoding", default="o200k_base", help="tiktoken 인코딩 이름")
+    args = parser.parse_args()
+
+    enc = tiktoken.get_encoding(args.encoding) if tiktoken else None
+    if enc is None:
+        print("(tiktoken이 없어 토큰 수는 생략합니다: pip install tiktoken)")
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    conn = sqlite3.connect(os.path.join(base_dir, "Chinook.db"))
+
+    totals = {fmt: [0, 0] for fmt in FORMATS}
+    print(f"{'query':<20} {'rows':>5} | " + " | ".join(f"{fmt:>18}" for fmt in FORMATS))
+    print("-" * (29 + 21 * len(FORMATS)))
+    for name, query in QUERIES:
+        cursor = conn.execute(query)
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        page = Page(columns, rows, 0, len(rows), None)
+
+        cells = []
+        for fmt in FORMATS:
+            text = render(page, fmt, args.max_cell_chars)
+            size = len(text.encode("utf-8"))
+            tokens = len(enc.encode(text)) if enc else 0
+            totals[fmt][0] += size
+            totals[fmt][1] += tokens
+            cells.append(f"{size:>8}B {tokens:>6}t" if enc else f"{size:>17}B")
+        print(f"{name:<20} {len(rows):>5} | " + " | ".join(cells))
+
+    print("-" * (29 + 21 * len(FORMATS)))
+    base_bytes, base_tokens = totals["table"]
+    for fmt in FORMATS:
+        size, tokens = totals[fmt]
+        line = f"{fmt:<10} 합계 {size:>8}B ({size / base_bytes:6.1%} of table)"
+        if enc:
+            line += f", {tokens:>7} tokens ({tokens / base_tokens:6.1%} of table)"
+        print(line)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
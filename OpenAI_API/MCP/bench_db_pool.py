@@ -0,0 +1,104 @@
+# ---------------------------------------------------------
+# 커넥션 풀 벤치마크: 단일 커넥션 vs ConnectionPool
+# ---------------------------------------------------------
+# 동시 클라이언트 수를 늘려가며 초당 처리 쿼리 수를 비교합니다.
+# - single: 기존 mcp_db_server 방식 (전역 커넥션 1개, 이벤트 루프에서 바로 실행)
+# - pool  : db_pool.ConnectionPool (워커별 읽기 커넥션, 스레드 풀에서 실행)
+#
+# 실행 예:
+#   python bench_db_pool.py --clients 1 2 4 8 16 --requests 200
+# 원본 Chinook.db를 건드리지 않도록 임시 복사본에서 실행합니다.
+# ---------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from db_pool import ConnectionPool
+
+# 에이전트가 자주 보내는 형태의 조회 쿼리 모음
+QUERIES = [
+    """SELECT ar.Name, SUM(il.UnitPrice * il.Quantity) AS Sales
+       FROM InvoiceLine il
+       JOIN Track t ON t.TrackId = il.TrackId
+       JOIN Album al ON al.AlbumId = t.AlbumId
+       JOIN Artist ar ON ar.ArtistId = al.ArtistId
+       GROUP BY ar.ArtistId ORDER BY Sales DESC LIMIT 10""",
+    """SELECT g.Name, COUNT(*) AS Tracks
+       FROM Track t JOIN Genre g ON g.GenreId = t.GenreId
+       GROUP BY g.GenreId ORDER BY Tracks DESC""",
+    """SELECT c.Country, SUM(i.Total) AS Total
+       FROM Invoice i JOIN Customer c ON c.CustomerId = i.CustomerId
+       GROUP BY c.Country ORDER BY Total DESC""",
+    """SELECT p.Name, COUNT(pt.TrackId)
+       FROM Playlist p JOIN PlaylistTrack pt ON pt.PlaylistId = p.PlaylistId
+       JOIN Track t ON t.TrackId = pt.TrackId
+       GROUP BY p.PlaylistId""",
+]
+
+
+def _fetch(conn, query):
+    return conn.execute(query).fetchall()
+
+
+async def bench_single(db_path, clients, requests):
+    """기존 방식: 동기 Tool이 이벤트 루프 위에서 전역 커넥션으로 실행"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+
+    async def client(idx):
+        for i in range(requests):
+            _fetch(conn, QUERIES[(idx + i) % len(QUERIES)])
+            await asyncio.sleep(0)  # 다른 요청에 차례를 넘김
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+async def bench_pool(pool, clients, requests):
+    """풀 방식: 각 요청이 읽기 워커 스레드에서 실행"""
+
+    async def client(idx):
+        for i in range(requests):
+            await pool.run_read(_fetch, QUERIES[(idx + i) % len(QUERIES)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chinook 커넥션 풀 처리량 벤치마크")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=100, help="클라이언트당 쿼리 수")
+    parser.add_argument("--readers", type=int, default=None, help="읽기 워커 수 (기본: CPU 수 + 4)")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "Chinook.db")
+        shutil.copy(os.path.join(base_dir, "Chinook.db"), db_path)
+
+        pool = ConnectionPool(db_path, max_readers=args.readers)
+        try:
+            print(f"읽기 워커: {pool.max_readers}개, 클라이언트당 쿼리: {args.requests}개")
+            print(f"{'clients':>8} | {'single q/s':>11} | {'pool q/s':>11} | {'speedup':>7}")
+            print("-" * 47)
+            for clients in args.clients:
+                total = clients * args.requests
+                single = total / await bench_single(db_path, clients, args.requests)
+                pooled = total / await bench_pool(pool, clients, args.requests)
+                print(f"{clients:>8} | {single:>11.1f} | {pooled:>11.1f} | {pooled / single:>6.2f}x")
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+# ---------------------------------------------------------
+# 대화 히스토리 관리 벤치마크 (모델 호출 없음)
+# ---------------------------------------------------------
+# 미리 정해 둔 100턴짜리 여행 상담 대화를 흉내 내면서
+# 턴마다 모델에 보내는 입력 토큰 수를 비교합니다.
+# - 전체 messages를 그대로 보내는 방식 (tool_mcp.py의 기존 방식)
+# - ConversationHistory (history_manager.py)
+#
+# 실행 예:
+#   python bench_history.py
+#   python bench_history.py --turns 200 --max-tokens 2000 --keep-turns 4
+# ---------------------------------------------------------
+
+import argparse
+import random
+import time
+
+from history_manager import ConversationHistory, TokenCounter, tiktoken
+
+CITIES = ["교토", "오사카", "나라", "고베", "히로시마"]
+TOPICS = ["숙소", "맛집", "교통편", "박물관", "야경 명소", "쇼핑", "온천", "날씨"]
+
+
+def scripted_turn(i: int, rng: random.Random):
+    city = rng.choice(CITIES)
+    topic = rng.choice(TOPICS)
+    user = f"{i}번째 질문: {city}에서 {topic} 관련해서 추천해 줄 수 있나요? 예산은 하루 {rng.randint(5, 30)}만원 정도예요."
+    answer = (f"{city}의 {topic} 추천입니다. " +
+              " ".join(f"{k + 1}) {city} {topic} 후보 {k + 1}: 위치, 가격대, 이동 시간, 예약 팁과 출처 URL "
+                       f"https://example.com/{city}/{topic}/{k} 를 참고하세요."
+                       for k in range(rng.randint(3, 8))))
+    return user, answer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대화 히스토리 입력 토큰 비교")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--max-tokens", type=int, default=3000)
+    parser.add_argument("--keep-turns", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if tiktoken is None:
+        print("(tiktoken이 없어 토큰 수를 글자 수로 추정합니다: pip install tiktoken)")
+    count = TokenCounter()
+    rng = random.Random(args.seed)
+
+    naive, naive_tokens = [], 0
+    history = ConversationHistory(max_tokens=args.max_tokens, keep_turns=args.keep_turns)
+    history.pin("목적지", "일본 간사이 지역")
+    history.pin("일정", "2025-04-03 ~ 2025-04-09 (6박 7일)")
+
+    naive_series, managed_series, manage_seconds = [], [], 0.0
+    print(f"{'turn':>5} {'전체 전송':>10} {'관리됨':>8} {'요약된 턴':>9}")
+    for i in range(1, args.turns + 1):
+        user, answer = scripted_turn(i, rng)
+
+        naive.append({"role": "user", "content": user})
+        naive_tokens += count(user) + 4
+        history.add("user", user)
+
+        started = time.perf_counter()
+        messages = history.messages()
+        manage_seconds += time.perf_counter() - started
+        managed_tokens = sum(count(m["content"]) + 4 for m in messages)
+
+        naive_series.append(naive_tokens)
+        managed_series.append(managed_tokens)
+        if i % 10 == 0 or i == 1:
+            print(f"{i:>5} {naive_tokens:>10} {managed_tokens:>8} {history.folded_turns:>9}")
+
+        naive.append({"role": "assistant", "content": answer})
+        naive_tokens += count(answer) + 4
+        history.add("assistant", answer)
+
+    tail = max(1, args.turns // 10)
+    print("-" * 36)
+    print(f"누적 입력 토큰: 전체 전송 {sum(naive_series):,} / 관리됨 {sum(managed_series):,} "
+          f"({sum(managed_series) / sum(naive_series):.1%})")
+    print(f"마지막 {tail}턴 평균 입력: 전체 전송 {sum(naive_series[-tail:]) / tail:,.0f} / "
+          f"관리됨 {sum(managed_series[-tail:]) / tail:,.0f} 토큰 (최대 {max(managed_series):,})")
+    print(f"히스토리 정리 시간: 턴당 {manage_seconds / args.turns * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# ---------------------------------------------------------
+# 재고 저장소 벤치마크
+# ---------------------------------------------------------
+# - 시작 시간: N개 아이템 스냅샷 + 쓰기 로그 재생
+# - 쓰기 비용: 아이템마다 한 번씩 저장(add_item 방식) vs 한 번에 저장(upsert_items 방식)
+# - 먼저 비정상 종료 복구 확인: 로그 끝에 잘린 줄이 남은 뒤 재시작 -> 쓰기 -> 재시작해도 데이터가 남는지
+#
+# 실행 예:
+#   python bench_inventory.py --items 1000000 --batch 1000
+# 임시 폴더에서 실행하므로 inventory/ 폴더는 건드리지 않습니다.
+# ---------------------------------------------------------
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from inventory_store import InventoryStore, _read_snapshot
+
+
+def check_crash_recovery():
+    """쓰기 도중 종료되어 로그 마지막 줄이 잘린 상황을 재현"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InventoryStore(tmp)
+        store.open()
+        store.upsert([("a", 1.0), ("b", 2.0)])
+        store._log.write('["c", 3')     # 줄바꿈 없이 잘린 기록
+        store._log.flush()
+        store._log.close()              # 스냅샷 없이 종료
+
+        restarted = InventoryStore(tmp)
+        restarted.open()
+        restarted.upsert([("d", 4.0)])  # 확인 응답을 받은 쓰기
+        restarted._log.close()
+
+        items = InventoryStore(tmp).open()
+        assert items == {"a": 1.0, "b": 2.0, "d": 4.0}, f"복구 후 재고가 다릅니다: {items}"
+        with open(os.path.join(tmp, "inventory.log"), "rb") as f:
+            assert f.read().endswith(b"\n"), "잘린 줄이 로그에 남아 있습니다."
+    print("비정상 종료 복구 확인: 통과")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재고 저장소 시작/쓰기 벤치마크")
+    parser.add_argument("--items", type=int, default=1_000_000, help="카탈로그 크기")
+    parser.add_argument("--batch", type=int, default=1000, help="쓰기 비교에 사용할 아이템 수")
+    parser.add_argument("--log-records", type=int, default=20_000, help="시작 시 재생할 쓰기 로그 건수")
+    args = parser.parse_args()
+
+    check_crash_recovery()
+
+    colors = ["black", "white", "navy", "red", "grey"]
+    kinds = ["t-shirt", "jeans", "hoodie", "jacket", "socks", "cap"]
+    catalog = {f"{random.choice(colors)} {random.choice(kinds)} #{i}": round(random.uniform(5, 200), 2)
+               for i in range(args.items)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InventoryStore(tmp, snapshot_every=10 ** 9)
+        store.open()
+        started = time.perf_counter()
+        store.upsert(catalog.items())
+        store.snapshot()
+        print(f"초기 스냅샷 작성: {len(catalog):,}개, {time.perf_counter() - started:.3f}s")
+
+        # 스냅샷 이후 변경분을 로그에 남겨 둠
+        changes = random.sample(list(catalog), min(args.log_records, len(catalog)))
+        store.upsert((key, 1.0) for key in changes)
+        store._log.close()      # close()는 스냅샷을 새로 만들므로 로그만 닫음
+
+        started = time.perf_counter()
+        snapshot_items = _read_snapshot(os.path.join(tmp, "inventory.snapshot"))
+        snapshot_seconds = time.perf_counter() - started
+        del snapshot_items
+
+        started = time.perf_counter()
+        reopened = InventoryStore(tmp, snapshot_every=10 ** 9)
+        items = reopened.open()
+        print(f"시작(스냅샷 로드 + 로그 {len(changes):,}건 재생): {len(items):,}개, "
+              f"{time.perf_counter() - started:.3f}s (스냅샷 로드만 {snapshot_seconds:.3f}s)")
+
+        batch = [(f"new item {i}", 9.99) for i in range(args.batch)]
+        started = time.perf_counter()
+        for entry in batch:
+            reopened.upsert([entry])
+        single = time.perf_counter() - started
+        started = time.perf_counter()
+        reopened.upsert(batch)
+        bulk = time.perf_counter() - started
+        print(f"{args.batch}개 쓰기: 한 개씩 {single:.3f}s / 한 번에 {bulk:.4f}s ({single / bulk:.0f}배)")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# ---------------------------------------------------------
+# MCP 서버 부하 테스트 (streamable-http)
+# ---------------------------------------------------------
+# 서버를 로컬에서 직접 띄우고 N개의 MCP 클라이언트가 동시에
+# 정해진 비율(tool mix)로 Tool을 호출합니다.
+# - 결과: 처리량(calls/s), p50/p95/p99 지연 시간, 오류율 (전체 + Tool별)
+# - --output 으로 JSON 결과를 저장하고, --compare 로 이전 결과와 비교
+# - 부하 전에 잘못된 호출을 한 번 보내서 /metrics의 오류 수가 늘어나는지 확인 (db)
+#
+# 서버 파일과 데이터(Chinook.db 등)를 임시 폴더에 복사해서 실행하므로
+# 쓰기 호출이 섞여 있어도 원본 데이터는 바뀌지 않습니다.
+#
+# 실행 예:
+#   python bench_mcp_load.py db --clients 16 --duration 20 \
+#       --mix "read=0.8,schema=0.1,write=0.1" --output db_load.json
+#   python bench_mcp_load.py inventory --clients 8 --compare db_load_before.json
+# ---------------------------------------------------------
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+from fastmcp import Client
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ---------------------------------------------------------
+# 서버별 Tool 호출 시나리오: 이름 -> (tool 이름, 인자 생성 함수)
+# ---------------------------------------------------------
+_DB_READS = [
+    "SELECT * FROM Customer WHERE CustomerId = {n}",
+    "SELECT InvoiceId, Total FROM Invoice WHERE CustomerId = {n} ORDER BY InvoiceDate",
+    """SELECT g.Name, COUNT(*) FROM Track t JOIN Genre g ON g.GenreId = t.GenreId
+       GROUP BY g.GenreId ORDER BY 2 DESC LIMIT {n}""",
+    """SELECT ar.Name, SUM(il.UnitPrice * il.Quantity) AS Sales FROM InvoiceLine il
+       JOIN Track t ON t.TrackId = il.TrackId JOIN Album al ON al.AlbumId = t.AlbumId
+       JOIN Artist ar ON ar.ArtistId = al.ArtistId GROUP BY ar.ArtistId ORDER BY Sales DESC LIMIT {n}""",
+]
+_DB_TABLES = ["Album", "Artist", "Customer", "Employee", "Genre", "Invoice",
+              "InvoiceLine", "MediaType", "Playlist", "PlaylistTrack", "Track"]
+
+SCENARIOS = {
+    "db": {
+        "script": "mcp_db_server.py",
+        "files": ["*.py", "Chinook.db"],
+        "port": 3001,
+        "default_mix": "read=0.8,schema=0.1,write=0.1",
+        "calls": {
+            "read": ("execute_sql_query",
+                     lambda: {"query": random.choice(_DB_READS).format(n=random.randint(1, 59))}),
+            "schema": ("get_table_schema", lambda: {"table_name": random.choice(_DB_TABLES)}),
+            # 값이 바뀌지 않는 UPDATE - 쓰기 경로와 캐시 무효화만 발생
+            "write": ("execute_sql_query",
+                      lambda: {"query": f"UPDATE Genre SET Name = Name WHERE GenreId = {random.randint(1, 25)}"}),
+            "describe": ("describe_database", lambda: {}),
+        },
+        # 실패해야 하는 호출 (오류 집계 확인용)
+        "error_call": ("execute_read_query", {"query": "SELECT * FROM NoSuchTable"}),
+    },
+    "inventory": {
+        "script": "mcp_server.py",
+        "files": ["*.py"],
+        "port": 3000,
+        "default_mix": "get=0.6,get_many=0.2,list=0.1,upsert=0.1",
+        "calls": {
+            "get": ("get_price", lambda: {"item": random.choice(["t-shirt", "jeans", "hoodie", "cap"])}),
+            "get_many": ("get_prices", lambda: {"items": [f"item {random.randrange(1000)}" for _ in range(50)]}),
+            "list": ("list_items", lambda: {"limit": 100, "offset": random.randrange(0, 1000, 100)}),
+            "search": ("search_items", lambda: {"query": f"item {random.randrange(100)}"}),
+            "upsert": ("upsert_items",
+                       lambda: {"items": [[f"item {random.randrange(1000)}", round(random.uniform(1, 100), 2)]
+                                          for _ in range(20)]}),
+        },
+    },
+}
+
+
+def parse_mix(text: str, calls: dict) -> list:
+    """ "read=0.8,write=0.2" -> [(이름, 가중치), ...] """
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in calls:
+            raise SystemExit(f"알 수 없는 호출 종류: {name} (사용 가능: {', '.join(calls)})")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    total = len(values)
+    return {
+        "calls": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "mean_ms": sum(values) / total * 1000 if total else 0.0,
+    }
+
+
+# ---------------------------------------------------------
+# 서버 실행
+# ---------------------------------------------------------
+def _port_in_use(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def _wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"서버가 시작 중 종료되었습니다 (exit code {proc.returncode})")
+        # 포트가 열렸어도 방금 띄운 서버가 살아 있을 때만 준비된 것으로 봄
+        if _port_in_use(port) and proc.poll() is None:
+            return
+        time.sleep(0.2)
+    raise SystemExit(f"{timeout:.0f}초 안에 서버가 포트 {port}을 열지 않았습니다.")
+
+
+def start_server(scenario: dict, workdir: str):
+    """서버를 띄우고 (프로세스, 로그 파일) 반환 - 둘 다 호출한 쪽에서 정리"""
+    if _port_in_use(scenario["port"]):
+        # 다른 서버가 이미 떠 있으면 그 서버를 측정하게 되므로 시작하지 않음
+        raise SystemExit(f"포트 {scenario['port']}이 이미 사용 중입니다. "
+                         f"실행 중인 서버를 종료하거나 --url로 지정하세요.")
+    for pattern in scenario["files"]:
+        for path in glob.glob(os.path.join(BASE_DIR, pattern)):
+            shutil.copy(path, workdir)
+    log = open(os.path.join(workdir, "server.log"), "w")
+    proc = subprocess.Popen([sys.executable, scenario["script"]], cwd=workdir,
+                            stdout=log, stderr=subprocess.STDOUT)
+    try:
+        _wait_for_port(scenario["port"], proc)
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        log.close()
+        raise
+    return proc, log
+
+
+# ---------------------------------------------------------
+# 오류 집계 확인: 실패한 호출이 mcp_tool_errors_total에 잡히는지
+# ---------------------------------------------------------
+def _error_count(metrics_url: str, tool: str) -> int:
+    with urllib.request.urlopen(metrics_url, timeout=10) as resp:
+        text = resp.read().decode("utf-8")
+    for line in text.splitlines():
+        if line.startswith("mcp_tool_errors_total{") and f'tool="{tool}"' in line:
+            return int(line.rsplit(" ", 1)[1])
+    return 0
+
+
+async def check_error_metrics(url: str, scenario: dict):
+    tool, arguments = scenario["error_call"]
+    metrics_url = url.rsplit("/mcp", 1)[0] + "/metrics"
+    before = _error_count(metrics_url, tool)
+    async with Client(url) as client:
+        result = await client.call_tool(tool, arguments, raise_on_error=False)
+    assert result.is_error, f"{tool} 실패 호출이 오류로 반환되지 않았습니다."
+    after = _error_count(metrics_url, tool)
+    assert after == before + 1, f"mcp_tool_errors_total이 늘지 않았습니다 ({before} -> {after})"
+    print(f"오류 집계 확인: 통과 ({tool} mcp_tool_errors_total {before} -> {after})")
+
+
+# ---------------------------------------------------------
+# 부하 생성
+# ---------------------------------------------------------
+async def run_client(url: str, scenario: dict, mix: list, stop_at: float,
+                     warmup_until: float, results: dict):
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    async with Client(url) as client:
+        while time.monotonic() < stop_at:
+            kind = random.choices(names, weights)[0]
+            tool, make_args = scenario["calls"][kind]
+            started = time.monotonic()
+            ok = True
+            try:
+                # 서버가 ToolError로 알린 실패는 is_error, 연결/프로토콜 실패는 예외
+                result = await client.call_tool(tool, make_args(), raise_on_error=False)
+                ok = not result.is_error
+            except Exception:
+                ok = False
+            if started >= warmup_until:
+                results[kind]["latencies"].append(time.monotonic() - started)
+                results[kind]["errors"] += 0 if ok else 1
+
+
+async def run_load(url: str, scenario: dict, mix: list, clients: int,
+                   duration: float, warmup: float) -> dict:
+    results = defaultdict(lambda: {"latencies": [], "errors": 0})
+    start = time.monotonic()
+    warmup_until = start + warmup
+    stop_at = warmup_until + duration
+    await asyncio.gather(*(run_client(url, scenario, mix, stop_at, warmup_until, results)
+                           for _ in range(clients)))
+    elapsed = time.monotonic() - warmup_until
+
+    all_latencies = [v for r in results.values() for v in r["latencies"]]
+    all_errors = sum(r["errors"] for r in results.values())
+    return {
+        "overall": summarize(all_latencies, all_errors, elapsed),
+        "by_call": {kind: summarize(r["latencies"], r["errors"], elapsed)
+                    for kind, r in sorted(results.items())},
+    }
+
+
+def print_report(report: dict, baseline: dict = None):
+    def row(name, stats, base=None):
+        line = (f"{name:<12} {stats['calls']:>7} {stats['throughput']:>9.1f} "
+                f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+                f"{stats['error_rate']:>7.2%}")
+        if base and base["throughput"]:
+            line += (f"   Δthroughput {stats['throughput'] / base['throughput'] - 1:+.1%}"
+                     f", Δp95 {stats['p95_ms'] - base['p95_ms']:+.2f}ms")
+        print(line)
+
+    print(f"{'call':<12} {'count':>7} {'calls/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    print("-" * 66)
+    base_calls = (baseline or {}).get("by_call", {})
+    for kind, stats in report["by_call"].items():
+        row(kind, stats, base_calls.get(kind))
+    print("-" * 66)
+    row("TOTAL", report["overall"], (baseline or {}).get("overall"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 서버 동시 부하 테스트")
+    parser.add_argument("server", choices=sorted(SCENARIOS), help="db(mcp_db_server) 또는 inventory(mcp_server)")
+    parser.add_argument("--clients", type=int, default=8, help="동시 MCP 클라이언트 수")
+    parser.add_argument("--duration", type=float, default=15.0, help="측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="측정 전 예열 시간(초)")
+    parser.add_argument("--mix", help="호출 비율 (예: read=0.8,schema=0.1,write=0.1)")
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (지정하면 서버를 띄우지 않음)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    scenario = SCENARIOS[args.server]
+    mix = parse_mix(args.mix or scenario["default_mix"], scenario["calls"])
+
+    with tempfile.TemporaryDirectory() as workdir:
+        proc = log = None
+        url = args.url
+        if url is None:
+            proc, log = start_server(scenario, workdir)
+            url = f"http://127.0.0.1:{scenario['port']}/mcp"
+        try:
+            if "error_call" in scenario:
+                asyncio.run(check_error_metrics(url, scenario))
+            print(f"대상: {url} / 클라이언트 {args.clients}개 / {args.duration:.0f}초 / mix {dict(mix)}")
+            report = asyncio.run(run_load(url, scenario, mix, args.clients, args.duration, args.warmup))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                log.close()
+
+    report["config"] = {
+        "server": args.server,
+        "clients": args.clients,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "mix": dict(mix),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# ---------------------------------------------------------
+# stdio MCP 서버 풀 벤치마크 (mcp_pool.py)
+# ---------------------------------------------------------
+# fake_stdio_mcp_server.py를 대상으로 세션마다 걸리는 준비 시간을 비교합니다.
+# 1) 세션마다 새로 띄우기: async with MCPServerStdio(...) + list_tools (tool_mcp.py의 기존 방식)
+# 2) 풀 사용: 첫 세션만 기동, 이후 세션은 상주 프로세스 재사용
+# 3) 디스크 Tool 목록 캐시: 새 풀에서 프로세스 없이 list_tools
+# 4) 장애 복구: 서버 프로세스가 죽은 뒤 다음 Tool 호출이 성공하기까지
+#
+# 실행 예:
+#   python bench_mcp_pool.py --sessions 5 --startup-delay 1.5
+# ---------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from agents.mcp import MCPServerStdio
+
+from mcp_pool import MCPServerPool
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def server_params(startup_delay: float) -> dict:
+    return {
+        "command": sys.executable,
+        "args": [os.path.join(BASE_DIR, "fake_stdio_mcp_server.py"), "--startup-delay", str(startup_delay)],
+    }
+
+
+async def cold_sessions(params: dict, sessions: int) -> list:
+    times = []
+    for _ in range(sessions):
+        started = time.perf_counter()
+        async with MCPServerStdio(name="fake", params=params) as server:
+            await server.list_tools()
+            await server.call_tool("echo", {"text": "hi"})
+            times.append(time.perf_counter() - started)
+    return times
+
+
+async def pooled_sessions(params: dict, sessions: int, cache_path: str) -> dict:
+    times = []
+    async with MCPServerPool(tool_cache_path=cache_path) as pool:
+        # echo는 두 번 실행되어도 되는 Tool이므로 재시작 후 같은 호출을 다시 보냄
+        server = pool.register("fake", params, idempotent_tools=["echo"])
+        for _ in range(sessions):
+            started = time.perf_counter()
+            await server.list_tools()
+            await server.call_tool("echo", {"text": "hi"})
+            times.append(time.perf_counter() - started)
+
+        # 장애 복구: 프로세스를 죽인 뒤 다음 호출까지
+        # (풀의 재시도를 거치지 않도록 실제 서버 객체에 직접 호출)
+        try:
+            await pool.running("fake").call_tool("crash", {})
+        except Exception:
+            pass
+        started = time.perf_counter()
+        await server.call_tool("echo", {"text": "after crash"})
+        recovery = time.perf_counter() - started
+        stats = pool.stats["fake"]
+    return {"times": times, "recovery": recovery, "stats": stats}
+
+
+async def cached_listing(params: dict, cache_path: str) -> float:
+    async with MCPServerPool(tool_cache_path=cache_path) as pool:
+        server = pool.register("fake", params)
+        started = time.perf_counter()
+        tools = await server.list_tools()
+        elapsed = time.perf_counter() - started
+        assert tools, "Tool 목록 캐시가 비어 있습니다."
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="stdio MCP 서버 풀 기동 시간 비교")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--startup-delay", type=float, default=1.0, help="대체 서버 기동 지연(초)")
+    args = parser.parse_args()
+
+    params = server_params(args.startup_delay)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "mcp_tools.json")
+
+        cold = await cold_sessions(params, args.sessions)
+        pooled = await pooled_sessions(params, args.sessions, cache_path)
+        listing = await cached_listing(params, cache_path)
+
+    def fmt(times):
+        return " ".join(f"{t * 1000:7.1f}" for t in times)
+
+    print(f"세션별 준비+첫 호출 시간(ms), 대체 서버 기동 지연 {args.startup_delay}s")
+    print(f"  매번 새로 띄우기: {fmt(cold)}  (합계 {sum(cold):.2f}s)")
+    print(f"  풀 재사용       : {fmt(pooled['times'])}  (합계 {sum(pooled['times']):.2f}s)")
+    print(f"  디스크 Tool 목록 캐시로 list_tools: {listing * 1000:.2f}ms (프로세스 기동 전)")
+    print(f"  프로세스 종료 후 복구까지: {pooled['recovery']:.2f}s "
+          f"(재시작 {pooled['stats']['restarts']}회, 기동 시간 {pooled['stats']['start_seconds']})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
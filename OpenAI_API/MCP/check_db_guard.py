@@ -0,0 +1,62 @@
+# ---------------------------------------------------------
+# 쿼리 비용 검사(QueryGuard.check) 점검
+# ---------------------------------------------------------
+# Chinook DB에 대해 대표 쿼리들의 허용/경고/거부 결과를 확인합니다.
+# UNION ALL 갈래와 스칼라 서브쿼리는 곱하지 않고 더해야 하며,
+# 교차 조인처럼 한 SELECT 안의 중첩 스캔만 곱해서 거부되어야 합니다.
+#
+# 실행 예:
+#   python check_db_guard.py
+# ---------------------------------------------------------
+
+import os
+import sqlite3
+import sys
+
+from db_catalog import build_catalog
+from db_guard import QueryGuard, QueryRejected
+
+# (쿼리, 기대 결과) - "ok": 경고 없이 허용, "warn": 경고와 함께 허용, "reject": 거부
+CASES = [
+    ("SELECT TrackId FROM Track UNION ALL SELECT InvoiceLineId FROM InvoiceLine "
+     "UNION ALL SELECT InvoiceId FROM Invoice", "ok"),
+    ("SELECT TrackId FROM Track UNION ALL SELECT InvoiceLineId FROM InvoiceLine", "ok"),
+    ("SELECT (SELECT COUNT(*) FROM Track), (SELECT COUNT(*) FROM InvoiceLine), "
+     "(SELECT COUNT(*) FROM Invoice)", "ok"),
+    ("SELECT * FROM Track t JOIN Album a ON t.AlbumId = a.AlbumId "
+     "WHERE t.TrackId IN (SELECT TrackId FROM InvoiceLine)", "ok"),
+    ("SELECT * FROM Track, InvoiceLine", "warn"),
+    ("SELECT * FROM Track, InvoiceLine, Invoice", "reject"),
+    ("SELECT * FROM Track WHERE EXISTS (SELECT 1 FROM InvoiceLine il "
+     "WHERE il.UnitPrice > Track.UnitPrice)", "warn"),
+    ("SELECT * FROM (SELECT TrackId FROM Track UNION SELECT InvoiceLineId FROM InvoiceLine) "
+     "u, Invoice, Customer", "ok"),
+]
+
+
+def main() -> int:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    conn = sqlite3.connect(f"file:{os.path.join(base_dir, 'Chinook.db')}?mode=ro", uri=True)
+    tables = build_catalog(conn)
+    # Chinook은 작으므로 기준을 낮춰 중첩 스캔 경고/거부가 드러나게 함
+    guard = QueryGuard(warn_scan_rows=1_000_000, reject_scan_rows=50_000_000)
+
+    failures = 0
+    for query, expected in CASES:
+        try:
+            warnings = guard.check(conn, query, tables)
+            actual, detail = ("warn" if warnings else "ok"), "; ".join(warnings)
+        except QueryRejected as exc:
+            actual, detail = "reject", str(exc)
+        mark = "✅" if actual == expected else "❌"
+        failures += actual != expected
+        print(f"{mark} {actual:<6} (기대: {expected:<6}) {query[:70]}")
+        if detail:
+            print(f"      {detail}")
+
+    print(f"\n{len(CASES) - failures}/{len(CASES)} 통과")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
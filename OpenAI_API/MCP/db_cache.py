@@ -0,0 +1,120 @@
+# ---------------------------------------------------------
+# execute_sql_query 결과 캐시 (LRU, 바이트 상한)
+# ---------------------------------------------------------
+# - 키: 정규화된 SQL 문자열 (+ 호출 옵션)
+# - 값: 포맷팅까지 끝난 결과 문자열
+# - 무효화:
+#   1) 쓰기 쿼리 커밋 직후 invalidate() 호출
+#   2) PRAGMA data_version 변경 감지 (다른 프로세스의 쓰기 포함)
+# ---------------------------------------------------------
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# 작은따옴표/큰따옴표 리터럴은 그대로 두고 나머지만 정규화
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """공백/대소문자/끝의 세미콜론 차이만 있는 쿼리를 같은 키로 만듦"""
+    parts = _QUOTED.split(query.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):       # 짝수 인덱스 = 따옴표 밖
+        parts[i] = _SPACES.sub(" ", parts[i]).upper()
+    return "".join(parts)
+
+
+class ResultCache:
+    """
+    쓰기 인식(write-aware) LRU 결과 캐시
+
+    get()은 캐시 확인 전에 전용 커넥션으로 PRAGMA data_version을 읽어
+    DB가 바뀌었으면 캐시 전체를 비웁니다. 조회가 진행되는 동안 무효화가
+    일어난 경우를 막기 위해 put()에는 조회 시작 시점의 generation을 넘깁니다.
+    """
+
+    def __init__(self, pool, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()       # 키 -> (값, 크기)
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        # data_version은 "다른 커넥션"의 변경만 반영하므로 별도 커넥션 사용
+        self._probe = pool.open_reader()
+        self._probe_lock = threading.Lock()
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        with self._probe_lock:
+            return self._probe.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_data_version(self):
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self.invalidate()
+
+    @property
+    def generation(self) -> int:
+        """무효화될 때마다 증가하는 값 (조회 시작 시점에 읽어 put()에 전달)"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[str]:
+        self._sync_data_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: str, generation: int):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return      # 조회 도중 DB가 바뀜 - 오래된 결과는 저장하지 않음
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def close(self):
+        with self._probe_lock:
+            self._probe.close()
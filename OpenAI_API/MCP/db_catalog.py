@@ -0,0 +1,132 @@
+# ---------------------------------------------------------
+# Chinook DB 스키마 카탈로그
+# ---------------------------------------------------------
+# 서버 시작 시 한 번 만들어 두고 PRAGMA schema_version이 바뀔 때만
+# 다시 만듭니다. 포함 정보:
+# - 컬럼(이름, 타입, NOT NULL, 기본값, PK 순서)
+# - 외래 키, 인덱스(컬럼, UNIQUE 여부)
+# - 대략적인 행 수 (sqlite_stat1 → MAX(rowid) → COUNT(*) 순으로 시도)
+# ---------------------------------------------------------
+
+import sqlite3
+import threading
+from typing import List, Optional
+
+
+def _approx_row_count(conn: sqlite3.Connection, table: str, stats: dict) -> int:
+    if table in stats:
+        return stats[table]
+    quoted = '"' + table.replace('"', '""') + '"'
+    try:
+        # rowid 테이블은 인덱스 탐색 한 번으로 근사치를 얻을 수 있음
+        value = conn.execute(f"SELECT MAX(rowid) FROM {quoted}").fetchone()[0]
+        return value or 0
+    except sqlite3.OperationalError:
+        # WITHOUT ROWID 테이블
+        return conn.execute(f"SELECT COUNT(*) FROM {quoted}").fetchone()[0]
+
+
+def _read_stat1(conn: sqlite3.Connection) -> dict:
+    """ANALYZE 결과가 있으면 테이블별 행 수를 읽어옴"""
+    try:
+        rows = conn.execute("SELECT tbl, stat FROM sqlite_stat1 WHERE idx IS NULL OR idx = tbl").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {tbl: int(stat.split()[0]) for tbl, stat in rows}
+
+
+def build_catalog(conn: sqlite3.Connection) -> dict:
+    """현재 DB 스키마를 dict로 수집"""
+    stats = _read_stat1(conn)
+    tables = {}
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' "
+        "AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+    for name in names:
+        columns = [
+            {
+                "name": col[1],
+                "type": col[2],
+                "not_null": bool(col[3]),
+                "default": col[4],
+                "pk": col[5],       # 0이면 PK 아님, 1 이상이면 복합 PK 내 순서
+            }
+            for col in conn.execute("SELECT * FROM pragma_table_info(?)", (name,))
+        ]
+        foreign_keys = [
+            {"column": fk[3], "ref_table": fk[2], "ref_column": fk[4]}
+            for fk in conn.execute("SELECT * FROM pragma_foreign_key_list(?)", (name,))
+        ]
+        indexes = []
+        for idx in conn.execute("SELECT * FROM pragma_index_list(?)", (name,)).fetchall():
+            idx_columns = [info[2] for info in conn.execute(
+                "SELECT * FROM pragma_index_info(?) ORDER BY seqno", (idx[1],))]
+            indexes.append({"name": idx[1], "unique": bool(idx[2]), "columns": idx_columns})
+
+        tables[name] = {
+            "columns": columns,
+            "primary_key": [c["name"] for c in sorted(columns, key=lambda c: c["pk"]) if c["pk"]],
+            "foreign_keys": foreign_keys,
+            "indexes": indexes,
+            "approx_rows": _approx_row_count(conn, name, stats),
+        }
+    return tables
+
+
+def format_catalog(tables: dict, names: Optional[List[str]] = None) -> str:
+    """모델이 읽기 좋은 간결한 텍스트로 변환"""
+    lines = []
+    for name in names or sorted(tables):
+        table = tables.get(name)
+        if table is None:
+            lines.append(f"{name}: 테이블을 찾을 수 없습니다.")
+            continue
+        lines.append(f"{name} (약 {table['approx_rows']}행)")
+        refs = {fk["column"]: f"{fk['ref_table']}.{fk['ref_column']}" for fk in table["foreign_keys"]}
+        for col in table["columns"]:
+            parts = [f"  {col['name']} {col['type']}"]
+            if col["pk"]:
+                parts.append("PK")
+            if col["not_null"]:
+                parts.append("NOT NULL")
+            if col["default"] is not None:
+                parts.append(f"DEFAULT {col['default']}")
+            if col["name"] in refs:
+                parts.append(f"-> {refs[col['name']]}")
+            lines.append(" ".join(parts))
+        for idx in table["indexes"]:
+            unique = "UNIQUE " if idx["unique"] else ""
+            lines.append(f"  인덱스: {unique}{idx['name']}({', '.join(idx['columns'])})")
+    return "\n".join(lines)
+
+
+class SchemaCatalog:
+    """schema_version이 바뀔 때만 다시 만드는 스키마 카탈로그"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schema_version = None
+        self._tables = {}
+        self._text = ""
+
+    def get(self, conn: sqlite3.Connection) -> dict:
+        """
+        최신 카탈로그 반환 (ConnectionPool.read/run_read에서 호출)
+        schema_version 확인은 헤더 한 번 읽는 비용이라 매 호출마다 확인
+        """
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        if version != self._schema_version:
+            with self._lock:
+                if version != self._schema_version:
+                    tables = build_catalog(conn)
+                    self._text = format_catalog(tables)
+                    self._tables = tables
+                    self._schema_version = version
+        return self._tables
+
+    def describe(self, conn: sqlite3.Connection, names: Optional[List[str]] = None) -> str:
+        tables = self.get(conn)
+        if not names:
+            return self._text
+        return format_catalog(tables, names)
@@ -0,0 +1,139 @@
+# ---------------------------------------------------------
+# DB MCP Tool 결과 인코딩
+# ---------------------------------------------------------
+# - table     : 기존 "a | b" 텍스트 표 (기본값)
+# - json      : 컬럼 이름을 한 번만 보내는 컬럼형 JSON
+# - csv       : 헤더 1줄 + 데이터 (메타 정보는 # 주석 줄)
+# - structured: 컬럼 타입이 포함된 JSON (MCP structured content로 반환)
+#
+# 공통 옵션: 컬럼 선택(columns), 긴 텍스트 셀 자르기(max_cell_chars)
+# ---------------------------------------------------------
+
+import base64
+import csv
+import io
+import json
+from typing import Any, List, Optional, Sequence
+
+from db_paging import Page
+
+FORMATS = ("table", "json", "csv", "structured")
+
+
+def project(page: Page, columns: Optional[List[str]]) -> Page:
+    """요청한 컬럼만 남김 (대소문자 무시, 요청 순서 유지)"""
+    if not columns:
+        return page
+    lowered = {name.lower(): i for i, name in enumerate(page.columns)}
+    missing = [c for c in columns if c.lower() not in lowered]
+    if missing:
+        raise ValueError(f"결과에 없는 컬럼: {', '.join(missing)} (사용 가능: {', '.join(page.columns)})")
+    idx = [lowered[c.lower()] for c in columns]
+    rows = [tuple(row[i] for i in idx) for row in page.rows]
+    return page._replace(columns=[page.columns[i] for i in idx], rows=rows)
+
+
+def _cell(value: Any, max_cell_chars: int) -> Any:
+    """JSON으로 보낼 수 있는 값으로 변환하고 긴 텍스트는 자름"""
+    if isinstance(value, bytes):
+        value = base64.b64encode(value).decode("ascii")
+    if max_cell_chars and isinstance(value, str) and len(value) > max_cell_chars:
+        return value[:max_cell_chars] + "…"
+    return value
+
+
+def _column_types(page: Page) -> List[str]:
+    """각 컬럼의 첫 번째 NULL이 아닌 값으로 타입 추정"""
+    names = {int: "integer", float: "real", str: "text", bytes: "blob"}
+    types = []
+    for i in range(len(page.columns)):
+        value = next((row[i] for row in page.rows if row[i] is not None), None)
+        types.append(names.get(type(value), "null"))
+    return types
+
+
+def _meta(page: Page, warnings: Sequence[str], notes: Sequence[str]) -> dict:
+    meta = {}
+    if page.cursor or page.start:
+        meta["start"] = page.start
+        if page.total is not None:
+            meta["total"] = page.total
+            if not page.total_exact:
+                meta["total_estimated"] = True
+    if page.cursor:
+        meta["cursor"] = page.cursor
+    if warnings:
+        meta["warnings"] = list(warnings)
+    if notes:
+        meta["notes"] = list(notes)
+    return meta
+
+
+def _render_table(page: Page, max_cell_chars: int, warnings, notes, tool: str) -> str:
+    if not page.rows:
+        lines = ["쿼리 결과가 없습니다."]
+    else:
+        lines = []
+        if page.cursor or page.start:
+            # 여러 페이지에 걸친 결과일 때만 위치/전체 행 수 표시
+            total = ""
+            if page.total is not None:
+                total = f" / 전체 {page.total}행" if page.total_exact else f" / 전체 약 {page.total}행(추정)"
+            lines.append(f"[{page.start + 1}~{page.start + len(page.rows)}행{total}]")
+        header = " | ".join(page.columns)
+        lines.append(header)
+        lines.append("-" * len(header))
+        for row in page.rows:
+            lines.append(" | ".join(str(_cell(val, max_cell_chars)) for val in row))
+        if page.cursor:
+            # 다음 페이지는 이 결과를 만든 Tool로 이어서 요청 (조회 전용 Tool이면 승인 없이 계속됨)
+            lines.append(f'[다음 페이지: {tool}(cursor="{page.cursor}")]')
+    lines = [f"[경고] {w}" for w in warnings] + lines + [f"[{n}]" for n in notes]
+    return "\n".join(lines)
+
+
+def _render_csv(page: Page, max_cell_chars: int, meta: dict) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    if page.columns:
+        writer.writerow(page.columns)
+    writer.writerows([_cell(v, max_cell_chars) for v in row] for row in page.rows)
+    for key, value in meta.items():
+        out.write(f"# {key}: {json.dumps(value, ensure_ascii=False)}\n")
+    return out.getvalue().rstrip("\n")
+
+
+def structured(page: Page, max_cell_chars: int = 0,
+               warnings: Sequence[str] = (), notes: Sequence[str] = ()) -> dict:
+    """타입 정보를 포함한 structured content용 dict"""
+    payload = {
+        "columns": [{"name": n, "type": t} for n, t in zip(page.columns, _column_types(page))],
+        "rows": [[_cell(v, max_cell_chars) for v in row] for row in page.rows],
+    }
+    payload.update(_meta(page, warnings, notes))
+    return payload
+
+
+def render(page: Page, fmt: str = "table", max_cell_chars: int = 0,
+           warnings: Sequence[str] = (), notes: Sequence[str] = (),
+           tool: str = "execute_sql_query") -> str:
+    """
+    Page를 지정한 형식의 문자열로 변환
+    tool: 결과를 만든 Tool 이름 (table 형식의 다음 페이지 안내에 사용)
+    (structured는 같은 내용을 JSON 문자열로 반환 - 서버에서 dict로 다시 감쌈)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (사용 가능: {', '.join(FORMATS)})")
+    if fmt == "table":
+        return _render_table(page, max_cell_chars, warnings, notes, tool)
+    if fmt == "csv":
+        return _render_csv(page, max_cell_chars, _meta(page, warnings, notes))
+    if fmt == "structured":
+        payload = structured(page, max_cell_chars, warnings, notes)
+    else:
+        payload = {
+            "columns": page.columns,
+            "rows": [[_cell(v, max_cell_chars) for v in row] for row in page.rows],
+        }
+        payload.update(_meta(page, warnings, notes))
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
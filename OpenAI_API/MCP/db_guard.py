@@ -0,0 +1,241 @@
+# ---------------------------------------------------------
+# 쿼리 비용 검사 + 느린 쿼리 로그 + 인덱스 추천
+# ---------------------------------------------------------
+# - check()  : 실행 전에 EXPLAIN QUERY PLAN으로 전체 스캔 비용을 추정하여
+#              큰 테이블 스캔은 경고, 중첩 스캔(교차 조인 등)은 거부
+# - record() : 실행 시간이 기준을 넘은 쿼리를 느린 쿼리 로그에 기록
+# - advise() : 느린 쿼리 로그의 실행 계획을 보고 (커버링) 인덱스를 제안
+#
+# 실행 시간 제한 자체는 db_pool.statement_deadline()이 담당합니다.
+# ---------------------------------------------------------
+
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, List, Optional, Sequence, Tuple
+
+# 이 행 수 이상인 테이블을 전체 스캔하면 경고
+WARN_SCAN_ROWS = 100_000
+# 예상 처리 행 수(중첩 스캔은 곱, UNION 갈래/서브쿼리는 합)가 이 값을 넘으면 거부
+REJECT_SCAN_ROWS = 50_000_000
+# 이 시간(초)보다 오래 걸린 쿼리는 느린 쿼리 로그에 기록
+SLOW_QUERY_SECONDS = 0.2
+SLOW_LOG_SIZE = 500
+# 제안하는 인덱스의 최대 컬럼 수 (검색 컬럼 + 커버링 컬럼)
+MAX_INDEX_COLUMNS = 6
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_AUTO_INDEX = re.compile(r"^SEARCH (?:TABLE )?(\w+) USING AUTOMATIC .*INDEX \((.+)\)")
+_TABLE_REF = re.compile(r"""(?:\bFROM|\bJOIN|,)\s+["`\[]?(\w+)["`\]]?(?:\s+(?:AS\s+)?(\w+))?""", re.I)
+_KEYWORDS = {
+    "WHERE", "JOIN", "INNER", "LEFT", "RIGHT", "CROSS", "OUTER", "NATURAL", "ON", "USING",
+    "GROUP", "ORDER", "LIMIT", "HAVING", "UNION", "EXCEPT", "INTERSECT", "WINDOW", "AS",
+}
+_EQ_OPS = r"(?:(?<![<>!=])==?(?!=)|\bIN\b|\bIS\b)"
+_RANGE_OPS = r"(?:<=|>=|<>|!=|<|>|\bLIKE\b|\bBETWEEN\b|\bGLOB\b)"
+
+
+class QueryRejected(ValueError):
+    """비용 검사에서 거부된 쿼리"""
+
+
+def explain(conn, query: str, params: Sequence[Any] = ()) -> List[str]:
+    """EXPLAIN QUERY PLAN의 detail 열만 반환"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def _table_aliases(query: str, tables: dict) -> dict:
+    """쿼리 안의 별칭/테이블명 -> 실제 테이블명 (카탈로그에 있는 테이블만)"""
+    lowered = {name.lower(): name for name in tables}
+    aliases = {}
+    for name, alias in _TABLE_REF.findall(query):
+        table = lowered.get(name.lower())
+        if table is None:
+            continue
+        aliases[table.lower()] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+class QueryGuard:
+    """실행 계획 검사와 느린 쿼리 로그를 담당"""
+
+    def __init__(self, warn_scan_rows: int = WARN_SCAN_ROWS,
+                 reject_scan_rows: int = REJECT_SCAN_ROWS,
+                 slow_query_seconds: float = SLOW_QUERY_SECONDS,
+                 slow_log_size: int = SLOW_LOG_SIZE):
+        self.warn_scan_rows = warn_scan_rows
+        self.reject_scan_rows = reject_scan_rows
+        self.slow_query_seconds = slow_query_seconds
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # 실행 전 비용 검사
+    # -----------------------------------------------------
+    def check(self, conn, query: str, tables: dict, params: Sequence[Any] = ()) -> List[str]:
+        """estimate()와 같지만 경고 메시지 목록만 반환"""
+        return self.estimate(conn, query, tables, params)[1]
+
+    def estimate(self, conn, query: str, tables: dict,
+                 params: Sequence[Any] = ()) -> Tuple[int, List[str]]:
+        """
+        실행 계획의 id/parent 트리로 처리 행 수를 추정
+        - 한 SELECT 안의 SCAN 단계(중첩 루프 조인)는 카탈로그 행 수를 곱함
+        - 복합 쿼리(UNION 등)의 각 갈래와 서브쿼리는 따로 계산해 더함
+        - 상관 서브쿼리는 바깥 루프의 행 수만큼 반복되므로 곱해서 더함
+        반환값: (예상 처리 행 수, 경고 메시지 목록) (거부 시 QueryRejected 발생)
+        행 수를 아는 테이블을 스캔하지 않으면(인덱스 검색만 하는 경우 등) 예상 행 수는 0
+        """
+        aliases = _table_aliases(query, tables)
+        children = {}
+        for node_id, parent, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {query}", params):
+            children.setdefault(parent, []).append((node_id, detail))
+
+        warnings, nested = [], [0]
+
+        def cost(parent: int) -> int:
+            loop, scans, extra = 1, 0, 0
+            for node_id, detail in children.get(parent, []):
+                match = _SCAN.match(detail)
+                if match or detail.startswith("SEARCH "):
+                    table = aliases.get(match.group(1).lower()) if match else None
+                    if table is not None:
+                        rows = tables[table]["approx_rows"]
+                        loop *= max(rows, 1)
+                        scans += 1
+                        if rows >= self.warn_scan_rows:
+                            warnings.append(f"{table} 테이블 전체 스캔 (약 {rows}행)")
+                    # 서브쿼리/CTE 등 행 수를 모르는 대상은 곱하지 않음
+                    extra += cost(node_id)
+                elif detail.startswith("CORRELATED "):
+                    repeated = loop * cost(node_id)
+                    if scans:
+                        nested[0] = max(nested[0], repeated)
+                    extra += repeated
+                else:
+                    extra += cost(node_id)      # COMPOUND/UNION/SCALAR/MATERIALIZE 등 별도 갈래
+            if scans > 1:
+                nested[0] = max(nested[0], loop)
+            return (loop if scans else 0) + extra
+
+        estimate = cost(0)
+        if estimate > self.reject_scan_rows:
+            raise QueryRejected(
+                f"예상 처리 행 수가 약 {estimate:,}행으로 너무 많아 실행하지 않았습니다. "
+                "JOIN 조건이나 WHERE 조건을 추가하세요.")
+        if nested[0] >= self.warn_scan_rows and not warnings:
+            warnings.append(f"중첩 스캔으로 약 {nested[0]:,}행을 처리합니다")
+        return estimate, warnings
+
+    # -----------------------------------------------------
+    # 느린 쿼리 로그
+    # -----------------------------------------------------
+    def record(self, query: str, elapsed: float, params: Sequence[Any] = ()):
+        if elapsed < self.slow_query_seconds:
+            return
+        with self._lock:
+            self._slow_log.append({
+                "query": query,
+                "params": list(params),
+                "elapsed": elapsed,
+                "time": time.time(),
+            })
+        print(f"🐢 느린 쿼리 ({elapsed:.3f}s): {' '.join(query.split())[:200]}", file=sys.stderr)
+
+    def slow_queries(self) -> List[dict]:
+        with self._lock:
+            return list(self._slow_log)
+
+    # -----------------------------------------------------
+    # 인덱스 추천
+    # -----------------------------------------------------
+    def advise(self, conn, tables: dict) -> List[dict]:
+        """
+        느린 쿼리 로그의 각 쿼리에 대해 인덱스를 제안
+        - 자동 인덱스(AUTOMATIC INDEX)를 만드는 단계: 그 컬럼으로 인덱스 제안
+        - 전체 스캔 단계: WHERE/JOIN 조건에 쓰인 컬럼을 앞에, 조회에 쓰인
+          나머지 컬럼을 뒤에 붙여 커버링 인덱스 제안
+        같은 (테이블, 컬럼) 제안은 합쳐서 누적 시간 순으로 정렬
+        """
+        proposals = {}
+        for entry in self.slow_queries():
+            try:
+                plan = explain(conn, entry["query"], entry["params"])
+            except Exception:
+                continue        # 스키마가 바뀌어 더 이상 실행되지 않는 쿼리
+            aliases = _table_aliases(entry["query"], tables)
+            for detail in plan:
+                proposal = _propose(detail, entry["query"], aliases, tables)
+                if proposal is None:
+                    continue
+                key = (proposal["table"], tuple(proposal["columns"]))
+                merged = proposals.setdefault(key, {**proposal, "queries": [], "total_seconds": 0.0})
+                merged["queries"].append({"query": entry["query"], "params": entry["params"]})
+                merged["total_seconds"] += entry["elapsed"]
+        return sorted(proposals.values(), key=lambda p: p["total_seconds"], reverse=True)
+
+
+def _column_pattern(alias_names: List[str], column: str) -> str:
+    """별칭.컬럼 또는 컬럼 (다른 별칭이 붙은 같은 이름의 컬럼은 제외)"""
+    prefix = "|".join(re.escape(a) for a in alias_names)
+    return rf"(?<![\w.])(?:(?:{prefix})\.)?[\"`\[]?{re.escape(column)}[\"`\]]?(?!\w)"
+
+
+def _column_refs(query: str, alias_names: List[str], column: str, ops: str) -> bool:
+    """column이 ops 연산자와 함께 조건에 쓰였는지 확인"""
+    col = _column_pattern(alias_names, column)
+    return bool(re.search(rf"{col}\s*{ops}", query, re.I)
+                or re.search(rf"{ops}\s*{col}", query, re.I))
+
+
+def _mentions(query: str, alias_names: List[str], column: str) -> bool:
+    return bool(re.search(_column_pattern(alias_names, column), query, re.I))
+
+
+def _propose(detail: str, query: str, aliases: dict, tables: dict) -> Optional[dict]:
+    auto = _AUTO_INDEX.match(detail)
+    scan = _SCAN.match(detail)
+    if not (auto or scan):
+        return None
+    table = aliases.get((auto or scan).group(1).lower())
+    if table is None:
+        return None
+    alias_names = [a for a, t in aliases.items() if t == table]
+    names = [c["name"] for c in tables[table]["columns"]]
+
+    if auto:
+        # "(Composer=? AND GenreId>?)" 형태에서 컬럼만 추출
+        keys = [n for n in re.findall(r"(\w+)\s*[=<>]", auto.group(2)) if n in names]
+        reason = "실행할 때마다 자동 인덱스를 임시로 생성함"
+    else:
+        # 등호 조건 컬럼 -> 범위 조건 컬럼 순
+        # PK나 이미 인덱스 맨 앞에 있는 컬럼은 쓸 수 있었다면 SCAN이 아니었을 것이므로 제외
+        indexed = {c["name"] for c in tables[table]["columns"] if c["pk"]}
+        indexed |= {idx["columns"][0] for idx in tables[table]["indexes"] if idx["columns"]}
+        candidates = [n for n in names if n not in indexed]
+        keys = [n for n in candidates if _column_refs(query, alias_names, n, _EQ_OPS)]
+        keys += [n for n in candidates if n not in keys and _column_refs(query, alias_names, n, _RANGE_OPS)]
+        reason = "조건 컬럼에 맞는 인덱스가 없어 전체 스캔함"
+    if not keys:
+        return None
+
+    covering = [n for n in names if n not in keys and _mentions(query, alias_names, n)]
+    columns = (keys + covering)[:MAX_INDEX_COLUMNS]
+
+    # 이미 같은 컬럼으로 시작하는 인덱스가 있으면 제안하지 않음
+    for idx in tables[table]["indexes"]:
+        if idx["columns"][:len(keys)] == keys:
+            return None
+
+    name = f"idx_advisor_{table}_{'_'.join(columns)}"
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    return {
+        "table": table,
+        "columns": columns,
+        "reason": reason,
+        "sql": f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({quoted})',
+    }
@@ -0,0 +1,196 @@
+# ---------------------------------------------------------
+# execute_sql_query 페이지 단위 조회 (연속 커서)
+# ---------------------------------------------------------
+# - 첫 호출: 쿼리를 실행하고 page_size 만큼만 가져옴 (fetchmany)
+# - 행이 더 남아 있으면 불투명한 커서 토큰을 발급
+# - 다음 호출: 토큰으로 열린 커서에서 이어서 가져옴
+# - 전체 행 수: 기본은 실행 계획으로 추정한 값(total_exact=False),
+#   exact_total=True로 요청할 때만 COUNT(*)로 정확히 셈
+#
+# 열린 커서마다 전용 읽기 커넥션을 사용합니다. 스레드별 공용 읽기
+# 커넥션에 미완료 구문을 남겨두면 그 커넥션의 다른 조회가 오래된
+# 스냅샷을 보게 되기 때문입니다.
+#
+# 열린 커서는 읽기 트랜잭션(스냅샷)을 붙잡아 WAL 체크포인트를 막으므로
+# 만료된 커서는 호출마다, 그리고 백그라운드 스레드에서 주기적으로 닫고
+# 커넥션 풀이 종료될 때 남은 커서를 모두 닫습니다.
+# ---------------------------------------------------------
+
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional
+
+from db_pool import statement_deadline
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+MAX_OPEN_CURSORS = 64
+CURSOR_TTL_SECONDS = 300
+# 만료 커서를 정리하는 최대 간격(초)
+SWEEP_INTERVAL_SECONDS = 30
+
+
+class Page(NamedTuple):
+    columns: List[str]
+    rows: List[Any]
+    start: int                  # 이번 페이지 첫 행의 위치 (0부터)
+    total: Optional[int]        # 전체 행 수 (첫 페이지에서만 계산)
+    cursor: Optional[str]       # 다음 페이지 토큰 (없으면 마지막 페이지)
+    total_exact: bool = True    # False면 total은 실행 계획으로 추정한 값
+
+
+class _OpenCursor:
+    __slots__ = ("conn", "cursor", "columns", "offset", "pending", "last_used")
+
+    def __init__(self, conn, cursor, columns, offset, pending):
+        self.conn = conn
+        self.cursor = cursor
+        self.columns = columns
+        self.offset = offset
+        self.pending = pending      # 다음 페이지 여부 확인용으로 미리 읽은 행
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.cursor.close()
+        finally:
+            self.conn.close()
+
+
+def _fetch_page(cursor, pending, page_size):
+    """page_size개를 반환하고, 남는 행(최대 1개)은 다음 페이지용으로 돌려줌"""
+    rows = pending + cursor.fetchmany(page_size + 1 - len(pending))
+    return rows[:page_size], rows[page_size:]
+
+
+def _count_sql(query: str) -> str:
+    return f"SELECT COUNT(*) FROM ({query.strip().rstrip(';')})"
+
+
+class CursorRegistry:
+    """발급된 연속 커서를 TTL/최대 개수 제한과 함께 관리"""
+
+    def __init__(self, pool, max_open: int = MAX_OPEN_CURSORS,
+                 ttl_seconds: float = CURSOR_TTL_SECONDS):
+        self.pool = pool
+        self.max_open = max_open
+        self.ttl_seconds = ttl_seconds
+        self._cursors = {}          # 토큰 -> _OpenCursor (삽입 순서 = 오래된 순)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # 풀이 종료될 때 남은 커서(전용 커넥션)도 함께 닫음
+        pool.on_close(self.close)
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, name="chinook-cursor-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def _evict(self, reserve: int = 0):
+        """
+        만료된 커서와 개수 제한(reserve개를 새로 넣을 자리 포함)을 넘은 커서 정리
+        (락 보유 상태에서 호출)
+        """
+        now = time.monotonic()
+        for token in list(self._cursors):
+            entry = self._cursors[token]
+            if (now - entry.last_used > self.ttl_seconds
+                    or len(self._cursors) + reserve > self.max_open):
+                del self._cursors[token]
+                entry.close()
+
+    def sweep(self):
+        """만료된 커서만 정리"""
+        with self._lock:
+            self._evict()
+
+    def _sweep_loop(self):
+        interval = max(min(self.ttl_seconds / 2, SWEEP_INTERVAL_SECONDS), 0.1)
+        while not self._stopped.wait(interval):
+            self.sweep()
+
+    def _register(self, entry: _OpenCursor) -> str:
+        token = secrets.token_urlsafe(12)
+        with self._lock:
+            self._evict(reserve=1)
+            self._cursors[token] = entry
+        return token
+
+    # -----------------------------------------------------
+    # ConnectionPool.run_read()에서 호출 (fn(conn, *args) 형태)
+    # -----------------------------------------------------
+    def start(self, conn, query: str, page_size: int, estimate: Optional[int] = None,
+              exact_total: bool = False) -> Page:
+        """
+        쿼리를 실행하고 첫 페이지를 반환
+        estimate: 실행 계획으로 추정한 행 수 (db_guard.QueryGuard.estimate)
+        exact_total: True면 전체 행 수를 COUNT(*)로 정확히 셈
+                     (쿼리를 한 번 더 실행하므로 요청한 경우에만)
+        """
+        self.sweep()
+        stream_conn = self.pool.open_reader()
+        try:
+            with statement_deadline(stream_conn, self.pool.statement_timeout):
+                cursor = stream_conn.execute(query)
+                columns = [d[0] for d in cursor.description or ()]
+                rows, pending = _fetch_page(cursor, [], page_size)
+        except Exception:
+            stream_conn.close()
+            raise
+
+        if not pending:
+            # 한 페이지에 모두 들어감 - 커서를 남길 필요 없음
+            cursor.close()
+            stream_conn.close()
+            return Page(columns, rows, 0, len(rows), None)
+
+        token = self._register(_OpenCursor(stream_conn, cursor, columns, len(rows), pending))
+        if not exact_total:
+            # 기본값은 이미 계산한 실행 계획 추정치 (모르면 None) - 첫 페이지 지연이
+            # 결과 크기에 따라 늘어나지 않도록 쿼리를 다시 실행하지 않음
+            total = max(estimate, len(rows) + len(pending)) if estimate else None
+            return Page(columns, rows, 0, total, token, total_exact=False)
+
+        # 커서가 열려 있는 동안 같은 커넥션에서 세어야 페이지와 같은 스냅샷을 봄
+        # 제한 시간 안에 세지 못하면 행 수 없이 첫 페이지만 반환
+        try:
+            with statement_deadline(stream_conn, self.pool.statement_timeout):
+                total = stream_conn.execute(_count_sql(query)).fetchone()[0]
+        except sqlite3.OperationalError:
+            total = None
+        return Page(columns, rows, 0, total, token)
+
+    def next(self, conn, token: str, page_size: int) -> Page:
+        """토큰에 해당하는 커서에서 다음 페이지를 반환"""
+        with self._lock:
+            self._evict()
+            entry = self._cursors.pop(token, None)
+        if entry is None:
+            raise ValueError("커서가 만료되었거나 존재하지 않습니다. 쿼리를 다시 실행하세요.")
+
+        try:
+            with statement_deadline(entry.conn, self.pool.statement_timeout):
+                rows, entry.pending = _fetch_page(entry.cursor, entry.pending, page_size)
+        except Exception:
+            entry.close()
+            raise
+
+        start = entry.offset
+        entry.offset += len(rows)
+        if not entry.pending:
+            entry.close()
+            return Page(entry.columns, rows, start, None, None)
+
+        # 같은 토큰을 다시 등록하여 호출자가 토큰을 그대로 재사용할 수 있게 함
+        entry.last_used = time.monotonic()
+        with self._lock:
+            self._evict(reserve=1)
+            self._cursors[token] = entry
+        return Page(entry.columns, rows, start, None, token)
+
+    def close(self):
+        self._stopped.set()
+        with self._lock:
+            for entry in self._cursors.values():
+                entry.close()
+            self._cursors.clear()
@@ -0,0 +1,190 @@
+# ---------------------------------------------------------
+# mcp_db_server용 SQLite 커넥션 풀
+# ---------------------------------------------------------
+# 기능:
+# - 워커 스레드마다 읽기 전용 커넥션 1개 (WAL + mmap 설정)
+# - SELECT 이외의 쿼리를 처리하는 단일 쓰기 커넥션
+# - 스레드 풀에서 쿼리를 실행하여 이벤트 루프를 막지 않음
+# - 커넥션마다 준비된 구문(prepared statement) 캐시 유지
+# - 구문 실행 제한 시간 (set_progress_handler로 오래 걸리는 쿼리 중단)
+# ---------------------------------------------------------
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+# 읽기 커넥션의 mmap 크기 (Chinook.db 전체가 들어가고도 남는 크기)
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+# 잠금 대기 시간(ms) - 쓰기 중 체크포인트 등과 겹칠 때 바로 실패하지 않도록
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+# 커넥션별 준비된 구문 캐시 크기 (sqlite3 기본값 128)
+DEFAULT_CACHED_STATEMENTS = 256
+# 구문 하나의 최대 실행 시간(초) - 넘으면 "interrupted" 오류로 중단
+DEFAULT_STATEMENT_TIMEOUT = 10.0
+# progress handler 호출 간격 (SQLite VM 명령 수)
+PROGRESS_HANDLER_OPS = 1000
+
+
+@contextmanager
+def statement_deadline(conn: sqlite3.Connection, seconds):
+    """
+    블록 안에서 실행되는 구문이 seconds를 넘기면 SQLite가 중단하도록 설정
+    (seconds가 None/0이면 제한 없음)
+    """
+    if not seconds:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_HANDLER_OPS)
+    try:
+        yield
+    finally:
+        conn.set_progress_handler(None, PROGRESS_HANDLER_OPS)
+
+
+def bump_write_generation(conn: sqlite3.Connection):
+    """
+    쓰기 세대(PRAGMA user_version)를 1 올림
+    쓰기 쿼리와 같은 트랜잭션 안에서 커밋 직전에 호출하면 데이터가 바뀔 때만
+    값이 달라지므로, 다른 프로세스(answer_cache 등)가 DB 상태 지문으로 사용할 수 있음
+    """
+    generation = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.execute(f"PRAGMA user_version = {(generation + 1) & 0x7FFFFFFF}")
+
+
+def _default_readers() -> int:
+    """ThreadPoolExecutor 기본값과 같은 규칙으로 읽기 워커 수 결정"""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class ConnectionPool:
+    """
+    읽기 전용 커넥션(워커 스레드별) + 쓰기 커넥션(1개)을 관리하는 풀
+
+    - read()/write()        : 호출한 스레드에서 바로 실행 (벤치마크, 스크립트용)
+    - run_read()/run_write(): 전용 스레드 풀에서 실행하는 코루틴 (MCP Tool용)
+
+    fn은 항상 fn(conn, *args) 형태로 호출됩니다.
+    """
+
+    def __init__(self, db_path: str, max_readers: int = None,
+                 mmap_size: int = DEFAULT_MMAP_SIZE,
+                 busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+                 statement_timeout: float = DEFAULT_STATEMENT_TIMEOUT):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"데이터베이스 파일을 찾을 수 없습니다: {db_path}")
+
+        self.db_path = db_path
+        self.max_readers = max_readers or _default_readers()
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.statement_timeout = statement_timeout
+
+        self._local = threading.local()
+        self._readers = []                  # 종료 시 닫기 위해 보관
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._close_hooks = []              # 종료 시 호출할 정리 함수
+
+        # 쓰기 커넥션을 먼저 열어 WAL 모드로 전환해 두어야
+        # 읽기 전용 커넥션이 -wal/-shm 파일을 그대로 사용할 수 있음
+        self._writer = self._open_writer()
+
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=self.max_readers, thread_name_prefix="chinook-reader")
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="chinook-writer")
+
+    # -----------------------------------------------------
+    # 커넥션 생성
+    # -----------------------------------------------------
+    def _configure(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+
+    def _open_writer(self) -> sqlite3.Connection:
+        # 쓰기 커넥션은 쓰기 전용 스레드에서만 사용하지만 생성/종료는 메인 스레드에서 함
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        self._configure(conn)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        self._configure(conn)
+        # 읽기 커넥션으로 잘못 들어온 쓰기 쿼리는 SQLite 단에서 거부
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """현재 스레드 전용 읽기 커넥션 반환 (처음 호출 시 생성)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_reader()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def open_reader(self) -> sqlite3.Connection:
+        """풀에서 관리하지 않는 별도 읽기 커넥션 (호출자가 직접 close)"""
+        return self._open_reader()
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        return self._writer
+
+    # -----------------------------------------------------
+    # 동기 실행
+    # -----------------------------------------------------
+    def read(self, fn, *args):
+        conn = self.reader()
+        with statement_deadline(conn, self.statement_timeout):
+            return fn(conn, *args)
+
+    def write(self, fn, *args):
+        with self._write_lock, statement_deadline(self._writer, self.statement_timeout):
+            return fn(self._writer, *args)
+
+    # -----------------------------------------------------
+    # 비동기 실행 (이벤트 루프 밖의 스레드 풀에서 실행)
+    # -----------------------------------------------------
+    async def run_read(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self.read, fn, *args)
+
+    async def run_write(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._write_executor, self.write, fn, *args)
+
+    # -----------------------------------------------------
+    # 종료
+    # -----------------------------------------------------
+    def on_close(self, fn):
+        """풀 종료 시 (실행 중인 작업이 끝난 뒤, 커넥션을 닫기 전) fn()을 호출"""
+        self._close_hooks.append(fn)
+
+    def close(self):
+        self._read_executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+        for fn in self._close_hooks:
+            fn()
+        self._close_hooks.clear()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._writer.close()
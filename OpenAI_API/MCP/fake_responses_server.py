@@ -0,0 +1,186 @@
+# ---------------------------------------------------------
+# Responses API 로컬 대체 서버 (테스트/벤치마크용)
+# ---------------------------------------------------------
+# OpenAI 키나 네트워크 없이 responses_db_api의 배치/스트리밍 모드를 시험하기 위한
+# 최소한의 POST /v1/responses 구현입니다.
+# - --latency: 응답마다 고정 지연 (모델 호출 시간 흉내)
+# - --approval-rate: 첫 응답이 mcp_approval_request를 돌려줄 확률
+# - --rate-limit-rate: 429 (Retry-After 포함)를 돌려줄 확률
+# - "stream": true 요청에는 SSE 이벤트로 응답 (text delta를 단어 단위로 나눠 전송,
+#   첫 delta까지 지연의 30%, 나머지는 단어마다 나눠서 대기)
+# 답변에는 원래 질문이 그대로 들어가므로, previous_response_id 체인이
+# 섞이지 않았는지 결과 파일에서 바로 확인할 수 있습니다.
+#
+# 실행 예:
+#   python fake_responses_server.py --port 8765 --latency 0.5 --approval-rate 0.3
+#   OPENAI_API_KEY=test python responses_db_api.py --batch questions.txt \
+#       --base-url http://127.0.0.1:8765/v1 --concurrency 32
+# ---------------------------------------------------------
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeResponses:
+    """응답 ID -> 원래 질문 기록 (승인 후속 요청에서 체인 확인용)"""
+
+    def __init__(self, latency: float, approval_rate: float, rate_limit_rate: float):
+        self.latency = latency
+        self.approval_rate = approval_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.questions = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def create(self, body: dict) -> dict:
+        prev = body.get("previous_response_id")
+        with self.lock:
+            self.requests += 1
+            prev_question = self.questions.get(prev)
+        data = body.get("input")
+
+        if isinstance(data, list) and any(i.get("type") == "mcp_approval_response" for i in data):
+            # 승인 후속 요청: 이전 응답의 질문으로 답변
+            if prev_question is None:
+                raise KeyError(f"unknown previous_response_id: {prev}")
+            question = prev_question
+            output = [_message(f"[stand-in] {question} (approved, prev={prev})")]
+        else:
+            question = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+            if random.random() < self.approval_rate:
+                output = [_approval_request(body)]
+            else:
+                output = [_message(f"[stand-in] {question} (prev={prev})")]
+
+        response_id = f"resp_{uuid.uuid4().hex}"
+        with self.lock:
+            self.questions[response_id] = question
+        return {
+            "id": response_id,
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "status": "completed",
+            "output": output,
+            "previous_response_id": prev,
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": body.get("tools", []),
+        }
+
+
+def _message(text: str) -> dict:
+    return {
+        "type": "message",
+        "id": f"msg_{uuid.uuid4().hex}",
+        "role": "assistant",
+        "status": "completed",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+
+
+def _approval_request(body: dict) -> dict:
+    label = next((t.get("server_label") for t in body.get("tools", []) if t.get("type") == "mcp"),
+                 "stand-in")
+    return {
+        "type": "mcp_approval_request",
+        "id": f"mcpr_{uuid.uuid4().hex}",
+        "server_label": label,
+        "name": "execute_sql_query",
+        "arguments": json.dumps({"query": "SELECT 1"}),
+    }
+
+
+def make_handler(fake: FakeResponses):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"      # keep-alive 연결 재사용
+
+        def _send(self, status: int, payload: dict, headers: dict = None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/responses"):
+                return self._send(404, {"error": {"message": f"not found: {self.path}"}})
+            if random.random() < fake.rate_limit_rate:
+                return self._send(429, {"error": {"message": "rate limited (stand-in)",
+                                                  "type": "rate_limit_exceeded"}},
+                                  {"Retry-After": "0.1"})
+            try:
+                response = fake.create(body)
+            except KeyError as e:
+                return self._send(400, {"error": {"message": str(e)}})
+            if body.get("stream"):
+                return self._stream(response)
+            time.sleep(fake.latency)
+            self._send(200, response)
+
+        def _stream(self, response: dict):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            seq = iter(range(1_000_000))
+
+            def emit(event_type: str, **fields):
+                event = {"type": event_type, "sequence_number": next(seq), **fields}
+                self.wfile.write(f"event: {event_type}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                                 .encode("utf-8"))
+                self.wfile.flush()
+
+            emit("response.created", response={**response, "status": "in_progress", "output": []})
+            time.sleep(fake.latency * 0.3)
+            for index, item in enumerate(response["output"]):
+                if item["type"] != "message":
+                    emit("response.output_item.added", output_index=index, item=item)
+                    emit("response.output_item.done", output_index=index, item=item)
+                    continue
+                emit("response.output_item.added", output_index=index,
+                     item={**item, "status": "in_progress", "content": []})
+                words = item["content"][0]["text"].split(" ")
+                for i, word in enumerate(words):
+                    emit("response.output_text.delta", item_id=item["id"], output_index=index,
+                         content_index=0, delta=word if i == 0 else " " + word, logprobs=[])
+                    time.sleep(fake.latency * 0.7 / len(words))
+                emit("response.output_item.done", output_index=index, item=item)
+            emit("response.completed", response=response)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Responses API 로컬 대체 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="응답 지연(초)")
+    parser.add_argument("--approval-rate", type=float, default=0.3)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    fake = FakeResponses(args.latency, args.approval_rate, args.rate_limit_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(fake))
+    server.daemon_threads = True
+    print(f"Responses 대체 서버: http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n종료 (요청 {fake.requests}건)")
+
+
+if __name__ == "__main__":
+    main()
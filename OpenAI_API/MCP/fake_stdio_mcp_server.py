@@ -0,0 +1,43 @@
+# ---------------------------------------------------------
+# stdio MCP 로컬 대체 서버 (mcp_pool.py 테스트/벤치마크용)
+# ---------------------------------------------------------
+# `npx -y @playwright/mcp@latest` 대신 띄워서 기동 시간과 재시작을 시험합니다.
+# - --startup-delay: 서버가 응답하기 전까지 지연 (패키지 해석/브라우저 준비 흉내)
+# - Tool: echo(text), sleep(seconds), crash() - crash는 프로세스를 즉시 종료
+#
+# 실행 예 (직접 실행할 일은 거의 없고 bench_mcp_pool.py가 띄움):
+#   python fake_stdio_mcp_server.py --startup-delay 2
+# ---------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import time
+
+from fastmcp import FastMCP
+
+mcp = FastMCP("fake_stdio_server")
+
+
+@mcp.tool(description="입력한 문자열을 그대로 돌려줍니다.")
+def echo(text: str) -> str:
+    return text
+
+
+@mcp.tool(description="지정한 시간(초)만큼 기다린 뒤 끝납니다.")
+async def sleep(seconds: float = 0.1) -> str:
+    await asyncio.sleep(seconds)
+    return f"slept {seconds}s"
+
+
+@mcp.tool(description="서버 프로세스를 즉시 종료합니다. (재시작 시험용)")
+def crash() -> str:
+    os._exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="stdio MCP 대체 서버")
+    parser.add_argument("--startup-delay", type=float, default=0.0, help="기동 지연(초)")
+    args = parser.parse_args()
+    time.sleep(args.startup_delay)
+    mcp.run()       # 기본 전송 방식: stdio
@@ -0,0 +1,79 @@
+# ---------------------------------------------------------
+# Open-Meteo forecast API 로컬 대체 서버 (테스트용)
+# ---------------------------------------------------------
+# GET /v1/forecast?latitude=..&longitude=..&current=temperature_2m 에
+# 좌표로 만든 가짜 기온을 돌려줍니다. (같은 좌표 -> 같은 값)
+# - --latency: 응답 지연(초)
+# - 받은 요청 수는 GET /stats 로 확인
+#
+# 실행 예:
+#   python fake_weather_server.py --port 8766 --latency 0.5
+#   OPEN_METEO_URL=http://127.0.0.1:8766 python tool_mcp.py
+# ---------------------------------------------------------
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_handler(latency: float, counter: dict):
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                return self._send(200, counter)
+            if url.path != "/v1/forecast":
+                return self._send(404, {"error": True, "reason": f"not found: {url.path}"})
+            query = parse_qs(url.query)
+            try:
+                lat = float(query["latitude"][0])
+                lon = float(query["longitude"][0])
+            except (KeyError, ValueError):
+                return self._send(400, {"error": True, "reason": "latitude/longitude required"})
+            with lock:
+                counter["requests"] += 1
+            time.sleep(latency)
+            temp = round(30 - abs(lat) * 0.5 + (lon % 7), 1)
+            self._send(200, {"latitude": lat, "longitude": lon,
+                             "current": {"time": time.strftime("%Y-%m-%dT%H:%M"),
+                                         "temperature_2m": temp}})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-Meteo 로컬 대체 서버")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.3, help="응답 지연(초)")
+    args = parser.parse_args()
+
+    counter = {"requests": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.latency, counter))
+    server.daemon_threads = True
+    print(f"날씨 대체 서버: http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n종료 (요청 {counter['requests']}건)")
+
+
+if __name__ == "__main__":
+    main()
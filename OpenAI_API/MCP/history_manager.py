@@ -0,0 +1,129 @@
+# ---------------------------------------------------------
+# 에이전트 대화 히스토리 관리 (토큰 예산 기반)
+# ---------------------------------------------------------
+# 매 턴 전체 messages를 다시 보내면 입력 토큰이 대화 길이에 비례해 계속 늘어납니다.
+# ConversationHistory는 보내는 입력의 크기를 일정하게 유지합니다.
+# - 최근 keep_turns 턴은 원문 그대로 유지
+# - 전체가 max_tokens를 넘으면 오래된 턴부터 요약(rolling summary)으로 접음
+#   요약도 summary_tokens를 넘으면 가장 오래된 요약 줄부터 버림
+# - pin(항목, 내용)으로 고정한 핵심 정보(목적지, 날짜 등)는 요약되지 않고 항상 포함
+# - 토큰 수는 tiktoken으로 계산 (없으면 글자 수 기반 추정)
+#
+# 요약 함수는 summarizer(턴의 메시지 목록) -> 요약 문자열 로 바꿔 끼울 수 있습니다.
+# 기본값은 모델 호출 없이 각 메시지의 첫 문장만 남기는 방식입니다.
+# ---------------------------------------------------------
+
+import re
+from typing import Callable, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:     # 토큰 수를 글자 수로 추정
+    tiktoken = None
+
+DEFAULT_MAX_TOKENS = 3000
+DEFAULT_KEEP_TURNS = 6
+DEFAULT_SUMMARY_TOKENS = 600
+MESSAGE_OVERHEAD = 4        # 메시지 하나당 역할/구분자 토큰
+SUMMARY_LINE_CHARS = 160
+
+
+class TokenCounter:
+    def __init__(self, encoding_name: str = "o200k_base"):
+        self.enc = tiktoken.get_encoding(encoding_name) if tiktoken else None
+
+    def __call__(self, text: str) -> int:
+        if self.enc is not None:
+            return len(self.enc.encode(text))
+        # 대략 영문 4글자, 한글 1.5글자당 1토큰
+        ascii_chars = sum(1 for c in text if ord(c) < 128)
+        return ascii_chars // 4 + int((len(text) - ascii_chars) / 1.5) + 1
+
+
+def first_sentence_summary(messages: List[dict]) -> str:
+    """모델 호출 없는 기본 요약: 메시지마다 첫 문장만 남김"""
+    parts = []
+    for msg in messages:
+        text = re.sub(r"\s+", " ", msg["content"]).strip()
+        sentence = re.split(r"(?<=[.!?。])\s", text, maxsplit=1)[0]
+        if len(sentence) > SUMMARY_LINE_CHARS:
+            sentence = sentence[:SUMMARY_LINE_CHARS - 1] + "…"
+        parts.append(f"{'사용자' if msg['role'] == 'user' else '에이전트'}: {sentence}")
+    return " / ".join(parts)
+
+
+class ConversationHistory:
+    """최근 K턴 원문 + 이전 대화 요약 + 고정 정보로 입력을 구성"""
+
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS, keep_turns: int = DEFAULT_KEEP_TURNS,
+                 summary_tokens: int = DEFAULT_SUMMARY_TOKENS, encoding_name: str = "o200k_base",
+                 summarizer: Optional[Callable[[List[dict]], str]] = None):
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+        self.count = TokenCounter(encoding_name)
+        self.summarizer = summarizer or first_sentence_summary
+
+        self.turns: List[List[dict]] = []       # 턴 = [user 메시지, assistant 메시지, ...]
+        self._turn_tokens: List[int] = []
+        self.summary: List[str] = []            # 요약 줄 (오래된 순)
+        self._summary_line_tokens: List[int] = []
+        self.facts: Dict[str, str] = {}
+        self.folded_turns = 0
+
+    # -----------------------------------------------------
+    # 기록
+    # -----------------------------------------------------
+    def add(self, role: str, content: str):
+        """user 메시지는 새 턴을 시작, 그 외는 현재 턴에 추가"""
+        if role == "user" or not self.turns:
+            self.turns.append([])
+            self._turn_tokens.append(0)
+        self.turns[-1].append({"role": role, "content": content})
+        self._turn_tokens[-1] += self.count(content) + MESSAGE_OVERHEAD
+
+    def pin(self, key: str, value: str):
+        """요약되지 않고 항상 입력에 포함되는 핵심 정보"""
+        self.facts[key] = value
+
+    # -----------------------------------------------------
+    # 입력 구성
+    # -----------------------------------------------------
+    def _context_text(self) -> Optional[str]:
+        parts = []
+        if self.facts:
+            parts.append("[고정 정보]\n" + "\n".join(f"- {k}: {v}" for k, v in self.facts.items()))
+        if self.summary:
+            parts.append("[이전 대화 요약]\n" + "\n".join(f"- {line}" for line in self.summary))
+        return "\n\n".join(parts) if parts else None
+
+    def _context_tokens(self) -> int:
+        facts = sum(self.count(f"- {k}: {v}") for k, v in self.facts.items())
+        return facts + sum(self._summary_line_tokens) + (MESSAGE_OVERHEAD + 10 if self.facts or self.summary else 0)
+
+    def token_count(self) -> int:
+        """messages()가 돌려줄 입력의 대략적인 토큰 수"""
+        return self._context_tokens() + sum(self._turn_tokens)
+
+    def _fold_oldest_turn(self):
+        turn = self.turns.pop(0)
+        self._turn_tokens.pop(0)
+        line = self.summarizer(turn)
+        self.summary.append(line)
+        self._summary_line_tokens.append(self.count(f"- {line}"))
+        self.folded_turns += 1
+        while sum(self._summary_line_tokens) > self.summary_tokens and len(self.summary) > 1:
+            self.summary.pop(0)
+            self._summary_line_tokens.pop(0)
+
+    def messages(self) -> List[dict]:
+        """예산을 넘으면 오래된 턴을 요약으로 접은 뒤, 보낼 입력 목록 반환"""
+        while self.token_count() > self.max_tokens and len(self.turns) > self.keep_turns:
+            self._fold_oldest_turn()
+        out = []
+        context = self._context_text()
+        if context:
+            out.append({"role": "system", "content": context})
+        for turn in self.turns:
+            out.extend(turn)
+        return out
@@ -0,0 +1,131 @@
+# ---------------------------------------------------------
+# mcp_server용 재고 인덱스
+# ---------------------------------------------------------
+# - 이름 정렬 리스트: 목록 페이지 조회, 접두어 검색 (bisect)
+# - 부분 문자열 검색: 정렬된 이름을 "\n"으로 이은 문자열에서 str.find
+# - (가격, 이름) 정렬 리스트: 가격 범위 조회, 최저가/최고가 N개
+#
+# 몇 개씩 바뀌는 쓰기는 제자리에서 갱신하고, 대량 쓰기 후에는
+# 다음 조회 때 한 번만 다시 정렬합니다.
+# ---------------------------------------------------------
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 이보다 많은 아이템이 한 번에 바뀌면 제자리 갱신 대신 다음 조회 때 재정렬
+REBUILD_MIN_BATCH = 1000
+
+
+class InventoryIndex:
+    """재고 dict를 기준으로 한 이름/가격 정렬 인덱스"""
+
+    def __init__(self, items: Dict[str, float]):
+        self.items = items
+        self._names: List[str] = []
+        self._by_price: List[Tuple[float, str]] = []
+        self._joined: Optional[str] = None     # 부분 문자열 검색용 ("\n" + 이름 + "\n" ...)
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # 인덱스 유지
+    # -----------------------------------------------------
+    def _ensure(self):
+        """대량 변경 후 첫 조회에서 전체 재정렬 (락 보유 상태에서 호출)"""
+        if self._dirty:
+            self._names = sorted(self.items)
+            self._by_price = sorted((price, name) for name, price in self.items.items())
+            self._joined = None
+            self._dirty = False
+
+    def update(self, entries: Iterable[Tuple[str, float]], old_prices: Dict[str, Optional[float]]):
+        """
+        items dict에 entries가 반영된 직후 호출
+        old_prices: 반영 전 가격 (새 아이템이면 None)
+        """
+        entries = list(entries)
+        with self._lock:
+            if self._dirty:
+                return
+            if len(entries) > max(REBUILD_MIN_BATCH, len(self._names) // 100):
+                self._dirty = True
+                return
+            current = dict(old_prices)
+            for name, price in entries:
+                old = current.get(name)
+                if old is None:
+                    bisect.insort(self._names, name)
+                    self._joined = None
+                elif old != price:
+                    del self._by_price[bisect.bisect_left(self._by_price, (old, name))]
+                if old != price:
+                    bisect.insort(self._by_price, (price, name))
+                current[name] = price
+
+    # -----------------------------------------------------
+    # 조회
+    # -----------------------------------------------------
+    def _with_prices(self, names: Iterable[str]) -> List[Tuple[str, float]]:
+        return [(name, self.items[name]) for name in names]
+
+    def list_page(self, limit: int, offset: int = 0) -> List[Tuple[str, float]]:
+        with self._lock:
+            self._ensure()
+            return self._with_prices(self._names[offset:offset + limit])
+
+    def search_prefix(self, prefix: str, limit: int, offset: int = 0) -> List[Tuple[str, float]]:
+        with self._lock:
+            self._ensure()
+            start = bisect.bisect_left(self._names, prefix) + offset
+            result = []
+            for name in self._names[start:start + limit]:
+                if not name.startswith(prefix):
+                    break
+                result.append(name)
+            return self._with_prices(result)
+
+    def search_substring(self, text: str, limit: int, offset: int = 0) -> List[Tuple[str, float]]:
+        if not text:
+            return self.list_page(limit, offset)
+        if "\n" in text:
+            return []
+        with self._lock:
+            self._ensure()
+            if self._joined is None:
+                self._joined = "\n" + "\n".join(self._names) + "\n"
+            joined = self._joined
+
+        # C 수준의 str.find로 훑고, 찾은 위치가 속한 줄(이름)만 잘라냄
+        names, skipped, pos = [], 0, 0
+        while len(names) < limit:
+            pos = joined.find(text, pos)
+            if pos < 0:
+                break
+            start = joined.rfind("\n", 0, pos) + 1
+            end = joined.find("\n", pos)
+            if skipped < offset:
+                skipped += 1
+            else:
+                names.append(joined[start:end])
+            pos = end + 1       # 같은 이름 안의 다음 일치는 건너뜀
+        return self._with_prices(names)
+
+    def price_range(self, min_price: float, max_price: float,
+                    limit: int, offset: int = 0) -> List[Tuple[str, float]]:
+        with self._lock:
+            self._ensure()
+            lo = bisect.bisect_left(self._by_price, min_price, key=lambda t: t[0]) + offset
+            hi = bisect.bisect_right(self._by_price, max_price, key=lambda t: t[0])
+            return [(name, price) for price, name in self._by_price[lo:min(hi, lo + limit)]]
+
+    def cheapest(self, n: int, offset: int = 0) -> List[Tuple[str, float]]:
+        with self._lock:
+            self._ensure()
+            return [(name, price) for price, name in self._by_price[offset:offset + n]]
+
+    def priciest(self, n: int, offset: int = 0) -> List[Tuple[str, float]]:
+        with self._lock:
+            self._ensure()
+            end = len(self._by_price) - offset
+            return [(name, price) for price, name in reversed(self._by_price[max(end - n, 0):max(end, 0)])]
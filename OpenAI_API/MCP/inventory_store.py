@@ -0,0 +1,175 @@
+# ---------------------------------------------------------
+# mcp_server용 영구 재고 저장소
+# ---------------------------------------------------------
+# - 메모리: {정규화된 아이템명: 가격} dict (조회는 dict 조회 한 번)
+# - 디스크:
+#   1) 스냅샷: 전체 재고를 컬럼 형태로 저장한 바이너리 파일
+#      [헤더][아이템명들을 \0으로 이은 UTF-8][가격 float64 배열]
+#   2) 쓰기 로그: 스냅샷 이후 변경분을 한 줄에 하나씩 JSON으로 추가
+# - 시작 시: 스냅샷 로드 -> 쓰기 로그 재생
+# - 쓰기 로그가 snapshot_every 건을 넘으면 새 스냅샷을 만들고 로그를 비움
+# ---------------------------------------------------------
+
+import array
+import json
+import os
+import struct
+import sys
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+SNAPSHOT_MAGIC = b"INVSNAP1"
+_HEADER = struct.Struct("<8sQQ")     # magic, 아이템 수, 아이템명 바이트 길이
+DEFAULT_SNAPSHOT_EVERY = 50_000
+
+
+class InventoryStore:
+    """스냅샷 + 추가 전용 쓰기 로그로 유지되는 재고 dict"""
+
+    def __init__(self, data_dir: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+                 fsync: bool = True):
+        self.data_dir = data_dir
+        self.snapshot_path = os.path.join(data_dir, "inventory.snapshot")
+        self.log_path = os.path.join(data_dir, "inventory.log")
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+
+        self.items: Dict[str, float] = {}
+        self._log = None
+        self._log_records = 0
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # 시작 / 종료
+    # -----------------------------------------------------
+    def open(self, seed: Dict[str, float] = None) -> Dict[str, float]:
+        """
+        디스크에서 재고를 불러옴
+        저장된 데이터가 전혀 없으면 seed로 시작하고 바로 스냅샷을 남김
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        fresh = not os.path.exists(self.snapshot_path) and not os.path.exists(self.log_path)
+
+        if os.path.exists(self.snapshot_path):
+            self.items = _read_snapshot(self.snapshot_path)
+        self._log_records = self._replay_log()
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+        if fresh and seed:
+            self.upsert(seed.items())
+            self.snapshot()
+        return self.items
+
+    def _replay_log(self) -> int:
+        if not os.path.exists(self.log_path):
+            return 0
+        with open(self.log_path, "rb") as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1     # 마지막 완전한 줄의 끝
+        lines = data[:end].splitlines()
+        try:
+            # 보통은 모든 줄이 온전하므로 JSON 배열 하나로 묶어 한 번에 파싱
+            records = json.loads(b"[" + b",".join(lines) + b"]")
+            if not all(isinstance(r, list) and len(r) == 2 for r in records):
+                raise ValueError("잘못된 기록")
+        except ValueError:
+            records = None
+        if records is not None:
+            self.items.update(records)
+            count = len(records)
+        else:
+            count = 0
+            for line in lines:
+                try:
+                    key, price = json.loads(line)
+                except ValueError:
+                    print(f"⚠️ 재고 로그의 손상된 줄을 건너뜁니다: {line[:80]!r}", file=sys.stderr)
+                    continue
+                self.items[key] = price
+                count += 1
+        if end < len(data):
+            # 비정상 종료로 마지막 줄이 잘린 경우 - 잘린 부분을 잘라내야
+            # 다음 쓰기가 그 뒤에 붙어서 함께 손상되지 않음
+            print(f"⚠️ 재고 로그 끝의 잘린 줄을 버립니다: {data[end:end + 80]!r}", file=sys.stderr)
+            with open(self.log_path, "r+b") as f:
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+        return count
+
+    def close(self):
+        with self._lock:
+            if self._log is None:
+                return
+            if self._log_records:
+                self._snapshot_locked()
+            self._log.close()
+            self._log = None
+
+    # -----------------------------------------------------
+    # 쓰기
+    # -----------------------------------------------------
+    def upsert(self, entries: Iterable[Tuple[str, float]]) -> List[Tuple[str, float]]:
+        """
+        (정규화된 아이템명, 가격) 목록을 한 번에 반영
+        쓰기 로그에는 한 번의 write + fsync로 기록
+        """
+        entries = list(entries)
+        for key, _ in entries:
+            if "\0" in key:
+                raise ValueError(f"아이템 이름에 NUL 문자를 사용할 수 없습니다: {key!r}")
+        lines = "".join(json.dumps([key, price], ensure_ascii=False) + "\n" for key, price in entries)
+
+        with self._lock:
+            self._log.write(lines)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            for key, price in entries:
+                self.items[key] = price
+            self._log_records += len(entries)
+            if self._log_records >= self.snapshot_every:
+                self._snapshot_locked()
+        return entries
+
+    def snapshot(self):
+        with self._lock:
+            self._snapshot_locked()
+
+    def _snapshot_locked(self):
+        # 임시 파일에 쓰고 교체 -> 로그 비우기 순서
+        # (교체 직후 종료되어도 로그 재생은 같은 값을 다시 넣을 뿐이라 안전)
+        tmp_path = self.snapshot_path + ".tmp"
+        _write_snapshot(tmp_path, self.items)
+        os.replace(tmp_path, self.snapshot_path)
+        self._log.truncate(0)
+        self._log.seek(0)
+        self._log_records = 0
+
+
+def _write_snapshot(path: str, items: Dict[str, float]):
+    names = "\0".join(items).encode("utf-8")
+    prices = array.array("d", items.values())
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, len(items), len(names)))
+        f.write(names)
+        f.write(prices.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_snapshot(path: str) -> Dict[str, float]:
+    # 읽기 / decode / split은 한 번씩이고, 시간 대부분은 아이템 수만큼의
+    # 문자열 생성과 dict 삽입(해시 계산)에 쓰임
+    with open(path, "rb") as f:
+        magic, count, names_len = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"재고 스냅샷 형식이 아닙니다: {path}")
+        if count == 0:
+            return {}
+        names = f.read(names_len).decode("utf-8").split("\0")
+        prices = array.array("d")
+        prices.frombytes(f.read(count * prices.itemsize))
+    if len(names) != count or len(prices) != count:
+        raise ValueError(f"재고 스냅샷이 손상되었습니다: {path}")
+    return dict(zip(names, prices))
@@ -2,26 +2,68 @@
 # FastMCP를 이용한 Chinook DB 조회 서버 예제
 # ---------------------------------------------------------
 # 기능:
-# - SQL 쿼리 실행(execute_sql_query)
+# - SQL 쿼리 실행(execute_sql_query) - 큰 결과는 페이지 단위로 반환,
+#   한 페이지에 들어가는 조회 결과는 캐시,
+#   결과 형식 선택(table/json/csv/structured), 컬럼 선택, 긴 셀 자르기
+# - 조회 전용 쿼리 실행(execute_read_query) - 클라이언트가 승인 없이 허용할 수 있는 도구
+# - 바인드 파라미터 쿼리 실행(execute_parameterized_query)
 # - 테이블 목록 조회(list_tables)
 # - 테이블 스키마 조회(get_table_schema)
+# - 전체 스키마 한 번에 조회(describe_database, 리소스 chinook://schema)
+# - 느린 쿼리 기반 인덱스 추천(advise_indexes)
+#
+# 모든 쿼리는 커넥션 풀(db_pool.py)의 스레드에서 실행되므로
+# 여러 클라이언트가 동시에 조회해도 서로를 기다리지 않습니다.
+# 조회 전에는 실행 계획으로 비용을 검사하고(db_guard.py),
+# 제한 시간을 넘긴 구문은 중단됩니다.
+# 쓰기를 커밋할 때마다 같은 트랜잭션에서 PRAGMA user_version(쓰기 세대)을
+# 올려 클라이언트의 답변 캐시(answer_cache.py)가 데이터 변경을 알 수 있게 합니다.
+# Tool별 호출 통계는 GET /metrics 에서 볼 수 있습니다. (mcp_metrics.py)
+# 실패한 호출은 ToolError로 알리므로(isError) /metrics의 오류 수에도 잡힙니다.
 # ---------------------------------------------------------
 
 from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.tools.tool import ToolResult
 from contextlib import asynccontextmanager
+import asyncio
 import sqlite3
 import os
 import sys
+import json
+import time
+from typing import Any, List, Optional
 
-# 전역 데이터베이스 연결 변수
-db_conn = None
+from db_pool import ConnectionPool, bump_write_generation, statement_deadline
+from db_paging import CursorRegistry, Page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from db_cache import ResultCache, normalize_sql
+from db_catalog import SchemaCatalog
+from db_guard import QueryGuard, explain
+from db_format import FORMATS, project, render
+from mcp_metrics import install_metrics
+
+# 전역 커넥션 풀 (읽기 커넥션 여러 개 + 쓰기 커넥션 1개)
+db_pool = None
+# 페이지 조회용 연속 커서 저장소
+db_cursors = None
+# 조회 결과 캐시 (쓰기/data_version 변경 시 자동 무효화)
+db_cache = None
+# 스키마 카탈로그 (schema_version이 바뀔 때만 다시 생성)
+db_catalog = None
+# 실행 계획 검사 + 느린 쿼리 로그
+db_guard = None
+
+# advise_indexes(apply=True)로 실제 인덱스 생성을 허용할지 여부
+ALLOW_INDEX_CREATION = False
+# 인덱스 생성은 일반 구문보다 오래 걸릴 수 있으므로 별도 제한 시간(초) 사용
+INDEX_BUILD_TIMEOUT = 120.0
 
 @asynccontextmanager
 async def lifespan(app):
     """
-    서버 시작/종료 시 데이터베이스 연결 관리
+    서버 시작/종료 시 데이터베이스 커넥션 풀 관리
     """
-    global db_conn
+    global db_pool, db_cursors, db_cache, db_catalog, db_guard
     try:
         # 서버 시작 시 데이터베이스 연결
         base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -31,107 +73,428 @@ async def lifespan(app):
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"Chinook.db 파일을 찾을 수 없습니다: {db_path}")
         
-        db_conn = sqlite3.connect(db_path)
-        db_conn.row_factory = sqlite3.Row  # 딕셔너리 형태로 결과 반환
-        print("✅ Chinook 데이터베이스 연결 성공", file=sys.stderr)
+        db_pool = ConnectionPool(db_path)
+        db_cursors = CursorRegistry(db_pool)
+        db_cache = ResultCache(db_pool)
+        print(f"✅ Chinook 데이터베이스 연결 성공 (읽기 워커 {db_pool.max_readers}개)", file=sys.stderr)
+        db_guard = QueryGuard()
+        db_catalog = SchemaCatalog()
+        tables = db_pool.read(db_catalog.get)
+        print(f"✅ 스키마 카탈로그 생성 완료 (테이블 {len(tables)}개)", file=sys.stderr)
         
         yield
     finally:
         # 서버 종료 시 연결 정리
-        if db_conn:
-            db_conn.close()
-            db_conn = None
+        if db_cache:
+            print(f"ℹ️ 결과 캐시 통계: {db_cache.stats()}", file=sys.stderr)
+            db_cache.close()
+            db_cache = None
+        if db_cursors:
+            db_cursors.close()
+            db_cursors = None
+        if db_pool:
+            db_pool.close()
+            db_pool = None
             print("✅ Chinook 데이터베이스 연결 종료", file=sys.stderr)
 
 # MCP 서버 인스턴스 생성 (서버 이름 지정, lifespan 추가)
 mcp = FastMCP("chinook_db_server", lifespan=lifespan)
+# Tool 계측 + /metrics 경로 (MCP_TRACE_FILE 환경변수가 있으면 호출별 JSONL 기록)
+metrics = install_metrics(mcp, "chinook_db_server", trace_path=os.environ.get("MCP_TRACE_FILE"))
+
+def _db_gauges() -> dict:
+    """/metrics에 함께 내보낼 DB 상태 지표"""
+    gauges = {}
+    if db_cache:
+        stats = db_cache.stats()
+        gauges["chinook_cache_hits"] = stats["hits"]
+        gauges["chinook_cache_misses"] = stats["misses"]
+        gauges["chinook_cache_bytes"] = stats["bytes"]
+        gauges["chinook_cache_invalidations"] = stats["invalidations"]
+    if db_guard:
+        gauges["chinook_slow_queries"] = len(db_guard.slow_queries())
+    return gauges
+
+metrics.add_gauges(_db_gauges)
+
+# ---------------------------------------------------------
+# 헬퍼 함수 (내부용) - 커넥션 풀의 워커 스레드에서 실행됨
+# ---------------------------------------------------------
+def _is_read_query(query: str) -> bool:
+    """읽기 커넥션으로 보낼 수 있는 조회 쿼리인지 확인"""
+    head = query.lstrip().split(None, 1)
+    return bool(head) and head[0].upper() in ("SELECT", "WITH")
+
+def _require_pool() -> ConnectionPool:
+    if db_pool is None:
+        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    return db_pool
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, sqlite3.OperationalError) and str(e) == "interrupted":
+        return f"실행 시간이 제한({db_pool.statement_timeout:g}초)을 넘어 쿼리를 중단했습니다."
+    return str(e)
+
+def _render(tool: str, page: Page, output_format: str, columns: Optional[List[str]],
+            max_cell_chars: int, warnings: List[str] = (), notes: List[str] = ()) -> str:
+    return render(project(page, columns), output_format, max_cell_chars, warnings, notes, tool)
+
+def _tool_result(text: str, output_format: str):
+    """structured 형식이면 같은 내용을 MCP structured content로도 반환"""
+    if output_format == "structured":
+        return ToolResult(content=text, structured_content=json.loads(text))
+    return text
+
+def _start_query(conn: sqlite3.Connection, query: str, page_size: int, exact_total: bool):
+    """비용 검사 -> 첫 페이지 조회 -> 실행 시간 기록"""
+    # 비용 검사에서 구한 예상 행 수를 전체 행 수 추정치로도 사용
+    estimate, warnings = db_guard.estimate(conn, query, db_catalog.get(conn))
+    started = time.perf_counter()
+    try:
+        page = db_cursors.start(conn, query, page_size, estimate, exact_total)
+    finally:
+        # 제한 시간으로 중단된 쿼리도 느린 쿼리 로그에 남김
+        db_guard.record(query, time.perf_counter() - started)
+    return page, warnings
+
+def _run_write(conn: sqlite3.Connection, query: str) -> str:
+    # INSERT, UPDATE, DELETE 등의 경우
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    try:
+        cursor.execute(query)
+        bump_write_generation(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        db_guard.record(query, time.perf_counter() - started)
+    return f"쿼리가 성공적으로 실행되었습니다. 영향받은 행: {cursor.rowcount}"
+
+def _run_select_many(conn: sqlite3.Connection, query: str,
+                     param_sets: List[List[Any]], max_rows: int):
+    """
+    같은 SELECT 구문을 파라미터 세트마다 실행하고 하나의 표로 합침
+    (구문은 커넥션의 준비된 구문 캐시에서 재사용됨)
+    첫 컬럼 param_set은 결과 행이 몇 번째 파라미터 세트에서 나왔는지 표시
+    """
+    warnings = db_guard.check(conn, query, db_catalog.get(conn), param_sets[0])
+    columns, rows, truncated = None, [], False
+    started = time.perf_counter()
+    for idx, params in enumerate(param_sets):
+        cursor = conn.execute(query, params)
+        if columns is None:
+            columns = ["param_set"] + [d[0] for d in cursor.description or ()]
+        for row in cursor:
+            if len(rows) >= max_rows:
+                truncated = True
+                break
+            rows.append((idx, *row))
+        cursor.close()
+        if truncated:
+            break
+    db_guard.record(query, time.perf_counter() - started, param_sets[0])
+    
+    notes = [f"결과가 {max_rows}행에서 잘렸습니다. 파라미터 세트를 나눠 다시 요청하세요."] if truncated else []
+    return Page(columns or [], rows, 0, len(rows), None), warnings, notes
+
+def _run_write_many(conn: sqlite3.Connection, query: str,
+                    param_sets: List[List[Any]]) -> str:
+    # 여러 파라미터 세트를 executemany로 한 트랜잭션에서 실행
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    try:
+        cursor.executemany(query, param_sets)
+        bump_write_generation(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        db_guard.record(query, time.perf_counter() - started, param_sets[0])
+    return (f"쿼리가 성공적으로 실행되었습니다. "
+            f"파라미터 세트: {len(param_sets)}개, 영향받은 행: {cursor.rowcount}")
+
+def _advise_indexes(conn: sqlite3.Connection) -> List[dict]:
+    return db_guard.advise(conn, db_catalog.get(conn))
+
+def _apply_index(conn: sqlite3.Connection, proposal: dict) -> str:
+    """
+    제안된 인덱스를 만들고, 원래 쿼리의 실행 계획이 실제로 그 인덱스를
+    사용하는지 확인 (사용하지 않으면 다시 삭제)
+    """
+    with statement_deadline(conn, INDEX_BUILD_TIMEOUT):
+        conn.execute(proposal["sql"])
+        conn.commit()
+    name = proposal["sql"].split('"')[1]
+    used = any(name in detail for q in proposal["queries"]
+               for detail in explain(conn, q["query"], q["params"]))
+    if used:
+        return f"생성됨: {name}"
+    conn.execute(f'DROP INDEX "{name}"')
+    conn.commit()
+    return f"실행 계획에서 사용되지 않아 삭제함: {name}"
+
+def _list_tables(conn: sqlite3.Connection) -> list:
+    return sorted(db_catalog.get(conn))
+
+def _find_table(tables: dict, table_name: str) -> Optional[str]:
+    """SQLite처럼 대소문자를 구분하지 않고 테이블명 찾기"""
+    if table_name in tables:
+        return table_name
+    lowered = table_name.lower()
+    return next((name for name in tables if name.lower() == lowered), None)
+
+def _describe_database(conn: sqlite3.Connection, table_names: Optional[List[str]]) -> str:
+    if table_names:
+        tables = db_catalog.get(conn)
+        table_names = [_find_table(tables, name) or name for name in table_names]
+    return db_catalog.describe(conn, table_names)
+
+def _get_table_schema(conn: sqlite3.Connection, table_name: str) -> str:
+    tables = db_catalog.get(conn)
+    name = _find_table(tables, table_name)
+    
+    if name is None:
+        raise ToolError(f"테이블 '{table_name}'을 찾을 수 없습니다.")
+    columns = tables[name]["columns"]
+    
+    # 스키마 정보 포맷팅
+    schema_lines = [f"테이블: {name}", "-" * 40]
+    schema_lines.append("컬럼명 | 타입 | NULL 허용 | 기본값")
+    schema_lines.append("-" * 40)
+    
+    for col in columns:
+        col_name = col["name"]
+        col_type = col["type"]
+        not_null = "NO" if col["not_null"] else "YES"
+        default_val = col["default"] if col["default"] else ""
+        schema_lines.append(f"{col_name} | {col_type} | {not_null} | {default_val}")
+    
+    return "\n".join(schema_lines)
 
 # ---------------------------------------------------------
 # MCP Tool 정의 - Chinook DB 조회
 # ---------------------------------------------------------
-@mcp.tool(description="SQL 쿼리를 실행하고 결과를 반환합니다.")
-def execute_sql_query(query: str) -> str:
+_FORMAT_HELP = (
+    f"output_format: {'/'.join(FORMATS)} (기본 table, json/csv가 토큰을 가장 적게 사용), "
+    "columns: 반환할 컬럼 이름 목록, max_cell_chars: 긴 텍스트 셀을 이 길이로 자름(0이면 자르지 않음)."
+)
+
+_TOTAL_HELP = (
+    "여러 페이지인 결과의 전체 행 수는 실행 계획으로 추정한 값이며, "
+    "정확한 값이 필요하면 exact_total=true를 주세요(쿼리를 한 번 더 실행하므로 느림). "
+)
+
+async def _execute_sql(tool: str, query: str, page_size: int, cursor: Optional[str],
+                       output_format: str, columns: Optional[List[str]], max_cell_chars: int,
+                       exact_total: bool = False):
+    """execute_sql_query / execute_read_query 공통 실행 경로"""
+    pool = _require_pool()
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    
+    try:
+        if output_format not in FORMATS:
+            raise ValueError(f"지원하지 않는 형식입니다: {output_format} (사용 가능: {', '.join(FORMATS)})")
+        if cursor:
+            with metrics.stage(tool, "sqlite"):
+                page = await pool.run_read(db_cursors.next, cursor, page_size)
+            with metrics.stage(tool, "format"):
+                result = _render(tool, page, output_format, columns, max_cell_chars)
+            return _tool_result(result, output_format)
+        if _is_read_query(query):
+            key = (normalize_sql(query), page_size, output_format,
+                   tuple(columns or ()), max_cell_chars, exact_total)
+            # get()은 PRAGMA data_version을 조회하므로 이벤트 루프 밖에서 실행
+            cached = await asyncio.to_thread(db_cache.get, key)
+            if cached is not None:
+                return _tool_result(cached, output_format)
+            generation = db_cache.generation
+            with metrics.stage(tool, "sqlite"):
+                page, warnings = await pool.run_read(_start_query, query, page_size, exact_total)
+            with metrics.stage(tool, "format"):
+                result = _render(tool, page, output_format, columns, max_cell_chars, warnings)
+            if page.cursor is None:
+                # 연속 커서가 있는 결과는 커서 상태에 묶여 있으므로 캐시하지 않음
+                await asyncio.to_thread(db_cache.put, key, result, generation)
+            return _tool_result(result, output_format)
+        try:
+            return await pool.run_write(_run_write, query)
+        finally:
+            # 실패한 쓰기도 일부 반영되었을 수 있으므로 항상 무효화
+            db_cache.invalidate()
+    except Exception as e:
+        raise ToolError(f"쿼리 실행 중 오류 발생: {_error_message(e)}") from e
+
+@mcp.tool(description=(
+    "SQL 쿼리를 실행하고 결과를 반환합니다. 데이터 변경(INSERT/UPDATE/DELETE 등)에 사용하고, "
+    "조회만 할 때는 execute_read_query를 사용하세요. "
+    f"SELECT 결과는 page_size행(기본 {DEFAULT_PAGE_SIZE}, 최대 {MAX_PAGE_SIZE})씩 반환되며, "
+    "행이 더 있으면 결과 끝의 cursor 값을 넘겨 다음 페이지를 조회합니다. " + _TOTAL_HELP + _FORMAT_HELP
+))
+async def execute_sql_query(query: str = "", page_size: int = DEFAULT_PAGE_SIZE,
+                            cursor: Optional[str] = None, output_format: str = "table",
+                            columns: Optional[List[str]] = None, max_cell_chars: int = 0,
+                            exact_total: bool = False):
     """
     Chinook 데이터베이스에 SQL 쿼리를 실행하고 결과를 반환합니다.
+    SELECT 쿼리는 읽기 커넥션에서 병렬로, 그 외 쿼리는 쓰기 커넥션에서 순차 실행됩니다.
+    cursor가 주어지면 query는 무시하고 이전 조회의 다음 페이지를 반환합니다.
     """
-    if db_conn is None:
-        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    return await _execute_sql("execute_sql_query", query, page_size, cursor,
+                              output_format, columns, max_cell_chars, exact_total)
+
+@mcp.tool(description=(
+    "조회 전용(SELECT/WITH) SQL을 실행하고 결과를 반환합니다. 데이터를 바꾸지 않으므로 "
+    "클라이언트가 승인 없이 호출하도록 설정할 수 있습니다. "
+    f"결과는 page_size행(기본 {DEFAULT_PAGE_SIZE}, 최대 {MAX_PAGE_SIZE})씩 반환되며, "
+    "행이 더 있으면 결과 끝의 cursor 값을 넘겨 다음 페이지를 조회합니다. " + _TOTAL_HELP + _FORMAT_HELP
+))
+async def execute_read_query(query: str = "", page_size: int = DEFAULT_PAGE_SIZE,
+                             cursor: Optional[str] = None, output_format: str = "table",
+                             columns: Optional[List[str]] = None, max_cell_chars: int = 0,
+                             exact_total: bool = False):
+    """
+    SELECT/WITH 쿼리만 실행합니다. (읽기 전용 커넥션에서 실행되므로 쓰기는 불가능)
+    """
+    if not cursor and not _is_read_query(query):
+        raise ToolError("조회 전용 도구입니다. 데이터 변경은 execute_sql_query를 사용하세요.")
+    return await _execute_sql("execute_read_query", query, page_size, cursor,
+                              output_format, columns, max_cell_chars, exact_total)
+
+@mcp.tool(description=(
+    "? 자리표시자가 있는 SQL과 바인드 파라미터로 쿼리를 실행합니다. "
+    "params에 값 목록 하나를 주거나, param_sets에 여러 값 목록을 주면 한 번의 호출로 모두 실행합니다. "
+    "(예: 여러 고객의 인보이스를 한 번에 조회) " + _FORMAT_HELP
+))
+async def execute_parameterized_query(query: str, params: Optional[List[Any]] = None,
+                                      param_sets: Optional[List[List[Any]]] = None,
+                                      output_format: str = "table",
+                                      columns: Optional[List[str]] = None,
+                                      max_cell_chars: int = 0):
+    """
+    바인드 파라미터를 사용하여 쿼리를 실행합니다.
+    SELECT는 파라미터 세트마다 같은 준비된 구문을 재사용하고,
+    그 외 쿼리는 executemany로 한 트랜잭션에서 실행합니다.
+    """
+    pool = _require_pool()
+    
+    if param_sets is None:
+        param_sets = [params or []]
+    elif params:
+        raise ToolError("params와 param_sets는 함께 사용할 수 없습니다.")
+    if not param_sets:
+        raise ToolError("param_sets가 비어 있습니다.")
+    if columns and "param_set" not in columns:
+        # 어느 파라미터 세트의 결과인지는 항상 남김
+        columns = ["param_set"] + list(columns)
     
     try:
-        cursor = db_conn.cursor()
-        cursor.execute(query)
-        
-        # SELECT 쿼리인 경우 결과 반환
-        if query.strip().upper().startswith('SELECT'):
-            rows = cursor.fetchall()
-            if not rows:
-                return "쿼리 결과가 없습니다."
-            
-            # 컬럼명 가져오기
-            columns = [description[0] for description in cursor.description]
-            
-            # 결과를 읽기 쉬운 형태로 포맷팅
-            result_lines = [" | ".join(columns)]
-            result_lines.append("-" * (len(" | ".join(columns))))
-            for row in rows:
-                result_lines.append(" | ".join(str(val) for val in row))
-            
-            return "\n".join(result_lines)
-        else:
-            # INSERT, UPDATE, DELETE 등의 경우
-            db_conn.commit()
-            return f"쿼리가 성공적으로 실행되었습니다. 영향받은 행: {cursor.rowcount}"
-            
+        if output_format not in FORMATS:
+            raise ValueError(f"지원하지 않는 형식입니다: {output_format} (사용 가능: {', '.join(FORMATS)})")
+        if _is_read_query(query):
+            key = ("params", normalize_sql(query), json.dumps(param_sets, default=str),
+                   output_format, tuple(columns or ()), max_cell_chars)
+            # get()은 PRAGMA data_version을 조회하므로 이벤트 루프 밖에서 실행
+            cached = await asyncio.to_thread(db_cache.get, key)
+            if cached is not None:
+                return _tool_result(cached, output_format)
+            generation = db_cache.generation
+            with metrics.stage("execute_parameterized_query", "sqlite"):
+                page, warnings, notes = await pool.run_read(_run_select_many, query, param_sets, MAX_PAGE_SIZE)
+            with metrics.stage("execute_parameterized_query", "format"):
+                result = _render("execute_parameterized_query", page, output_format, columns,
+                                 max_cell_chars, warnings, notes)
+            await asyncio.to_thread(db_cache.put, key, result, generation)
+            return _tool_result(result, output_format)
+        try:
+            return await pool.run_write(_run_write_many, query, param_sets)
+        finally:
+            db_cache.invalidate()
     except Exception as e:
-        return f"쿼리 실행 중 오류 발생: {str(e)}"
+        raise ToolError(f"쿼리 실행 중 오류 발생: {_error_message(e)}") from e
 
 @mcp.tool(description="Chinook 데이터베이스의 모든 테이블 목록을 반환합니다.")
-def list_tables() -> list:
+async def list_tables() -> list:
     """
     현재 연결된 데이터베이스에서 사용 가능한 모든 테이블의 이름을 리스트로 반환합니다.
     """
-    if db_conn is None:
-        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    pool = _require_pool()
     
     try:
-        cursor = db_conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
-        tables = [row[0] for row in cursor.fetchall()]
-        return tables
+        return await pool.run_read(_list_tables)
     except Exception as e:
-        return [f"테이블 목록 조회 중 오류 발생: {str(e)}"]
+        raise ToolError(f"테이블 목록 조회 중 오류 발생: {str(e)}") from e
 
 @mcp.tool(description="특정 테이블의 스키마 정보(컬럼명, 데이터 타입 등)를 조회합니다.")
-def get_table_schema(table_name: str) -> str:
+async def get_table_schema(table_name: str) -> str:
     """
     특정 테이블의 컬럼명, 데이터 타입, 제약조건 등의 스키마 정보를 조회합니다.
     """
-    if db_conn is None:
-        raise ValueError("데이터베이스가 연결되지 않았습니다.")
+    pool = _require_pool()
     
     try:
-        cursor = db_conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
-        
-        if not columns:
-            return f"테이블 '{table_name}'을 찾을 수 없습니다."
-        
-        # 스키마 정보 포맷팅
-        schema_lines = [f"테이블: {table_name}", "-" * 40]
-        schema_lines.append("컬럼명 | 타입 | NULL 허용 | 기본값")
-        schema_lines.append("-" * 40)
-        
-        for col in columns:
-            col_name = col[1]
-            col_type = col[2]
-            not_null = "NO" if col[3] else "YES"
-            default_val = col[4] if col[4] else ""
-            schema_lines.append(f"{col_name} | {col_type} | {not_null} | {default_val}")
+        return await pool.run_read(_get_table_schema, table_name)
+    except ToolError:
+        raise
+    except Exception as e:
+        raise ToolError(f"스키마 조회 중 오류 발생: {str(e)}") from e
+
+@mcp.tool(description=(
+    "Chinook 데이터베이스 전체(또는 지정한 테이블들)의 스키마를 한 번에 반환합니다. "
+    "컬럼/타입/PK/외래 키/인덱스/대략적인 행 수를 포함하므로 SQL 작성 전에 한 번만 호출하면 됩니다."
+))
+async def describe_database(table_names: Optional[List[str]] = None) -> str:
+    """
+    미리 만들어 둔 스키마 카탈로그를 텍스트로 반환합니다.
+    """
+    pool = _require_pool()
+    
+    try:
+        return await pool.run_read(_describe_database, table_names)
+    except Exception as e:
+        raise ToolError(f"스키마 조회 중 오류 발생: {str(e)}") from e
+
+@mcp.tool(description=(
+    "느린 쿼리 로그를 분석하여 Chinook 테이블에 추가하면 좋은 (커버링) 인덱스를 제안합니다. "
+    "apply=True이면 서버 설정에서 허용된 경우에 한해 인덱스를 실제로 생성합니다."
+))
+async def advise_indexes(apply: bool = False) -> str:
+    """
+    느린 쿼리 로그의 실행 계획을 보고 인덱스를 제안(또는 생성)합니다.
+    """
+    pool = _require_pool()
+    
+    try:
+        proposals = await pool.run_read(_advise_indexes)
+        if not proposals:
+            return f"제안할 인덱스가 없습니다. (느린 쿼리 로그: {len(db_guard.slow_queries())}건)"
         
-        return "\n".join(schema_lines)
+        lines = []
+        for p in proposals:
+            lines.append(f"{p['sql']}")
+            lines.append(f"  이유: {p['reason']} / 관련 쿼리 {len(p['queries'])}건, 누적 {p['total_seconds']:.2f}초")
+            if apply and ALLOW_INDEX_CREATION:
+                lines.append("  결과: " + await pool.run_write(_apply_index, p))
+        if apply and not ALLOW_INDEX_CREATION:
+            lines.append("[인덱스 생성이 허용되지 않은 서버입니다. 제안만 반환합니다.]")
+        if apply and ALLOW_INDEX_CREATION:
+            db_cache.invalidate()
+        return "\n".join(lines)
     except Exception as e:
-        return f"스키마 조회 중 오류 발생: {str(e)}"
+        raise ToolError(f"인덱스 추천 중 오류 발생: {_error_message(e)}") from e
+
+# ---------------------------------------------------------
+# MCP Resource 정의 - 스키마 카탈로그 (JSON)
+# ---------------------------------------------------------
+@mcp.resource("chinook://schema", name="chinook_schema",
+              description="Chinook 데이터베이스 스키마 카탈로그 (JSON)",
+              mime_type="application/json")
+async def schema_resource() -> str:
+    pool = _require_pool()
+    tables = await pool.run_read(db_catalog.get)
+    return json.dumps(tables, ensure_ascii=False)
 
 # ---------------------------------------------------------
 # MCP 서버 실행
@@ -139,5 +502,6 @@ def get_table_schema(table_name: str) -> str:
 if __name__ == "__main__":
     # transport="streamable-http" 방식으로 HTTP 서버 실행
     # 기본 포트는 3001번 (mcp_server와 다른 포트 사용)
+    # 계측 지표: http://localhost:3001/metrics
     mcp.run(transport="streamable-http", port=3001)
 
@@ -0,0 +1,248 @@
+# ---------------------------------------------------------
+# FastMCP 서버 공용 계측(metrics) 모듈
+# ---------------------------------------------------------
+# install_metrics(mcp, "서버이름")를 호출하면:
+# - 모든 Tool 호출을 미들웨어로 감싸서 호출 수/오류 수/지연 시간/
+#   요청·응답 바이트 크기를 Tool별로 기록
+# - streamable-http 서버에 GET /metrics 경로를 추가 (Prometheus 텍스트 형식)
+# - trace_path를 주면 호출마다 JSON 한 줄씩 기록 (JSONL)
+#   기록은 큐에 넣기만 하고 파일 쓰기는 백그라운드 스레드가 하므로
+#   디스크 지연이 Tool 지연 시간에 섞이지 않음
+#
+# Tool 내부 단계(예: SQLite 실행, 결과 포맷팅)는 metrics.stage()로 따로 잴 수 있습니다.
+# 오류 수는 Tool이 예외(ToolError 등)를 던진 호출만 셉니다. 오류 메시지를 정상 결과로
+# 돌려주는 Tool은 성공으로 집계되므로, 실패는 예외로 알려야 합니다.
+# ---------------------------------------------------------
+
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from starlette.responses import PlainTextResponse
+
+# 지연 시간(초) / 크기(바이트) 히스토그램 구간
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    """Prometheus 형식의 누적 구간 히스토그램"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)    # 마지막 칸 = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ToolMetrics:
+    """Tool별 호출 통계 저장소"""
+
+    def __init__(self, server: str, trace_path: Optional[str] = None):
+        self.server = server
+        self.trace_path = trace_path
+        self.calls = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.request_bytes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.response_bytes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.stages = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self._gauges = []       # 추가 지표를 돌려주는 함수 목록
+        self._lock = threading.Lock()
+        self._trace_queue: Optional[queue.SimpleQueue] = None
+        self._trace_thread: Optional[threading.Thread] = None
+        if trace_path:
+            self._trace_queue = queue.SimpleQueue()
+            self._trace_thread = threading.Thread(
+                target=self._trace_writer, name="mcp-metrics-trace", daemon=True)
+            self._trace_thread.start()
+            atexit.register(self.close)
+
+    # -----------------------------------------------------
+    # 기록
+    # -----------------------------------------------------
+    def observe(self, tool: str, seconds: float, ok: bool,
+                request_bytes: int, response_bytes: int):
+        with self._lock:
+            self.calls[tool] += 1
+            if not ok:
+                self.errors[tool] += 1
+            self.latency[tool].observe(seconds)
+            self.request_bytes[tool].observe(request_bytes)
+            self.response_bytes[tool].observe(response_bytes)
+        if self._trace_queue is not None:
+            self._trace_queue.put({
+                "ts": time.time(),
+                "server": self.server,
+                "tool": tool,
+                "ms": round(seconds * 1000, 3),
+                "ok": ok,
+                "request_bytes": request_bytes,
+                "response_bytes": response_bytes,
+            })
+
+    @contextmanager
+    def stage(self, tool: str, stage: str):
+        """Tool 내부 단계의 소요 시간 측정 (예: sqlite, format)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stages[(tool, stage)].observe(elapsed)
+
+    def add_gauges(self, fn: Callable[[], Dict[str, float]]):
+        """/metrics 출력 시 호출되어 {지표명: 값}을 돌려주는 함수 등록"""
+        self._gauges.append(fn)
+
+    def _trace_writer(self):
+        """큐의 기록을 열어 둔 파일에 씀 (쌓인 기록은 모아서 쓰고 한 번만 flush)"""
+        try:
+            f = open(self.trace_path, "a", encoding="utf-8")
+        except OSError as e:
+            print(f"⚠️ 트레이스 파일을 열 수 없습니다: {e}", file=sys.stderr)
+            f = None
+        stopping = False
+        while not stopping:
+            records = [self._trace_queue.get()]
+            while True:
+                try:
+                    records.append(self._trace_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in records:      # close()가 넣는 종료 표시
+                stopping = True
+                records = [r for r in records if r is not None]
+            if f is None or not records:
+                continue
+            try:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+                f.flush()
+            except OSError as e:
+                print(f"⚠️ 트레이스 기록 실패: {e}", file=sys.stderr)
+        if f is not None:
+            f.close()
+
+    def close(self):
+        """남은 트레이스 기록을 모두 쓰고 파일을 닫음"""
+        thread, self._trace_thread = self._trace_thread, None
+        if thread is not None:
+            self._trace_queue.put(None)
+            thread.join()
+
+    # -----------------------------------------------------
+    # Prometheus 텍스트 출력
+    # -----------------------------------------------------
+    def render(self) -> str:
+        server = _label(self.server)
+        out = []
+        with self._lock:
+            out += ["# HELP mcp_tool_calls_total Tool 호출 수",
+                    "# TYPE mcp_tool_calls_total counter"]
+            for tool, count in sorted(self.calls.items()):
+                out.append(f'mcp_tool_calls_total{{server="{server}",tool="{_label(tool)}"}} {count}')
+            out += ["# HELP mcp_tool_errors_total 예외(ToolError 등)로 끝난 Tool 호출 수",
+                    "# TYPE mcp_tool_errors_total counter"]
+            for tool in sorted(self.calls):
+                out.append(f'mcp_tool_errors_total{{server="{server}",tool="{_label(tool)}"}} {self.errors[tool]}')
+            for name, help_text, hists in (
+                ("mcp_tool_duration_seconds", "Tool 실행 시간(초)", self.latency),
+                ("mcp_tool_request_bytes", "Tool 인자 JSON 크기(바이트)", self.request_bytes),
+                ("mcp_tool_response_bytes", "Tool 결과 크기(바이트)", self.response_bytes),
+            ):
+                out += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for tool, hist in sorted(hists.items()):
+                    out += hist.render(name, f'server="{server}",tool="{_label(tool)}"')
+            if self.stages:
+                out += ["# HELP mcp_tool_stage_duration_seconds Tool 내부 단계별 실행 시간(초)",
+                        "# TYPE mcp_tool_stage_duration_seconds histogram"]
+                for (tool, stage), hist in sorted(self.stages.items()):
+                    labels = f'server="{server}",tool="{_label(tool)}",stage="{_label(stage)}"'
+                    out += hist.render("mcp_tool_stage_duration_seconds", labels)
+        for fn in self._gauges:
+            for name, value in fn().items():
+                out += [f"# TYPE {name} gauge", f'{name}{{server="{server}"}} {value}']
+        return "\n".join(out) + "\n"
+
+
+def _result_bytes(result) -> int:
+    """ToolResult의 content/structured_content 크기 합"""
+    size = 0
+    for block in getattr(result, "content", None) or ():
+        text = getattr(block, "text", None)
+        if text is None:
+            text = block.model_dump_json() if hasattr(block, "model_dump_json") else str(block)
+        size += len(text.encode("utf-8"))
+    structured = getattr(result, "structured_content", None)
+    if structured is not None:
+        size += len(json.dumps(structured, ensure_ascii=False, default=str).encode("utf-8"))
+    return size
+
+
+class MetricsMiddleware(Middleware):
+    """모든 tools/call 요청을 감싸서 ToolMetrics에 기록"""
+
+    def __init__(self, metrics: ToolMetrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        arguments = context.message.arguments or {}
+        request_bytes = len(json.dumps(arguments, ensure_ascii=False, default=str).encode("utf-8"))
+        started = time.perf_counter()
+        ok, result = False, None
+        try:
+            # FastMCP ToolResult에는 오류 표시가 없음 - 실패는 Tool이 예외(ToolError 등)를
+            # 던질 때만 알 수 있으므로, 예외 없이 돌아온 호출은 성공으로 기록
+            result = await call_next(context)
+            ok = True
+            return result
+        finally:
+            self.metrics.observe(tool, time.perf_counter() - started, ok,
+                                 request_bytes, _result_bytes(result))
+
+
+def install_metrics(mcp, server: str, trace_path: Optional[str] = None) -> ToolMetrics:
+    """
+    mcp 서버에 계측 미들웨어와 GET /metrics 경로를 추가하고 ToolMetrics 반환
+    (/metrics는 streamable-http/sse 전송 방식에서만 열림)
+    """
+    metrics = ToolMetrics(server, trace_path)
+    mcp.add_middleware(MetricsMiddleware(metrics))
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request):
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    return metrics
@@ -0,0 +1,320 @@
+# ---------------------------------------------------------
+# stdio MCP 서버 상주 풀 (openai-agents MCPServerStdio용)
+# ---------------------------------------------------------
+# `async with MCPServerStdio(...)`는 프로그램을 시작할 때마다
+# 패키지 해석(npx) + 프로세스 기동 비용을 먼저 치르고, 세션이 끝나면 버립니다.
+# MCPServerPool은 서버 프로세스를 한 번 띄워 두고 여러 에이전트 세션이 같이 씁니다.
+# - 지연 시작: 실제 Tool 호출(또는 Tool 목록이 필요할 때) 처음 기동
+#   tool_cache_path를 주면 지난번 Tool 목록을 디스크에서 읽어 두므로,
+#   Tool을 호출하지 않는 턴은 서버를 띄우지 않고도 진행
+# - prewarm(): 사용자가 입력하는 동안 백그라운드에서 미리 기동
+# - Tool 목록 미리 받기: 기동 직후 list_tools()로 캐시를 채움
+# - 상태 확인: health_interval마다 ping, 응답이 없으면 재시작
+#   Tool 호출이 실패했을 때도 ping으로 확인 후 재시작하고, 같은 호출은
+#   idempotent_tools로 등록한 Tool만 한 번 재시도 (나머지는 오류를 그대로 전달 -
+#   ping이 늦었을 뿐 서버가 작업을 계속하던 경우 같은 동작이 두 번 실행되지 않도록)
+# - 재시작은 호출자가 실패를 본 바로 그 서버일 때만 수행
+#   (동시에 실패한 호출들이나 상태 확인이 방금 새로 띄운 서버를 다시 죽이지 않도록)
+# - register()가 돌려주는 PooledMCPServer는 agents.mcp.MCPServer를 상속하고
+#   모든 호출을 풀의 서버에 넘김 (디스크에서 읽은 Tool 목록에도 tool_filter 적용)
+#
+# 서버마다 전용 태스크가 connect ~ cleanup을 모두 수행합니다.
+# (MCP stdio 클라이언트는 연결한 태스크에서 정리해야 하므로)
+# ---------------------------------------------------------
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+from agents.exceptions import UserError
+from agents.mcp import MCPServer, MCPServerStdio, ToolFilterContext
+from mcp.types import Tool
+
+DEFAULT_HEALTH_INTERVAL = 30.0
+DEFAULT_PING_TIMEOUT = 5.0
+
+
+class _Slot:
+    """실행 중인 서버 하나 (전용 태스크 + 준비 완료 Future + 종료 신호)"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.stop = asyncio.Event()
+
+
+class MCPServerPool:
+    """이름별 stdio MCP 서버를 지연 기동하고 재사용"""
+
+    def __init__(self, health_interval: float = DEFAULT_HEALTH_INTERVAL,
+                 ping_timeout: float = DEFAULT_PING_TIMEOUT,
+                 tool_cache_path: Optional[str] = None):
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.tool_cache_path = tool_cache_path
+        self._specs: Dict[str, dict] = {}
+        self._slots: Dict[str, _Slot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, dict] = {}
+
+    # -----------------------------------------------------
+    # 등록
+    # -----------------------------------------------------
+    def register(self, name: str, params: dict, idempotent_tools: Iterable[str] = (),
+                 **server_kwargs) -> "PooledMCPServer":
+        """
+        서버 정의만 등록하고 Agent(mcp_servers=[...])에 넣을 객체를 반환
+        (프로세스는 처음 필요할 때 기동)
+        idempotent_tools: 서버 재시작 후 다시 호출해도 되는 Tool 이름 (조회 전용 Tool 등)
+        """
+        self._specs[name] = {"params": params, "kwargs": server_kwargs,
+                             "idempotent_tools": frozenset(idempotent_tools)}
+        self._locks[name] = asyncio.Lock()
+        self.stats[name] = {"starts": 0, "restarts": 0, "start_seconds": [], "tool_cache_hits": 0}
+        return PooledMCPServer(self, name)
+
+    # -----------------------------------------------------
+    # 기동 / 재시작 / 종료
+    # -----------------------------------------------------
+    def running(self, name: str) -> Optional[MCPServerStdio]:
+        slot = self._slots.get(name)
+        if slot and slot.ready.done() and not slot.ready.cancelled() and slot.ready.exception() is None:
+            return slot.ready.result()
+        return None
+
+    async def ensure(self, name: str) -> MCPServerStdio:
+        """실행 중인 서버를 반환, 없으면 기동 (동시에 불러도 한 번만 기동)"""
+        server = self.running(name)
+        if server is not None:
+            return server
+        async with self._locks[name]:
+            slot = self._slots.get(name)
+            if slot is None or (slot.ready.done() and self.running(name) is None):
+                slot = _Slot()
+                self._slots[name] = slot
+                slot.task = asyncio.create_task(self._run(name, slot), name=f"mcp-pool:{name}")
+        return await asyncio.shield(slot.ready)
+
+    async def _run(self, name: str, slot: _Slot):
+        spec = self._specs[name]
+        server = MCPServerStdio(name=name, params=spec["params"], cache_tools_list=True, **spec["kwargs"])
+        started = time.perf_counter()
+        try:
+            await server.connect()
+            tools = await server.list_tools()       # Tool 목록 미리 받기
+            self.stats[name]["starts"] += 1
+            self.stats[name]["start_seconds"].append(round(time.perf_counter() - started, 3))
+            self._save_tools(name, tools)
+            slot.ready.set_result(server)
+            await slot.stop.wait()
+        except BaseException as e:
+            if not slot.ready.done():
+                slot.ready.set_exception(e)
+                slot.ready.exception()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            print(f"⚠️ MCP 서버 '{name}' 실행 오류: {e}", file=sys.stderr)
+        finally:
+            try:
+                await server.cleanup()
+            except Exception as e:
+                print(f"⚠️ MCP 서버 '{name}' 정리 중 오류: {e}", file=sys.stderr)
+
+    async def _stop(self, name: str):
+        slot = self._slots.pop(name, None)
+        if slot is None:
+            return
+        slot.stop.set()
+        if slot.task is not None:
+            await asyncio.gather(slot.task, return_exceptions=True)
+
+    async def restart(self, name: str, failed: Optional[MCPServerStdio] = None) -> MCPServerStdio:
+        """
+        failed: 호출자가 응답 없음을 확인한 서버
+        지금 풀의 서버가 failed가 아니면(이미 다른 호출이 재시작했거나 기동 중) 멈추지 않고
+        현재 서버를 그대로 사용
+        """
+        async with self._locks[name]:
+            if failed is None or self.running(name) is failed:
+                await self._stop(name)
+                self.stats[name]["restarts"] += 1
+        return await self.ensure(name)
+
+    def prewarm(self, *names: str) -> List[asyncio.Task]:
+        """백그라운드에서 미리 기동 (결과를 기다리지 않음)"""
+        tasks = []
+        for name in names or list(self._specs):
+            task = asyncio.create_task(self.ensure(name))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            tasks.append(task)
+        return tasks
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for name in list(self._slots):
+            await self._stop(name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # -----------------------------------------------------
+    # 상태 확인
+    # -----------------------------------------------------
+    async def check(self, name: str) -> bool:
+        """MCP ping에 제때 응답하면 True"""
+        server = self.running(name)
+        session = getattr(server, "session", None)
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), self.ping_timeout)
+            return True
+        except Exception:
+            return False
+
+    def start_health_checks(self):
+        async def loop():
+            while True:
+                await asyncio.sleep(self.health_interval)
+                for name in list(self._slots):
+                    server = self.running(name)
+                    if server is not None and not await self.check(name):
+                        print(f"⚠️ MCP 서버 '{name}' 응답 없음 - 재시작합니다.", file=sys.stderr)
+                        try:
+                            await self.restart(name, failed=server)
+                        except Exception as e:
+                            print(f"⚠️ MCP 서버 '{name}' 재시작 실패: {e}", file=sys.stderr)
+
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(loop(), name="mcp-pool:health")
+
+    # -----------------------------------------------------
+    # Tool 목록 디스크 캐시
+    # -----------------------------------------------------
+    def _cache_key(self, name: str) -> str:
+        params = self._specs[name]["params"]
+        raw = json.dumps([name, params.get("command"), params.get("args", [])], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _load_cache(self) -> dict:
+        if not self.tool_cache_path or not os.path.exists(self.tool_cache_path):
+            return {}
+        try:
+            with open(self.tool_cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_tools(self, name: str, tools: List[Tool]):
+        if not self.tool_cache_path:
+            return
+        cache = self._load_cache()
+        cache[self._cache_key(name)] = [t.model_dump(mode="json", exclude_none=True) for t in tools]
+        tmp_path = self.tool_cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.tool_cache_path)
+
+    def cached_tools(self, name: str) -> Optional[List[Tool]]:
+        entries = self._load_cache().get(self._cache_key(name))
+        if entries is None:
+            return None
+        self.stats[name]["tool_cache_hits"] += 1
+        return [Tool.model_validate(entry) for entry in entries]
+
+
+class PooledMCPServer(MCPServer):
+    """
+    Agent(mcp_servers=[...])에 넣는 MCPServer
+    실제 프로세스는 풀이 관리하며, 세션이 끝나도(cleanup) 종료하지 않음
+    """
+
+    def __init__(self, pool: MCPServerPool, name: str):
+        kwargs = pool._specs[name]["kwargs"]
+        super().__init__(use_structured_content=kwargs.get("use_structured_content", False))
+        self.pool = pool
+        self._name = name
+        # 캐시된 Tool 목록에도 실행 중인 서버와 같은 필터를 적용
+        self.tool_filter = kwargs.get("tool_filter")
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def connect(self):
+        await self.pool.ensure(self._name)
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self, run_context=None, agent=None, *args, **kwargs) -> List[Tool]:
+        server = self.pool.running(self._name)
+        if server is None:
+            # 서버가 아직 없으면 지난번 Tool 목록으로 답하고 기동은 백그라운드로
+            tools = self.pool.cached_tools(self._name)
+            if tools is not None:
+                self.pool.prewarm(self._name)
+                return await self._filter_tools(tools, run_context, agent)
+            server = await self.pool.ensure(self._name)
+        return await server.list_tools(run_context, agent, *args, **kwargs)
+
+    async def _filter_tools(self, tools: List[Tool], run_context, agent) -> List[Tool]:
+        """MCPServerStdio의 tool_filter 처리와 같은 규칙 (정적 dict / 동적 함수)"""
+        if self.tool_filter is None:
+            return tools
+        if isinstance(self.tool_filter, dict):
+            allowed = self.tool_filter.get("allowed_tool_names")
+            blocked = self.tool_filter.get("blocked_tool_names")
+            if allowed is not None:
+                tools = [t for t in tools if t.name in allowed]
+            if blocked is not None:
+                tools = [t for t in tools if t.name not in blocked]
+            return tools
+        if run_context is None or agent is None:
+            raise UserError("run_context and agent are required for dynamic tool filtering")
+        context = ToolFilterContext(run_context=run_context, agent=agent, server_name=self._name)
+        filtered = []
+        for tool in tools:
+            try:
+                keep = self.tool_filter(context, tool)
+                if inspect.isawaitable(keep):
+                    keep = await keep
+            except Exception as e:
+                # SDK와 같이 필터 오류가 난 Tool은 제외
+                print(f"⚠️ MCP 서버 '{self._name}' Tool 필터 오류 ({tool.name}): {e}", file=sys.stderr)
+                continue
+            if keep:
+                filtered.append(tool)
+        return filtered
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict], *args, **kwargs):
+        server = await self.pool.ensure(self._name)
+        try:
+            return await server.call_tool(tool_name, arguments, *args, **kwargs)
+        except Exception:
+            if self.pool.running(self._name) is server and await self.pool.check(self._name):
+                raise       # 서버는 정상 - Tool 자체의 오류
+            # 응답 없는 서버는 재시작하되, 같은 호출은 멱등 Tool만 다시 보냄
+            # (ping이 늦었을 뿐 서버가 작업을 마쳤을 수 있으므로)
+            server = await self.pool.restart(self._name, failed=server)
+            if tool_name not in self.pool._specs[self._name]["idempotent_tools"]:
+                raise
+            return await server.call_tool(tool_name, arguments, *args, **kwargs)
+
+    async def list_prompts(self, *args, **kwargs):
+        return await (await self.pool.ensure(self._name)).list_prompts(*args, **kwargs)
+
+    async def get_prompt(self, name: str, arguments: Optional[dict] = None, *args, **kwargs):
+        return await (await self.pool.ensure(self._name)).get_prompt(name, arguments, *args, **kwargs)
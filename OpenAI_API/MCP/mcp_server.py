@@ -2,24 +2,74 @@
 # FastMCP를 이용한 간단한 의류 가격 관리 서버 예제
 # ---------------------------------------------------------
 # 기능:
-# - 가격 조회(get_price)
-# - 아이템 추가/업데이트(add_item)
-# - 전체 목록 보기(list_items)
+# - 가격 조회(get_price), 여러 개 한 번에 조회(get_prices)
+# - 아이템 추가/업데이트(add_item), 여러 개 한 번에(upsert_items)
+# - 목록 보기(list_items) - limit/offset 페이지 단위
+# - 이름 검색(search_items), 가격 범위 조회(items_in_price_range),
+#   최저가/최고가 N개(top_items_by_price)
+#
+# 재고는 inventory/ 폴더에 스냅샷 + 쓰기 로그로 저장되어
+# 서버를 다시 시작해도 유지됩니다. (inventory_store.py)
+# 목록/검색 도구는 정렬 인덱스(inventory_index.py)를 사용하므로
+# 호출마다 전체 재고를 다시 정렬하지 않습니다.
+# Tool별 호출 통계는 GET /metrics 에서 볼 수 있습니다. (mcp_metrics.py)
 # ---------------------------------------------------------
 
-from typing import Dict, List, Tuple
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Dict, List, Literal, Tuple
 from fastmcp import FastMCP
 
-# MCP 서버 인스턴스 생성 (서버 이름 지정)
-mcp = FastMCP("clothing_price_server")
+from inventory_store import InventoryStore
+from inventory_index import InventoryIndex
+from mcp_metrics import install_metrics
 
-# 기본 의류 재고 (아이템명: 가격)
-INVENTORY: Dict[str, float] = {
+# 기본 의류 재고 (아이템명: 가격) - 저장된 재고가 없을 때의 초기값
+DEFAULT_INVENTORY: Dict[str, float] = {
     "t-shirt": 19.99,
     "jeans":   59.90,
     "hoodie":  39.95,
 }
 
+# 현재 재고 (서버 시작 시 디스크에서 불러온 dict로 교체됨)
+INVENTORY: Dict[str, float] = dict(DEFAULT_INVENTORY)
+# 재고 저장소 (스냅샷 + 쓰기 로그)
+store = None
+# 이름/가격 정렬 인덱스
+index = InventoryIndex(INVENTORY)
+
+# 한 번의 호출로 처리할 수 있는 최대 아이템 수
+MAX_BATCH_ITEMS = 10_000
+# 목록/검색 도구가 한 번에 반환하는 최대 아이템 수
+MAX_PAGE_ITEMS = 1000
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    서버 시작 시 재고를 디스크에서 불러오고, 종료 시 스냅샷을 남김
+    """
+    global store, INVENTORY, index
+    try:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        store = InventoryStore(os.path.join(base_dir, "inventory"))
+        INVENTORY = store.open(seed=DEFAULT_INVENTORY)
+        index = InventoryIndex(INVENTORY)
+        print(f"✅ 재고 불러오기 완료 ({len(INVENTORY)}개)", file=sys.stderr)
+        
+        yield
+    finally:
+        if store:
+            store.close()
+            store = None
+            print("✅ 재고 저장 완료", file=sys.stderr)
+
+# MCP 서버 인스턴스 생성 (서버 이름 지정, lifespan 추가)
+mcp = FastMCP("clothing_price_server", lifespan=lifespan)
+# Tool 계측 + /metrics 경로 (MCP_TRACE_FILE 환경변수가 있으면 호출별 JSONL 기록)
+metrics = install_metrics(mcp, "clothing_price_server", trace_path=os.environ.get("MCP_TRACE_FILE"))
+metrics.add_gauges(lambda: {"inventory_items": len(INVENTORY)})
+
 # ---------------------------------------------------------
 # 헬퍼 함수 (내부용)
 # ---------------------------------------------------------
@@ -27,9 +77,25 @@ def _normalize(item: str) -> str:
     """아이템 이름을 소문자 및 공백 제거 형태로 정규화"""
     return item.strip().lower()
 
-def _item_exists(item: str) -> bool:
-    """아이템 존재 여부 확인"""
-    return _normalize(item) in INVENTORY
+def _item_exists(key: str) -> bool:
+    """아이템 존재 여부 확인 (key는 이미 정규화된 이름)"""
+    return key in INVENTORY
+
+def _upsert(entries: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+    """정규화 + 음수 가격 보정 후 저장소(또는 메모리)에 반영"""
+    normalized = [(_normalize(item), max(float(price), 0.0)) for item, price in entries]
+    old_prices = {key: INVENTORY.get(key) for key, _ in normalized}
+    if store is None:
+        # lifespan 없이 import해서 쓰는 경우 (테스트 등) 메모리에만 반영
+        INVENTORY.update(normalized)
+    else:
+        store.upsert(normalized)
+    index.update(normalized, old_prices)
+    return normalized
+
+def _page_args(limit: int, offset: int) -> Tuple[int, int]:
+    """limit은 1~MAX_PAGE_ITEMS, offset은 0 이상으로 보정"""
+    return max(1, min(limit, MAX_PAGE_ITEMS)), max(0, offset)
 
 # ---------------------------------------------------------
 # MCP Tool 정의 (각 함수가 외부에서 호출 가능한 도구가 됨)
@@ -41,7 +107,26 @@ def get_price(item: str) -> Tuple[bool, float]:
     반환값: (존재여부, 가격)
     """
     key = _normalize(item)
-    return (_item_exists(key), INVENTORY.get(key, 0.0))
+    price = INVENTORY.get(key)
+    return (price is not None, price or 0.0)
+
+@mcp.tool(description=(
+    "여러 의류 품목의 가격을 한 번에 조회합니다. "
+    "각 품목마다 (item, found, price)를 요청 순서대로 반환합니다."
+))
+def get_prices(items: List[str]) -> List[Tuple[str, bool, float]]:
+    """
+    여러 아이템의 가격을 한 번의 호출로 조회
+    반환값: [(정규화된 아이템명, 존재여부, 가격), ...]
+    """
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"한 번에 최대 {MAX_BATCH_ITEMS}개까지 조회할 수 있습니다.")
+    result = []
+    for item in items:
+        key = _normalize(item)
+        price = INVENTORY.get(key)
+        result.append((key, price is not None, price or 0.0))
+    return result
 
 @mcp.tool(description="의류 품목을 추가하거나 가격을 업데이트합니다. 항상 (item, price)를 반환합니다.")
 def add_item(item: str, price: float) -> Tuple[str, float]:
@@ -49,16 +134,69 @@ def add_item(item: str, price: float) -> Tuple[str, float]:
     새로운 아이템 추가 또는 기존 아이템 가격 갱신
     음수 가격이 들어오면 0.0으로 처리
     """
-    key = _normalize(item)
-    INVENTORY[key] = max(price, 0.0)
-    return key, INVENTORY[key]
+    key, price = _upsert([(item, price)])[0]
+    return key, price
+
+@mcp.tool(description=(
+    "여러 의류 품목을 한 번에 추가하거나 가격을 업데이트합니다. "
+    "입력은 [(item, price), ...] 목록이며, 저장된 (item, price) 목록을 반환합니다."
+))
+def upsert_items(items: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+    """
+    여러 아이템을 한 번의 호출(쓰기 로그 기록 1회)로 추가/갱신
+    음수 가격은 0.0으로 처리
+    """
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"한 번에 최대 {MAX_BATCH_ITEMS}개까지 저장할 수 있습니다.")
+    return _upsert(items)
+
+@mcp.tool(description=(
+    "의류 품목과 가격 목록을 이름순으로 반환합니다. "
+    f"limit(기본 100, 최대 {MAX_PAGE_ITEMS})개씩, offset부터 반환합니다."
+))
+def list_items(limit: int = 100, offset: int = 0) -> List[Tuple[str, float]]:
+    """
+    현재 재고에 등록된 아이템과 가격을 이름순으로 한 페이지만 반환
+    """
+    limit, offset = _page_args(limit, offset)
+    return index.list_page(limit, offset)
+
+@mcp.tool(description=(
+    "이름으로 의류 품목을 검색합니다. mode='prefix'는 이름이 query로 시작하는 품목, "
+    "mode='substring'은 이름에 query가 포함된 품목을 이름순으로 반환합니다."
+))
+def search_items(query: str, mode: Literal["prefix", "substring"] = "substring",
+                 limit: int = 50, offset: int = 0) -> List[Tuple[str, float]]:
+    """
+    정렬된 이름 인덱스로 접두어/부분 문자열 검색
+    """
+    limit, offset = _page_args(limit, offset)
+    text = _normalize(query)
+    if mode == "prefix":
+        return index.search_prefix(text, limit, offset)
+    return index.search_substring(text, limit, offset)
+
+@mcp.tool(description="가격이 min_price 이상 max_price 이하인 의류 품목을 가격순으로 반환합니다.")
+def items_in_price_range(min_price: float, max_price: float,
+                         limit: int = 50, offset: int = 0) -> List[Tuple[str, float]]:
+    """
+    가격 정렬 인덱스에서 범위 조회
+    """
+    limit, offset = _page_args(limit, offset)
+    return index.price_range(min_price, max_price, limit, offset)
 
-@mcp.tool(description="모든 의류 품목과 가격 목록을 반환합니다.")
-def list_items() -> List[Tuple[str, float]]:
+@mcp.tool(description=(
+    "가장 싼(order='cheapest') 또는 가장 비싼(order='priciest') 의류 품목 n개를 반환합니다."
+))
+def top_items_by_price(n: int = 10, order: Literal["cheapest", "priciest"] = "cheapest",
+                       offset: int = 0) -> List[Tuple[str, float]]:
     """
-    현재 재고에 등록된 모든 아이템과 가격을 (정렬된) 리스트로 반환
+    가격 정렬 인덱스의 앞/뒤에서 n개 반환
     """
-    return sorted(INVENTORY.items())
+    n, offset = _page_args(n, offset)
+    if order == "priciest":
+        return index.priciest(n, offset)
+    return index.cheapest(n, offset)
 
 # ---------------------------------------------------------
 # MCP 서버 실행
@@ -66,4 +204,5 @@ def list_items() -> List[Tuple[str, float]]:
 if __name__ == "__main__":
     # transport="streamable-http" 방식으로 HTTP 서버 실행
     # 기본 포트는 3000번
+    # 계측 지표: http://localhost:3000/metrics
     mcp.run(transport="streamable-http", port=3000)
\ No newline at end of file
@@ -0,0 +1,172 @@
+# ---------------------------------------------------------
+# responses_db_api용 배치 질문 모드
+# ---------------------------------------------------------
+# 파일에 담긴 질문 여러 개를 AsyncOpenAI 클라이언트로 동시에 처리합니다.
+# - 동시 실행 수 제한: 워커 N개가 큐에서 질문을 꺼내 처리
+# - 질문(항목)마다 previous_response_id 체인을 따로 유지
+#   (승인 후속 요청, 여러 턴짜리 항목도 자기 체인만 이어감)
+# - Tool 블록/승인 정책/Tool 목록 캐시는 tool_policy.ToolPolicy가 담당
+# - 429/5xx/연결 오류는 지수 백오프 + 지터로 재시도 (Retry-After 우선)
+# - 결과는 끝나는 순서대로 JSONL 파일에 한 줄씩 기록
+# - cache(answer_cache.AnswerCache)를 주면 항목의 첫 질문은 캐시에서 먼저 찾음
+#
+# 질문 파일 형식
+# - .jsonl: {"id": "q1", "question": "..."} 또는 {"id": "q2", "turns": ["...", "..."]}
+# - 그 외: 한 줄에 질문 하나 (id는 줄 번호)
+# ---------------------------------------------------------
+
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import List, Optional
+
+from openai import (APIConnectionError, APITimeoutError, AsyncOpenAI,
+                    InternalServerError, RateLimitError)
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 6
+BACKOFF_BASE = 0.5      # 초
+BACKOFF_MAX = 30.0
+
+
+def load_questions(path: str) -> List[dict]:
+    """질문 파일 -> [{"id": ..., "turns": [...]}, ...]"""
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                turns = record.get("turns") or [record["question"]]
+                items.append({"id": str(record.get("id", lineno)), "turns": turns})
+            else:
+                items.append({"id": str(lineno), "turns": [line]})
+    return items
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def create_with_retry(client: AsyncOpenAI, max_retries: int = DEFAULT_MAX_RETRIES, **kwargs):
+    """
+    client.responses.create + 재시도
+    대기 시간: Retry-After 헤더가 있으면 그 값, 없으면 BACKOFF_BASE * 2^n (full jitter)
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await client.responses.create(**kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+            await asyncio.sleep(delay)
+
+
+async def answer_item(client: AsyncOpenAI, item: dict, model: str, policy,
+                      max_retries: int, cache=None) -> dict:
+    """항목 하나의 턴들을 자기 previous_response_id 체인으로 순서대로 처리"""
+    previous_response_id = None
+    turns, calls = [], 0
+    started = time.perf_counter()
+    for i, question in enumerate(item["turns"]):
+        turn_started = time.perf_counter()
+        # 첫 질문은 맥락이 없으므로 캐시 사용 가능
+        cached = cache.get(question) if cache is not None and i == 0 else None
+        if cached:
+            previous_response_id = cached["response_id"]
+            turns.append({"question": question, "answer": cached["answer"],
+                          "response_id": cached["response_id"], "cached": True,
+                          "seconds": round(time.perf_counter() - turn_started, 3)})
+            continue
+
+        kwargs = {"model": model, "tools": policy.tools,
+                  "input": policy.prepare_input(question, previous_response_id)}
+        if previous_response_id:
+            kwargs["previous_response_id"] = previous_response_id
+        response = await create_with_retry(client, max_retries, **kwargs)
+        policy.observe(response, new_turn=True)
+        calls += 1
+        wrote = policy.ran_write_tool(response)
+
+        # 승인 요청(쓰기 Tool)이 있으면 이 항목의 체인에 이어서 다시 요청
+        approval_responses = policy.approval_responses(response)
+        while approval_responses:
+            response = await create_with_retry(client, max_retries, model=model,
+                                               input=approval_responses, tools=policy.tools,
+                                               previous_response_id=response.id)
+            policy.observe(response)
+            calls += 1
+            wrote = wrote or policy.ran_write_tool(response)
+            approval_responses = policy.approval_responses(response)
+
+        previous_response_id = response.id
+        seconds = time.perf_counter() - turn_started
+        # 쓰기 Tool을 실행한 턴은 캐시하지 않음 (같은 질문이 다시 오면 다시 실행되어야 함)
+        if cache is not None and i == 0 and not wrote:
+            cache.put(question, response.output_text, response.id, seconds)
+        turns.append({
+            "question": question,
+            "answer": response.output_text,
+            "response_id": response.id,
+            "seconds": round(seconds, 3),
+        })
+    return {"id": item["id"], "ok": True, "turns": turns, "api_calls": calls,
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+async def run_batch(client: AsyncOpenAI, items: List[dict], output_path: str, model: str,
+                    policy, concurrency: int = DEFAULT_CONCURRENCY,
+                    max_retries: int = DEFAULT_MAX_RETRIES, cache=None) -> dict:
+    """
+    items를 동시에 최대 concurrency개씩 처리하고 결과를 output_path(JSONL)에 기록
+    반환: 요약 통계
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+    stats = {"done": 0, "failed": 0, "api_calls": 0}
+    started = time.perf_counter()
+
+    with open(output_path, "w", encoding="utf-8") as out:
+
+        async def worker():
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    result = await answer_item(client, item, model, policy, max_retries, cache)
+                    stats["api_calls"] += result["api_calls"]
+                except Exception as e:
+                    result = {"id": item["id"], "ok": False, "error": f"{type(e).__name__}: {e}"}
+                    stats["failed"] += 1
+                stats["done"] += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                if stats["done"] % 50 == 0 or stats["done"] == len(items):
+                    elapsed = time.perf_counter() - started
+                    print(f"  진행 {stats['done']}/{len(items)} "
+                          f"({stats['done'] / elapsed:.1f} 질문/s, 실패 {stats['failed']})",
+                          file=sys.stderr)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(items))))))
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["questions_per_second"] = round(len(items) / stats["seconds"], 2) if stats["seconds"] else 0.0
+    return stats
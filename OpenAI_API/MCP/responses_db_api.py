@@ -1,6 +1,10 @@
 from dotenv import load_dotenv
 from openai import OpenAI
+from tool_policy import ToolPolicy
+import argparse
+import asyncio
 import os
+import time
 
 load_dotenv()
 
@@ -23,10 +27,17 @@ local_url = "http://localhost:3001"
 # MCP 서버 엔드포인트 (로컬 테스트 시 local_url, 클라우드 사용 시 ngrok_url)
 mcp_server_url = f"{ngrok_url}/mcp" 
 
+# MCP Tool 정책 (tool_policy.py)
+# - 조회 전용 Tool은 미리 승인 -> 조회만 하는 턴은 API 호출 한 번으로 끝남
+# - Tool 블록은 여기서 한 번만 만들고, 서버의 Tool 목록은 받아 둔 것을 재사용
+tool_policy = ToolPolicy("chinook_db_server", mcp_server_url)
+
 # --------------------------------------------------------
 # 3️⃣ 대화 히스토리 관리
 # --------------------------------------------------------
 previous_response_id = None
+# 대화 히스토리를 비우고 새 대화를 시작하는 명령
+NEW_CONVERSATION_COMMANDS = ["new", "reset", "새 대화"]
 
 # --------------------------------------------------------
 # 4️⃣ MCP 승인 요청 처리 함수
@@ -34,33 +45,75 @@ previous_response_id = None
 def handle_approval_request(response):
     """
     응답에서 mcp_approval_request를 찾아 승인 처리
+    조회 전용 Tool은 애초에 승인 요청이 오지 않고(미리 승인),
+    쓰기 Tool은 tool_policy의 approve_writes 설정대로 승인 (실습용 기본값: 자동 승인)
     """
-    approval_requests = [o for o in response.output if o.type == "mcp_approval_request"]
-    
-    if not approval_requests:
-        return None
-    
-    # 모든 승인 요청을 자동으로 승인 (실습용)
-    # 실제 환경에서는 사용자에게 승인을 요청할 수 있음
-    approval_responses = []
-    for approval in approval_requests:
-        approval_responses.append({
-            "type": "mcp_approval_response",
-            "approval_request_id": approval.id,
-            "approve": True,  # 자동 승인
-        })
-    
-    return approval_responses
+    return tool_policy.approval_responses(response) or None
 
 # --------------------------------------------------------
-# 5️⃣ 메인 대화 루프
+# 5️⃣ 스트리밍 턴 처리
 # --------------------------------------------------------
-def main():
+def stream_turn(user_input, previous_response_id=None):
+    """
+    한 턴을 스트리밍으로 처리
+    - text delta는 도착하는 대로 출력
+    - 스트림 중간에 mcp_approval_request가 보이면 표시해 두고,
+      응답이 끝나는 즉시(response.completed) 승인 요청을 스트리밍으로 이어서 보냄
+    반환: (마지막 응답 ID, 마지막 응답 텍스트,
+           {"ttft": 첫 delta까지 초, "total": 전체 초, "calls": API 호출 수,
+            "wrote": 쓰기 Tool 실행 여부})
+    """
+    started = time.perf_counter()
+    ttft = None
+    calls = 0
+    wrote = False
+    request_input = tool_policy.prepare_input(user_input, previous_response_id)
+
+    while True:
+        kwargs = {"model": model, "input": request_input, "tools": tool_policy.tools, "stream": True}
+        if previous_response_id:
+            kwargs["previous_response_id"] = previous_response_id
+        calls += 1
+        response = None
+
+        with client.responses.create(**kwargs) as stream:
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    print(event.delta, end="", flush=True)
+                elif event.type == "response.output_item.done" and event.item.type == "mcp_approval_request":
+                    print(f"\n[승인 요청: {event.item.name}] 정책에 따라 응답한 뒤 이어서 요청합니다.", flush=True)
+                elif event.type in ("response.completed", "response.incomplete", "response.failed"):
+                    response = event.response
+                    break       # 연결 종료를 기다리지 않고 바로 다음 요청으로
+                elif event.type == "error":
+                    raise RuntimeError(f"스트리밍 오류: {event.message}")
+
+        if response is None:
+            raise RuntimeError("응답이 완료되지 않은 채 스트림이 끝났습니다.")
+        tool_policy.observe(response, new_turn=calls == 1)
+        wrote = wrote or tool_policy.ran_write_tool(response)
+        previous_response_id = response.id
+
+        approval_responses = handle_approval_request(response)
+        if not approval_responses:
+            break
+        request_input = approval_responses
+
+    timing = {"ttft": ttft, "total": time.perf_counter() - started, "calls": calls, "wrote": wrote}
+    return previous_response_id, response.output_text, timing
+
+# --------------------------------------------------------
+# 6️⃣ 메인 대화 루프
+# --------------------------------------------------------
+def main(stream=False, cache=None):
     global previous_response_id
     
     print("===== Chinook 데이터베이스 대화형 챗봇 시작 =====")
     print("Responses API를 사용하여 MCP 서버와 통신합니다.")
     print(f"MCP 서버 URL: {mcp_server_url}")
+    print("새 대화를 시작하려면 'new', 'reset', 또는 '새 대화'를 입력하세요.")
     print("종료하려면 'quit', 'exit', 또는 '종료'를 입력하세요.\n")
     
     while True:
@@ -75,54 +128,68 @@ def main():
                 print("챗봇을 종료합니다.")
                 break
             
+            if user_input.lower() in NEW_CONVERSATION_COMMANDS:
+                # 대화 맥락을 끊어, 다음 질문부터 다시 답변 캐시를 사용할 수 있게 함
+                previous_response_id = None
+                print("새 대화를 시작합니다.\n")
+                continue
+            
+            # 답변 캐시 확인 (answer_cache.py)
+            # 대화의 첫 질문만 사용: 후속 질문의 답은 앞 대화 맥락에 따라 달라지므로
+            # 다른 대화에서 같은 문장이 와도 재사용하면 안 됨 (새 대화 명령으로 다시 첫 질문이 됨)
+            use_cache = cache is not None and previous_response_id is None
+            if use_cache:
+                cached = cache.get(user_input)
+                if cached:
+                    # 새 대화를 캐시된 응답의 체인에서 시작 (responses_batch와 같은 방식)
+                    previous_response_id = cached["response_id"]
+                    print("\n===== RESPONSE (캐시) =====")
+                    print(cached["answer"])
+                    print(f"[캐시 조회 {cached['lookup_seconds'] * 1000:.1f}ms, 원래 {cached['seconds']:.2f}초"
+                          f" | {cache.stats_line()}]")
+                    print("=" * 50 + "\n")
+                    continue
+            turn_started = time.perf_counter()
+            
+            if stream:
+                # 스트리밍 모드: 응답을 받으면서 바로 출력
+                print("\n===== RESPONSE =====")
+                previous_response_id, response_text, timing = stream_turn(user_input, previous_response_id)
+                ttft = f"{timing['ttft']:.2f}초" if timing["ttft"] is not None else "-"
+                print(f"\n[TTFT {ttft} / 전체 {timing['total']:.2f}초 / API 호출 {timing['calls']}회]")
+                print("=" * 50 + "\n")
+                # 쓰기 Tool을 실행한 턴은 캐시하지 않음 (같은 요청이 다시 오면 다시 실행되어야 함)
+                if use_cache and not timing["wrote"]:
+                    cache.put(user_input, response_text, previous_response_id, timing["total"])
+                continue
+            
             # 입력 구성
-            # 이전 응답이 있으면 previous_response_id 사용
-            # 없으면 일반 input 사용
-            if previous_response_id:
-                # 이전 응답 ID를 사용하여 대화 히스토리 유지
-                response = client.responses.create(
-                    model=model,
-                    input=user_input,  # 단순 문자열도 가능
-                    tools=[
-                        {
-                            "type": "mcp",
-                            "server_label": "chinook_db_server",  # mcp_db_server.py의 서버 이름과 일치
-                            "server_url": mcp_server_url,
-                        }
-                    ],
-                    previous_response_id=previous_response_id,
-                )
-            else:
-                # 첫 번째 요청
-                response = client.responses.create(
-                    model=model,
-                    input=user_input,
-                    tools=[
-                        {
-                            "type": "mcp",
-                            "server_label": "chinook_db_server",
-                            "server_url": mcp_server_url,
-                        }
-                    ],
-                )
+            # 이전 응답이 있으면 previous_response_id로 대화 히스토리 유지
+            # 새 체인이면 받아 둔 Tool 목록을 input 앞에 붙여서 tools/list 왕복 생략
+            kwargs = {"previous_response_id": previous_response_id} if previous_response_id else {}
+            response = client.responses.create(
+                model=model,
+                input=tool_policy.prepare_input(user_input, previous_response_id),
+                tools=tool_policy.tools,
+                **kwargs,
+            )
+            tool_policy.observe(response, new_turn=True)
+            wrote = tool_policy.ran_write_tool(response)
             
-            # 승인 요청 처리
+            # 승인 요청 처리 (쓰기 Tool만 해당)
             approval_responses = handle_approval_request(response)
             
-            if approval_responses:
+            while approval_responses:
                 # 승인 응답과 함께 다시 요청
                 response = client.responses.create(
                     model=model,
                     input=approval_responses,
-                    tools=[
-                        {
-                            "type": "mcp",
-                            "server_label": "chinook_db_server",
-                            "server_url": mcp_server_url,
-                        }
-                    ],
+                    tools=tool_policy.tools,
                     previous_response_id=response.id,
                 )
+                tool_policy.observe(response)
+                wrote = wrote or tool_policy.ran_write_tool(response)
+                approval_responses = handle_approval_request(response)
             
             # 응답 텍스트 추출
             response_text = response.output_text
@@ -130,6 +197,9 @@ def main():
             # previous_response_id 업데이트
             previous_response_id = response.id
             
+            if use_cache and not wrote:
+                cache.put(user_input, response_text, response.id, time.perf_counter() - turn_started)
+            
             # 응답 출력
             print("\n===== RESPONSE =====")
             print(response_text)
@@ -144,9 +214,66 @@ def main():
             traceback.print_exc()
             print("=" * 50 + "\n")
 
+    if cache is not None:
+        print(cache.stats_line())
+    print(tool_policy.stats_line())
+
+# --------------------------------------------------------
+# 7️⃣ 배치 모드: 파일의 질문들을 동시에 처리 (responses_batch.py)
 # --------------------------------------------------------
-# 6️⃣ 프로그램 실행
+async def main_batch(args, cache=None):
+    from openai import AsyncOpenAI
+    from responses_batch import load_questions, run_batch
+
+    items = load_questions(args.batch)
+    # 재시도는 responses_batch에서 직접 처리 (SDK 자체 재시도는 끔)
+    async_client = AsyncOpenAI(base_url=args.base_url, max_retries=0)
+
+    print(f"===== 배치 모드: 질문 {len(items)}개, 동시 실행 {args.concurrency} =====")
+    try:
+        stats = await run_batch(async_client, items, args.output, model, tool_policy,
+                                concurrency=args.concurrency, cache=cache)
+    finally:
+        await async_client.close()
+    print(f"완료 {stats['done']}개 (실패 {stats['failed']}), API 호출 {stats['api_calls']}회, "
+          f"{stats['seconds']}초 ({stats['questions_per_second']} 질문/s)")
+    if cache is not None:
+        print(cache.stats_line())
+    print(tool_policy.stats_line())
+    print(f"결과 저장: {args.output}")
+
+# --------------------------------------------------------
+# 8️⃣ 프로그램 실행
 # --------------------------------------------------------
 if __name__ == "__main__":
-    main()
+    from answer_cache import DEFAULT_TTL, AnswerCache
+    from responses_batch import DEFAULT_CONCURRENCY
+
+    parser = argparse.ArgumentParser(description="Chinook DB 챗봇 (Responses API + MCP)")
+    parser.add_argument("--batch", help="질문 파일 (.txt: 한 줄에 하나, .jsonl: {id, question | turns})")
+    parser.add_argument("--output", default="batch_results.jsonl", help="배치 결과 JSONL 경로")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시 질문 수")
+    parser.add_argument("--base-url", help="Responses API 주소 (예: fake_responses_server.py로 테스트)")
+    parser.add_argument("--stream", action="store_true", help="대화 모드에서 응답을 스트리밍으로 출력")
+    parser.add_argument("--no-cache", action="store_true", help="답변 캐시 사용 안 함")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help="캐시된 답변 유효 시간(초)")
+    args = parser.parse_args()
+
+    # 답변 캐시: Chinook.db의 상태가 바뀌면 이전 답변은 자동으로 무효
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    cache = None
+    if not args.no_cache:
+        cache = AnswerCache(os.path.join(base_dir, "answer_cache.db"),
+                            db_path=os.path.join(base_dir, "Chinook.db"), ttl=args.cache_ttl)
+
+    try:
+        if args.batch:
+            asyncio.run(main_batch(args, cache))
+        else:
+            if args.base_url:
+                client = OpenAI(base_url=args.base_url)
+            main(stream=args.stream, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
 
@@ -1,139 +1,214 @@
 # tool_mcp.py
 import asyncio
-import requests
+import os
+import sys
+import threading
 from dotenv import load_dotenv
 
 from agents import Agent, Runner, function_tool
-from agents.mcp import MCPServerStdio
+
+from history_manager import ConversationHistory
+from mcp_pool import MCPServerPool
+from weather_client import WeatherClient
 
 load_dotenv()
 
+# 비동기 날씨 클라이언트 (weather_client.py)
+# - 연결을 재사용하고 이벤트 루프를 막지 않음 (Playwright MCP 입출력과 동시에 진행)
+# - 같은 좌표는 10분 동안 캐시, 동시에 들어온 같은 좌표 요청은 한 번만 조회
+weather = WeatherClient()
+
 @function_tool
-def get_weather(위도: float, 경도: float) -> str:
+async def get_weather(위도: float, 경도: float) -> str:
     """주어진 위도/경도 좌표의 현재 기온(°C)을 문자열로 반환"""
-    latitude = 위도
-    longitude = 경도
-    url = (
-        "https://api.open-meteo.com/v1/forecast"
-        f"?latitude={latitude}&longitude={longitude}&current=temperature_2m"
-    )
-    resp = requests.get(url, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    temp = data.get("current", {}).get("temperature_2m")
+    temp = await weather.current_temperature(위도, 경도)
     return f"{temp}°C" if temp is not None else "알 수 없음"
 
+# 대화 히스토리 (history_manager.py)
+# - 최근 6턴은 그대로, 그 이전은 요약으로 접어서 매 턴 입력 크기를 일정하게 유지
+# - 목적지/날짜 같은 핵심 정보는 remember_trip_fact로 고정 (요약되지 않음)
+history = ConversationHistory(max_tokens=3000, keep_turns=6)
+
+@function_tool
+def remember_trip_fact(항목: str, 내용: str) -> str:
+    """목적지, 여행 날짜, 인원, 예산처럼 대화 내내 유지해야 할 핵심 정보를 기록"""
+    history.pin(항목, 내용)
+    return f"기록했습니다: {항목} = {내용}"
+
+async def read_line(prompt: str) -> str:
+    """
+    입력을 기다리는 동안에도 이벤트 루프(서버 기동, 상태 확인)가 돌도록 별도 스레드에서 한 줄 읽기
+    - asyncio.to_thread(input)은 Ctrl-C 후에도 종료 시 입력 스레드를 기다려서 Enter를 누를 때까지 멈춤
+    - daemon 스레드에서 input()을 쓰면 종료 시 stdin 잠금 때문에 인터프리터가 비정상 종료
+    그래서 daemon 스레드에서 파일 디스크립터를 직접 읽음 (Ctrl-D는 EOFError)
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    print(prompt, end="", flush=True)
+
+    def deliver(line, error):
+        if future.done():       # 이미 취소됨 (Ctrl-C)
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(line)
+
+    def read():
+        chunks, error = [], None
+        try:
+            while True:
+                chunk = os.read(sys.stdin.fileno(), 4096)
+                if not chunk:
+                    if not chunks:
+                        raise EOFError
+                    break
+                chunks.append(chunk)
+                if chunk.endswith(b"\n"):
+                    break
+        except Exception as e:
+            error = e
+        line = b"".join(chunks).decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r\n")
+        try:
+            loop.call_soon_threadsafe(deliver, line, error)
+        except RuntimeError:        # 이벤트 루프가 이미 닫힘
+            pass
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
 async def main():
     
-    async with MCPServerStdio(
-        name="Playwright MCP",
+    # Playwright MCP 서버는 상주 풀에서 관리 (mcp_pool.py)
+    # - 사용자가 첫 질문을 입력하는 동안 백그라운드에서 미리 기동
+    # - 지난번 Tool 목록을 디스크에 저장해 두고 재사용, 응답이 없으면 자동 재시작
+    #   (페이지 이동/클릭 같은 브라우저 동작은 두 번 실행되면 안 되므로
+    #    idempotent_tools를 주지 않음 - 재시작 후 실패한 호출은 에이전트에게 오류로 전달)
+    pool = MCPServerPool(tool_cache_path=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      "mcp_tools_cache.json"))
+    playwright_mcp_server = pool.register(
+        "Playwright MCP",
         params={
             "command": "npx",
             "args": ["-y", "@playwright/mcp@latest"],
         },
-    ) as playwright_mcp_server:
-
-        agent = Agent(
-            name="여행 에이전트",
-            model="gpt-5-mini",  
-            instructions=(
-                "당신은 훌륭한 여행 에이전트입니다. "
-                "여행 일정을 짤 때 웹검색(Playwright MCP)도 활용하고, "
-                "가능하면 출처(URL)도 같이 표시해 주세요. "
-                "날씨가 필요하면 get_weather(위도,경도) 도구를 사용하세요. "
-            ),
-            tools=[get_weather],
-            mcp_servers=[playwright_mcp_server],
-        )
-
-        messages = []
-        print("\n 여행 에이전트와 대화를 시작합니다. 종료하려면 'exit' 입력.\n")
-
-        while True:
-            try:
-                user_input = input("\n사용자: ").strip()
-                if user_input.lower() == "exit":
-                    print("안녕히 가세요!")
-                    break
+    )
+    pool.prewarm()
+    pool.start_health_checks()
+    
+    try:
+        async with pool:
+
+            agent = Agent(
+                name="여행 에이전트",
+                model="gpt-5-mini",  
+                instructions=(
+                    "당신은 훌륭한 여행 에이전트입니다. "
+                    "여행 일정을 짤 때 웹검색(Playwright MCP)도 활용하고, "
+                    "가능하면 출처(URL)도 같이 표시해 주세요. "
+                    "날씨가 필요하면 get_weather(위도,경도) 도구를 사용하세요. "
+                    "목적지, 날짜, 인원, 예산 같은 핵심 정보가 정해지면 remember_trip_fact로 기록하세요. "
+                ),
+                tools=[get_weather, remember_trip_fact],
+                mcp_servers=[playwright_mcp_server],
+            )
+
+            print("\n 여행 에이전트와 대화를 시작합니다. 종료하려면 'exit' 입력.\n")
 
-                messages.append({"role": "user", "content": user_input})
-                print("\n여행 에이전트: ", end="", flush=True)
+            while True:
+                try:
+                    # 입력을 기다리는 동안에도 이벤트 루프(서버 기동, 상태 확인)가 돌도록 스레드에서 대기
+                    user_input = (await read_line("\n사용자: ")).strip()
+                    if user_input.lower() == "exit":
+                        print("안녕히 가세요!")
+                        break
 
-                response = await Runner.run(agent, input=messages)
-                # RunResult 객체에서 텍스트 추출
-                full = None
+                    history.add("user", user_input)
+                    print("\n여행 에이전트: ", end="", flush=True)
+
+                    response = await Runner.run(agent, input=history.messages())
+                    # RunResult 객체에서 텍스트 추출
+                    full = None
                 
-                # 1. final_output 속성 확인 (가장 우선)
-                if hasattr(response, 'final_output') and response.final_output:
-                    if isinstance(response.final_output, str):
-                        full = response.final_output
-                    elif hasattr(response.final_output, 'content'):
-                        full = response.final_output.content
-                    elif hasattr(response.final_output, 'text'):
-                        full = response.final_output.text
+                    # 1. final_output 속성 확인 (가장 우선)
+                    if hasattr(response, 'final_output') and response.final_output:
+                        if isinstance(response.final_output, str):
+                            full = response.final_output
+                        elif hasattr(response.final_output, 'content'):
+                            full = response.final_output.content
+                        elif hasattr(response.final_output, 'text'):
+                            full = response.final_output.text
                 
-                # 2. final_output_as 메서드 사용
-                if not full and hasattr(response, 'final_output_as'):
-                    try:
-                        full = response.final_output_as(str)
-                    except:
-                        pass
+                    # 2. final_output_as 메서드 사용
+                    if not full and hasattr(response, 'final_output_as'):
+                        try:
+                            full = response.final_output_as(str)
+                        except:
+                            pass
                 
-                # 3. new_items에서 텍스트 추출
-                if not full and hasattr(response, 'new_items') and response.new_items:
-                    text_items = []
-                    for item in response.new_items:
-                        # item이 텍스트 타입인 경우
-                        if hasattr(item, 'type') and item.type == 'text':
-                            if hasattr(item, 'content'):
+                    # 3. new_items에서 텍스트 추출
+                    if not full and hasattr(response, 'new_items') and response.new_items:
+                        text_items = []
+                        for item in response.new_items:
+                            # item이 텍스트 타입인 경우
+                            if hasattr(item, 'type') and item.type == 'text':
+                                if hasattr(item, 'content'):
+                                    text_items.append(str(item.content))
+                                elif hasattr(item, 'text'):
+                                    text_items.append(str(item.text))
+                            # item이 문자열인 경우
+                            elif isinstance(item, str):
+                                text_items.append(item)
+                            # item에 content 속성이 있는 경우
+                            elif hasattr(item, 'content') and item.content:
                                 text_items.append(str(item.content))
-                            elif hasattr(item, 'text'):
+                            # item에 text 속성이 있는 경우
+                            elif hasattr(item, 'text') and item.text:
                                 text_items.append(str(item.text))
-                        # item이 문자열인 경우
-                        elif isinstance(item, str):
-                            text_items.append(item)
-                        # item에 content 속성이 있는 경우
-                        elif hasattr(item, 'content') and item.content:
-                            text_items.append(str(item.content))
-                        # item에 text 속성이 있는 경우
-                        elif hasattr(item, 'text') and item.text:
-                            text_items.append(str(item.text))
                     
-                    if text_items:
-                        full = '\n'.join(text_items) if len(text_items) > 1 else text_items[0]
+                        if text_items:
+                            full = '\n'.join(text_items) if len(text_items) > 1 else text_items[0]
                 
-                # 4. raw_responses에서 텍스트 추출
-                if not full and hasattr(response, 'raw_responses') and response.raw_responses:
-                    for raw_resp in response.raw_responses:
-                        if hasattr(raw_resp, 'output_text') and raw_resp.output_text:
-                            full = raw_resp.output_text
-                            break
-                        elif hasattr(raw_resp, 'text') and raw_resp.text:
-                            full = raw_resp.text
-                            break
+                    # 4. raw_responses에서 텍스트 추출
+                    if not full and hasattr(response, 'raw_responses') and response.raw_responses:
+                        for raw_resp in response.raw_responses:
+                            if hasattr(raw_resp, 'output_text') and raw_resp.output_text:
+                                full = raw_resp.output_text
+                                break
+                            elif hasattr(raw_resp, 'text') and raw_resp.text:
+                                full = raw_resp.text
+                                break
                 
-                # 5. 최종 폴백: 디버깅 정보 출력
-                if not full:
-                    print("\n⚠️ 응답을 추출할 수 없습니다.")
-                    # 디버깅을 위해 일부 정보 출력
-                    if hasattr(response, 'new_items'):
-                        print(f"new_items 수: {len(response.new_items) if response.new_items else 0}")
-                    if hasattr(response, 'raw_responses'):
-                        print(f"raw_responses 수: {len(response.raw_responses) if response.raw_responses else 0}")
-                    if hasattr(response, 'final_output'):
-                        print(f"final_output 타입: {type(response.final_output)}")
-                    continue
+                    # 5. 최종 폴백: 디버깅 정보 출력
+                    if not full:
+                        print("\n⚠️ 응답을 추출할 수 없습니다.")
+                        # 디버깅을 위해 일부 정보 출력
+                        if hasattr(response, 'new_items'):
+                            print(f"new_items 수: {len(response.new_items) if response.new_items else 0}")
+                        if hasattr(response, 'raw_responses'):
+                            print(f"raw_responses 수: {len(response.raw_responses) if response.raw_responses else 0}")
+                        if hasattr(response, 'final_output'):
+                            print(f"final_output 타입: {type(response.final_output)}")
+                        continue
                 
-                print(full)
+                    print(full)
 
-                messages.append({"role": "assistant", "content": full})
+                    history.add("assistant", full)
                 
-            except KeyboardInterrupt:
-                print("\n\n 종료합니다.")
-                break
-            except Exception as e:
-                print(f"\n 오류 발생: {e}")
-                continue
+                except (KeyboardInterrupt, asyncio.CancelledError, EOFError):
+                    # asyncio.run 안에서 Ctrl-C는 대기 중인 await에 CancelledError로 전달됨
+                    print("\n\n 종료합니다.")
+                    break
+                except Exception as e:
+                    print(f"\n 오류 발생: {e}")
+                    continue
+
+    finally:
+        # 어떤 경로로 끝나든 날씨 클라이언트의 연결을 정리
+        await weather.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:       # 입력 대기 밖(종료 정리 중 등)에서 Ctrl-C
+        print("\n 종료합니다.")
\ No newline at end of file
@@ -0,0 +1,130 @@
+# ---------------------------------------------------------
+# responses_db_api용 MCP Tool 정책
+# ---------------------------------------------------------
+# - Tool 블록(tools=[{"type": "mcp", ...}])을 한 번만 만들어 재사용
+# - 조회 전용 Tool은 require_approval="never"로 미리 승인
+#   -> 조회만 하는 턴은 Responses 호출 한 번으로 끝남
+#   (승인은 Tool 이름 단위라서 SELECT 전용 조회는 서버의 execute_read_query로 분리)
+# - allowed_tools로 모델이 볼 수 있는 Tool을 제한
+# - 서버의 Tool 목록(mcp_list_tools 항목)을 한 번 받아 두고,
+#   새 대화 체인을 시작할 때 input 앞에 붙여서 tools/list 왕복을 생략
+# - 쓰기 Tool은 승인 요청이 오면 approve_writes 정책대로 응답
+# - ran_write_tool(): 쓰기 Tool을 실행한 응답인지 (답변 캐시에 넣지 않는 기준)
+# - 통계: API 호출 수, 절약한 승인 왕복 수, 재사용한 Tool 목록 수
+# ---------------------------------------------------------
+
+import json
+from typing import Callable, List, Optional, Union
+
+READ_ONLY_TOOLS = ("list_tables", "get_table_schema", "describe_database", "execute_read_query")
+WRITE_TOOLS = ("execute_sql_query", "execute_parameterized_query")
+
+
+def is_read_sql(query: str) -> bool:
+    """서버(mcp_db_server._is_read_query)와 같은 기준의 조회 쿼리 판별"""
+    head = query.lstrip().split(None, 1)
+    return bool(head) and head[0].upper() in ("SELECT", "WITH")
+
+
+class ToolPolicy:
+    """MCP Tool 블록 + 승인 정책 + Tool 목록 캐시"""
+
+    def __init__(self, server_label: str, server_url: str, allow_writes: bool = True,
+                 approve_writes: Union[bool, Callable] = True, cache_tool_list: bool = True):
+        """
+        allow_writes: False면 쓰기 Tool을 allowed_tools에서 제외
+        approve_writes: 쓰기 승인 요청에 대한 응답 (True/False 또는 item -> bool 함수)
+        """
+        self.allowed = list(READ_ONLY_TOOLS) + (list(WRITE_TOOLS) if allow_writes else [])
+        self.approve_writes = approve_writes
+        self.cache_tool_list = cache_tool_list
+        self.tools = [
+            {
+                "type": "mcp",
+                "server_label": server_label,      # mcp_db_server.py의 서버 이름과 일치
+                "server_url": server_url,
+                "allowed_tools": self.allowed,
+                "require_approval": {"never": {"tool_names": list(READ_ONLY_TOOLS)}},
+            }
+        ]
+        self.server_label = server_label
+        self._tool_list: Optional[dict] = None
+
+        self.turns = 0
+        self.api_calls = 0
+        self.approval_round_trips = 0
+        self.saved_round_trips = 0
+        self.tool_list_reused = 0
+
+    # -----------------------------------------------------
+    # 요청 준비
+    # -----------------------------------------------------
+    def prepare_input(self, user_input: Union[str, list], previous_response_id: Optional[str]):
+        """새 체인의 첫 요청이면 캐시된 Tool 목록을 input 앞에 붙임"""
+        if previous_response_id or self._tool_list is None or not isinstance(user_input, str):
+            return user_input
+        self.tool_list_reused += 1
+        return [self._tool_list, {"role": "user", "content": user_input}]
+
+    # -----------------------------------------------------
+    # 응답 처리
+    # -----------------------------------------------------
+    def observe(self, response, new_turn: bool = False):
+        """응답마다 호출 - Tool 목록 저장, 미리 승인으로 절약한 왕복 집계"""
+        self.api_calls += 1
+        if new_turn:
+            self.turns += 1
+        for item in response.output:
+            if item.type == "mcp_list_tools" and self.cache_tool_list and self._tool_list is None:
+                self._tool_list = item.model_dump(exclude_none=True)
+        # 미리 승인된 Tool 호출이 있는 응답은 예전 방식이라면 승인 왕복이 한 번 더 필요했음
+        if any(item.type == "mcp_call" and item.name in READ_ONLY_TOOLS for item in response.output):
+            self.saved_round_trips += 1
+
+    def _approve(self, item) -> bool:
+        if item.name in READ_ONLY_TOOLS:
+            return True
+        if item.name not in self.allowed:
+            return False
+        if item.name == "execute_sql_query":
+            try:
+                if is_read_sql(json.loads(item.arguments or "{}").get("query", "")):
+                    return True
+            except ValueError:
+                pass
+        if callable(self.approve_writes):
+            return bool(self.approve_writes(item))
+        return bool(self.approve_writes)
+
+    def ran_write_tool(self, response) -> bool:
+        """응답에 조회 전용이 아닌 Tool 실행(mcp_call)이 있는지 - 이런 턴의 답변은 캐시하지 않음"""
+        for item in response.output:
+            if item.type != "mcp_call" or item.name in READ_ONLY_TOOLS:
+                continue
+            if item.name == "execute_sql_query":
+                try:
+                    if is_read_sql(json.loads(item.arguments or "{}").get("query", "")):
+                        continue
+                except ValueError:
+                    pass
+            return True
+        return False
+
+    def approval_responses(self, response) -> List[dict]:
+        """응답의 mcp_approval_request들에 대한 승인/거부 응답 목록 (없으면 빈 목록)"""
+        approvals = [
+            {
+                "type": "mcp_approval_response",
+                "approval_request_id": item.id,
+                "approve": self._approve(item),
+            }
+            for item in response.output if item.type == "mcp_approval_request"
+        ]
+        if approvals:
+            self.approval_round_trips += 1
+        return approvals
+
+    def stats_line(self) -> str:
+        return (f"턴 {self.turns}회, API 호출 {self.api_calls}회 (승인 왕복 {self.approval_round_trips}회), "
+                f"미리 승인으로 절약한 왕복 {self.saved_round_trips}회, "
+                f"Tool 목록 재사용 {self.tool_list_reused}회")
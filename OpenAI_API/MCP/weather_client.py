@@ -0,0 +1,138 @@
+# ---------------------------------------------------------
+# tool_mcp.py용 비동기 날씨 조회 클라이언트 (Open-Meteo)
+# ---------------------------------------------------------
+# - httpx.AsyncClient 하나를 계속 사용 (keep-alive 연결 재사용, 이벤트 루프를 막지 않음)
+# - TTL 캐시: 좌표를 소수점 2자리(약 1km)로 반올림한 값을 키로 사용
+# - 요청 합치기: 같은 좌표를 동시에 여러 번 물으면 실제 요청은 한 번만 보내고
+#   나머지는 그 결과를 함께 기다림 (요청은 별도 Task로 실행하므로 처음 요청한 호출이
+#   취소되어도 함께 기다리던 호출은 결과를 그대로 받음)
+# - base_url을 바꾸면 로컬 대체 서버(fake_weather_server.py)로 시험 가능
+#   (환경 변수 OPEN_METEO_URL로도 지정 가능)
+#
+# 실행 예 (대체 서버에 같은 도시 20번 + 다른 도시 5개를 동시에 조회, 취소 전파 확인):
+#   python fake_weather_server.py --port 8766 --latency 0.5
+#   python weather_client.py --base-url http://127.0.0.1:8766
+# ---------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+DEFAULT_BASE_URL = "https://api.open-meteo.com"
+DEFAULT_TTL = 600           # 초 - Open-Meteo의 current 값은 15분 간격으로 갱신
+COORD_DECIMALS = 2
+
+
+class WeatherClient:
+    """현재 기온 조회 + TTL 캐시 + 동시 요청 합치기"""
+
+    def __init__(self, base_url: Optional[str] = None, ttl: float = DEFAULT_TTL,
+                 timeout: float = 10.0, max_connections: int = 10):
+        self.base_url = (base_url or os.environ.get("OPEN_METEO_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._http: Optional[httpx.AsyncClient] = None
+        self._cache: Dict[Tuple[float, float], Tuple[float, Optional[float]]] = {}
+        self._inflight: Dict[Tuple[float, float], asyncio.Task] = {}
+        self.requests = 0       # 실제로 보낸 HTTP 요청 수
+        self.hits = 0           # 캐시 적중
+        self.coalesced = 0      # 진행 중인 요청에 합류한 호출
+
+    def _client(self) -> httpx.AsyncClient:
+        # 이벤트 루프 안에서 처음 사용할 때 생성
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._http
+
+    async def current_temperature(self, latitude: float, longitude: float) -> Optional[float]:
+        """현재 기온(°C), 값이 없으면 None"""
+        key = (round(latitude, COORD_DECIMALS), round(longitude, COORD_DECIMALS))
+
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self.hits += 1
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._fetch_and_store(key))
+            # 기다리는 호출이 모두 취소된 뒤 실패해도 경고가 나지 않도록 결과를 조회해 둠
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        # 이 호출이 취소되면 기다리기만 멈추고, 요청 자체는 다른 호출을 위해 계속 진행
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key: Tuple[float, float]) -> Optional[float]:
+        try:
+            temp = await self._fetch(*key)
+            self._cache[key] = (time.monotonic(), temp)
+            return temp
+        finally:
+            del self._inflight[key]
+
+    async def _fetch(self, latitude: float, longitude: float) -> Optional[float]:
+        self.requests += 1
+        resp = await self._client().get("/v1/forecast", params={
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": "temperature_2m",
+        })
+        resp.raise_for_status()
+        return resp.json().get("current", {}).get("temperature_2m")
+
+    async def aclose(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+async def _demo(base_url: str):
+    weather = WeatherClient(base_url)
+    seoul = (37.5665, 126.9780)
+    others = [(35.1796, 129.0756), (33.4996, 126.5312), (35.6762, 139.6503),
+              (48.8566, 2.3522), (40.7128, -74.0060)]
+    try:
+        started = time.perf_counter()
+        temps = await asyncio.gather(*([weather.current_temperature(*seoul) for _ in range(20)]
+                                       + [weather.current_temperature(*c) for c in others]))
+        first = time.perf_counter() - started
+        started = time.perf_counter()
+        await weather.current_temperature(37.56651, 126.97801)     # 반올림하면 같은 키
+        again = time.perf_counter() - started
+        requests, coalesced = weather.requests, weather.coalesced
+
+        # 처음 요청한 호출이 취소되어도 함께 기다리던 호출은 결과를 받아야 함
+        owner = asyncio.ensure_future(weather.current_temperature(51.5074, -0.1278))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(weather.current_temperature(51.5074, -0.1278))
+        await asyncio.sleep(0)
+        owner.cancel()
+        waited = await waiter
+        assert owner.cancelled() and waited is not None, "요청한 호출 취소가 함께 기다리던 호출에 전달되었습니다."
+    finally:
+        await weather.aclose()
+    print(f"동시 호출 {len(temps)}회 -> HTTP 요청 {requests}회 "
+          f"(합쳐진 호출 {coalesced}회), {first * 1000:.0f}ms")
+    print(f"캐시 재조회: {again * 1000:.2f}ms (적중 {weather.hits}회)")
+    print("처음 요청한 호출 취소 확인: 통과")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="날씨 클라이언트 캐시/요청 합치기 확인")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8766")
+    args = parser.parse_args()
+    asyncio.run(_demo(args.base_url))
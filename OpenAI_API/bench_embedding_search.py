@@ -0,0 +1,114 @@
+# ---------------------------------------------------------
+# 임베딩 유사도 검색 벤치마크 (embedding_search.py)
+# ---------------------------------------------------------
+# 군집 구조가 있는 임의 임베딩(실제 리뷰 임베딩처럼 비슷한 글끼리 모임)으로 비교합니다.
+# 1) 노트북 방식: df.embedding.apply(cosine_similarity) + sort_values
+# 2) VectorIndex: 질의마다 한 번씩 / 모든 질의를 한 번에
+# 3) VectorIndex + 메타데이터 필터 (Score >= 4)
+# 4) IVFIndex: nprobe별 질의당 지연과 recall@k (정확한 검색 결과 대비)
+#
+# 실행 예:
+#   python bench_embedding_search.py --rows 100000 --dim 256
+#   python bench_embedding_search.py --rows 1000000 --dim 256 --nprobe 4 16 64 --naive-max-rows 0
+# ---------------------------------------------------------
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from embedding_search import IVFIndex, VectorIndex, normalize
+
+
+def cosine_similarity(a, b):
+    """340_Embeddings.ipynb와 같은 함수"""
+    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+
+
+def make_data(rows: int, queries: int, dim: int, clusters: int, noise: float, seed: int):
+    rng = np.random.default_rng(seed)
+    centers = normalize(rng.standard_normal((clusters, dim), dtype=np.float32))
+
+    def sample(n):
+        points = centers[rng.integers(0, clusters, n)]
+        return normalize(points + noise * rng.standard_normal((n, dim), dtype=np.float32))
+
+    vectors = sample(rows)
+    metadata = pd.DataFrame({"Score": rng.integers(1, 6, rows)})
+    return vectors, metadata, sample(queries)
+
+
+def per_query_ms(fn, n_queries: int) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000 / n_queries
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(np.intersect1d(f[f >= 0], t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="정확한 검색 vs IVF 근사 검색 지연/정확도 비교")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256, help="임베딩 차원 (text-embedding-3-small은 1536)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=500, help="데이터를 만들 때의 군집 수")
+    parser.add_argument("--noise", type=float, default=0.08, help="군집 중심에서 흩어진 정도")
+    parser.add_argument("--nlist", type=int, help="IVF 군집 수 (기본: 4 x sqrt(rows))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--naive-max-rows", type=int, default=200_000, help="이보다 크면 노트북 방식 생략")
+    parser.add_argument("--naive-queries", type=int, default=3)
+    args = parser.parse_args()
+
+    vectors, metadata, queries = make_data(args.rows, args.queries, args.dim, args.clusters, args.noise, 0)
+    print(f"데이터 {args.rows:,}행 x {args.dim}차원, 질의 {args.queries}개, k={args.k}")
+    print(f"{'방식':<36} | {'질의당 지연':>12} | {'recall@k':>8}")
+
+    def report(name, ms, rec=None):
+        rec = f"{rec:8.3f}" if rec is not None else f"{'-':>8}"
+        print(f"{name:<36} | {ms:10.3f}ms | {rec}")
+
+    if args.rows <= args.naive_max_rows:
+        df = metadata.copy()
+        df["embedding"] = list(vectors)
+
+        def naive():
+            for q in queries[:args.naive_queries]:
+                similarities = df.embedding.apply(lambda x: cosine_similarity(x, q))
+                similarities.sort_values(ascending=False).head(args.k)
+        report("노트북 방식 (apply + sort_values)", per_query_ms(naive, args.naive_queries))
+
+    started = time.perf_counter()
+    exact = VectorIndex(vectors, metadata=metadata)
+    print(f"{'  VectorIndex 준비 (정규화)':<36} | {(time.perf_counter() - started) * 1000:10.1f}ms |")
+
+    report("VectorIndex (질의마다)",
+           per_query_ms(lambda: [exact.search(q, args.k) for q in queries], len(queries)))
+    truth = None
+
+    def batched():
+        nonlocal truth
+        _, truth = exact.search(queries, args.k)
+    report("VectorIndex (모든 질의 한 번에)", per_query_ms(batched, len(queries)))
+    report("VectorIndex + 필터 (Score >= 4)",
+           per_query_ms(lambda: exact.search(queries, args.k, where="Score >= 4"), len(queries)))
+
+    started = time.perf_counter()
+    ivf = IVFIndex(vectors, metadata=metadata, nlist=args.nlist)
+    print(f"{f'  IVFIndex 준비 (nlist={ivf.nlist})':<36} | {(time.perf_counter() - started) * 1000:10.1f}ms |")
+    for nprobe in args.nprobe:
+        found = None
+
+        def approximate():
+            nonlocal found
+            _, found = ivf.search(queries, args.k, nprobe=nprobe)
+        ms = per_query_ms(approximate, len(queries))
+        report(f"IVFIndex (nprobe={nprobe})", ms, recall(found, truth))
+
+
+if __name__ == "__main__":
+    main()
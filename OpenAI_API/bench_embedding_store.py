@@ -0,0 +1,130 @@
+# ---------------------------------------------------------
+# 임베딩 저장 형식 벤치마크: CSV + eval vs EmbeddingStore
+# ---------------------------------------------------------
+# 340_Embeddings.ipynb처럼 임베딩을 문자열로 CSV에 저장하고
+# pd.read_csv + df.embedding.apply(eval)로 읽는 방식과
+# embedding_store.py(float32 memmap + 메타데이터 CSV)를 비교합니다.
+# 행 수마다 저장 시간, 디스크 크기, 불러오기 시간(열기 / 전체 읽기)을 출력합니다.
+#
+# CSV + eval은 행 수가 많으면 매우 느리므로 --csv-max-rows보다 큰 크기에서는 생략합니다.
+# (1536차원 1M행은 float32로도 약 6GB이므로 큰 크기는 --dim을 줄여서 실행하세요.)
+#
+# 실행 예:
+#   python bench_embedding_store.py --rows 1000 100000 1000000 --dim 256
+#   python bench_embedding_store.py --rows 1000 --dim 1536
+# ---------------------------------------------------------
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from embedding_store import EmbeddingStore
+
+CHUNK_ROWS = 50_000     # 큰 크기도 메모리에 한 번에 만들지 않도록 나눠서 저장
+
+
+def make_chunk(rng: np.random.Generator, start: int, rows: int, dim: int):
+    vectors = rng.standard_normal((rows, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    meta = pd.DataFrame({
+        "ProductId": [f"B{n % 5000:09d}" for n in range(start, start + rows)],
+        "Score": rng.integers(1, 6, rows),
+    })
+    return vectors, meta
+
+
+def write_csv(path: str, rows: int, dim: int, seed: int):
+    """노트북과 같은 형식: embedding 컬럼에 str(list)"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, rows - start)
+        vectors, meta = make_chunk(rng, start, n, dim)
+        meta.index = range(start, start + n)
+        meta["embedding"] = [str(v) for v in vectors.tolist()]
+        meta.to_csv(path, mode="a", header=start == 0)
+
+
+def write_store(path: str, rows: int, dim: int, seed: int):
+    rng = np.random.default_rng(seed)
+    store = EmbeddingStore.create(path, dim=dim, columns=["ProductId", "Score"])
+    for start in range(0, rows, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, rows - start)
+        vectors, meta = make_chunk(rng, start, n, dim)
+        store.append(vectors, ids=range(start, start + n), metadata=meta)
+
+
+def load_csv(path: str) -> np.ndarray:
+    df = pd.read_csv(path, index_col=0)
+    df["embedding"] = df.embedding.apply(eval)
+    return np.asarray(df.embedding.to_list(), dtype=np.float32)
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def bench(rows: int, dim: int, csv_max_rows: int, workdir: str) -> dict:
+    result = {"rows": rows}
+    store_path = os.path.join(workdir, f"store_{rows}")
+    _, result["store_write"] = timed(write_store, store_path, rows, dim, 0)
+    result["store_bytes"] = dir_size(store_path)
+
+    store, result["store_open"] = timed(EmbeddingStore.open, store_path)
+    # 열기: memmap 생성 + 메타데이터 로드 (벡터는 실제로 접근할 때 페이지 단위로 읽힘)
+    _, t = timed(lambda: (store.vectors, store.metadata))
+    result["store_open"] += t
+    # 전체 읽기: 모든 벡터를 한 번 훑기 (CSV 쪽과 같은 조건)
+    _, result["store_scan"] = timed(lambda: float(np.asarray(store.vectors).sum(dtype=np.float64)))
+
+    if rows <= csv_max_rows:
+        csv_path = os.path.join(workdir, f"embeddings_{rows}.csv")
+        _, result["csv_write"] = timed(write_csv, csv_path, rows, dim, 0)
+        result["csv_bytes"] = os.path.getsize(csv_path)
+        vectors, result["csv_load"] = timed(load_csv, csv_path)
+        # 같은 데이터인지 확인 (CSV는 float 문자열 -> float32 반올림 차이만 허용)
+        assert np.allclose(vectors, store.vectors, atol=1e-6), "CSV와 저장소의 벡터가 다릅니다."
+        os.remove(csv_path)
+    shutil.rmtree(store_path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV + eval vs float32 memmap 저장소 비교")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256, help="임베딩 차원 (text-embedding-3-small은 1536)")
+    parser.add_argument("--csv-max-rows", type=int, default=100_000, help="이보다 크면 CSV + eval 측정 생략")
+    parser.add_argument("--workdir", help="임시 파일 위치 (기본: 시스템 임시 폴더)")
+    args = parser.parse_args()
+
+    def mb(n):
+        return f"{n / 1e6:9.1f}MB"
+
+    print(f"차원 {args.dim}, float32 원본 크기 = 행 수 x {args.dim * 4}B")
+    print(f"{'행 수':>10} | {'형식':<12} | {'저장':>8} | {'크기':>11} | {'불러오기':>10} | {'전체 읽기':>9}")
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        for rows in args.rows:
+            r = bench(rows, args.dim, args.csv_max_rows, workdir)
+            print(f"{rows:>10,} | {'store':<12} | {r['store_write']:7.2f}s | {mb(r['store_bytes'])} | "
+                  f"{r['store_open'] * 1000:8.1f}ms | {r['store_scan'] * 1000:7.1f}ms")
+            if "csv_load" in r:
+                print(f"{'':>10} | {'csv + eval':<12} | {r['csv_write']:7.2f}s | {mb(r['csv_bytes'])} | "
+                      f"{r['csv_load'] * 1000:8.1f}ms | {'(포함)':>9}")
+                print(f"{'':>10} | 불러오기 {r['csv_load'] / (r['store_open'] + r['store_scan']):.0f}배 빠름, "
+                      f"디스크 {r['csv_bytes'] / r['store_bytes']:.1f}배 작음")
+            else:
+                print(f"{'':>10} | {'csv + eval':<12} | (생략: --csv-max-rows {args.csv_max_rows:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# ---------------------------------------------------------
+# 임베딩 로컬 캐시 (SQLite 파일 하나)
+# ---------------------------------------------------------
+# 이미 임베딩한 텍스트는 API를 다시 호출하지 않도록 벡터를 저장해 둡니다.
+# - 키: sha256(모델 이름 + 차원 + API에 보낸 텍스트 그대로) -> 벡터와 키가 항상 같은 텍스트에서 나옴
+#   보내기 전 정규화(normalize_text) = 유니코드 NFC + 줄바꿈을 공백으로 (get_embedding과 같은 전처리)
+#   + 앞뒤 공백 제거, 8191토큰을 넘으면 자르기. embed_texts와 EmbeddingPipeline이 같은 준비 과정
+#   (embedding_pipeline.prepare_texts)을 거쳐 보내므로 캐시를 함께 씀
+# - 값: float32 벡터 (BLOB)
+# - 크기 제한: 전체 벡터 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 것부터 삭제 (LRU)
+# - 여러 프로세스/스레드가 같은 파일에 동시에 써도 안전 (WAL + busy timeout + BEGIN IMMEDIATE,
+#   같은 키는 항상 같은 벡터이므로 먼저 쓴 값을 유지)
+# - embed_texts(): 한 묶음 안의 같은 텍스트는 한 번만 요청, 요청은 입력 수와 토큰 수 제한 안에서 묶음
+#   (embedding_pipeline.pack_batches), 전처리 후 빈 텍스트는 ValueError
+#
+# 사용 예 (340_Embeddings.ipynb):
+#   cache = EmbeddingCache("output/embedding_cache.db")
+#   vectors = embed_texts(client, cache, df.combined.tolist(), model=embedding_model)
+#   print(cache.stats_line())
+#
+# EmbeddingPipeline(..., cache=cache)로 넘기면 대량 임베딩에서도 같은 캐시를 사용합니다.
+# ---------------------------------------------------------
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3       # 2GB (1536차원 float32 약 35만 개)
+EVICT_TO = 0.9                          # 넘치면 max_bytes의 90%까지 비움
+TOUCH_INTERVAL = 60.0                   # last_used는 이 간격(초)보다 오래된 경우에만 갱신
+SQL_CHUNK = 500                         # IN (...)에 한 번에 넣는 키 수
+EMBED_BATCH = 2048                      # embed_texts의 요청당 최대 입력 수
+EMBED_BATCH_TOKENS = 250_000            # embed_texts의 요청당 최대 토큰 수 (EmbeddingPipeline과 같음)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key         TEXT PRIMARY KEY,
+    model       TEXT NOT NULL,
+    dims        INTEGER NOT NULL,
+    vector      BLOB NOT NULL,      -- float32
+    bytes       INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings(last_used, bytes);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """임베딩 요청 전 전처리 (embed_texts, EmbeddingPipeline 공통)"""
+    return unicodedata.normalize("NFC", str(text)).replace("\n", " ").strip()
+
+
+def embedding_key(model: str, text: str, dimensions: Optional[int] = None) -> str:
+    """text는 API에 실제로 보낸 문자열 (정규화 / 자르기가 끝난 것)"""
+    raw = f"{model}\0{dimensions or ''}\0{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(모델, 차원, 텍스트) -> float32 벡터"""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, timeout: float = 30.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        # 트랜잭션은 직접 관리 (isolation_level=None), 스레드 간에는 lock으로 직렬화
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _write(self, fn):
+        """BEGIN IMMEDIATE: 쓰기 잠금을 먼저 잡아서 다른 프로세스와 교착되지 않게"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn()
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    # -----------------------------------------------------
+    # 조회 / 저장
+    # -----------------------------------------------------
+    def get_many(self, model: str, texts: Sequence[str],
+                 dimensions: Optional[int] = None) -> List[Optional[np.ndarray]]:
+        """texts(API에 보내는 문자열)와 같은 순서로 벡터 (없으면 None)"""
+        keys = [embedding_key(model, text, dimensions) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        with self.lock:
+            for start in range(0, len(unique), SQL_CHUNK):
+                chunk = unique[start:start + SQL_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT key, vector, last_used FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob, last_used in rows:
+                    found[key] = (np.frombuffer(blob, dtype=np.float32), last_used)
+
+        now = time.time()
+        stale = [(now, key) for key, (_, last_used) in found.items() if now - last_used > TOUCH_INTERVAL]
+        if stale:
+            self._write(lambda: self.conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?", stale))
+
+        result = [found[key][0] if key in found else None for key in keys]
+        hits = sum(vector is not None for vector in result)
+        self.hits += hits
+        self.misses += len(result) - hits
+        return result
+
+    def put_many(self, model: str, texts: Sequence[str], vectors,
+                 dimensions: Optional[int] = None):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) != len(vectors):
+            raise ValueError("texts와 vectors의 개수가 다릅니다.")
+        now = time.time()
+        rows = {}
+        for text, vector in zip(texts, vectors):
+            blob = vector.tobytes()
+            rows[embedding_key(model, text, dimensions)] = (model, len(vector), blob, len(blob), now, now)
+        if not rows:
+            return
+
+        def write():
+            # 같은 키는 항상 같은 벡터 -> 이미 있으면 그대로 둠 (동시에 쓴 프로세스끼리 충돌 없음)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key,) + row for key, row in rows.items()],
+            )
+            self._evict()
+        self._write(write)
+
+    def _evict(self):
+        total = self.size_bytes(locked=True)
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * EVICT_TO)
+        victims, freed = [], 0
+        for key, size in self.conn.execute("SELECT key, bytes FROM embeddings ORDER BY last_used"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        self.evicted += len(victims)
+
+    # -----------------------------------------------------
+    # 상태
+    # -----------------------------------------------------
+    def size_bytes(self, locked: bool = False) -> int:
+        """저장된 벡터 크기의 합 (인덱스만 읽음)"""
+        def query():
+            return self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM embeddings").fetchone()[0]
+        if locked:
+            return query()
+        with self.lock:
+            return query()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats_line(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (f"임베딩 캐시 적중 {self.hits}/{total} ({rate:.0%}), "
+                f"저장 {len(self)}개 / {self.size_bytes() / 1e6:.1f}MB, 삭제 {self.evicted}개")
+
+    def close(self):
+        self.conn.close()
+
+
+def embed_texts(client, cache: Optional[EmbeddingCache], texts: Sequence[str], model: str,
+                dimensions: Optional[int] = None, batch_size: int = EMBED_BATCH,
+                max_batch_tokens: int = EMBED_BATCH_TOKENS, long_text: str = "truncate") -> np.ndarray:
+    """
+    texts와 같은 순서의 임베딩 행렬 (float32)
+    EmbeddingPipeline과 같은 방식으로 입력을 준비하고(긴 입력 자르기, 빈 입력 거부),
+    캐시에 있는 텍스트는 건너뛰고, 없는 텍스트는 중복을 제거해서
+    요청당 batch_size개 / max_batch_tokens토큰 이내로 묶어 요청합니다.
+    client: 동기 OpenAI 클라이언트
+    """
+    # embedding_pipeline이 이 모듈의 normalize_text를 가져다 쓰므로 여기서 가져옴
+    from embedding_pipeline import pack_batches, prepare_texts
+
+    texts, counts = prepare_texts(texts, long_text=long_text)
+    vectors = cache.get_many(model, texts, dimensions) if cache is not None else [None] * len(texts)
+    missing_counts = {}
+    for text, n, vector in zip(texts, counts, vectors):
+        if vector is None:
+            missing_counts[text] = n
+    missing = list(missing_counts)
+
+    new = {}
+    for batch in pack_batches([missing_counts[text] for text in missing], max_batch_tokens, batch_size):
+        chunk = [missing[i] for i in batch]
+        kwargs = {"model": model, "input": chunk}
+        if dimensions:
+            kwargs["dimensions"] = dimensions
+        response = client.embeddings.create(**kwargs)
+        chunk_vectors = np.asarray([d.embedding for d in sorted(response.data, key=lambda d: d.index)],
+                                   dtype=np.float32)
+        if cache is not None:
+            cache.put_many(model, chunk, chunk_vectors, dimensions)
+        new.update(zip(chunk, chunk_vectors))
+
+    if not texts:
+        return np.zeros((0, dimensions or 0), dtype=np.float32)
+    return np.stack([vector if vector is not None else new[text] for text, vector in zip(texts, vectors)])
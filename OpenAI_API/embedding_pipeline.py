@@ -0,0 +1,332 @@
+# ---------------------------------------------------------
+# 대량 임베딩 파이프라인 (340_Embeddings.ipynb용)
+# ---------------------------------------------------------
+# get_embedding()처럼 텍스트 하나당 요청 하나를 순서대로 보내면
+# 1,000개 리뷰에 5~6분이 걸립니다. EmbeddingPipeline은
+# - 토큰 수 기준으로 여러 텍스트를 한 요청에 묶고 (tiktoken cl100k_base)
+#   입력 하나는 8191토큰, 요청 하나는 max_batch_tokens / max_batch_inputs 이내
+# - 묶음(batch)들을 동시에 최대 concurrency개씩 보내고
+# - 429/5xx/연결 오류는 지수 백오프로 재시도하며
+# - 끝난 묶음마다 checkpoint_dir에 저장해서, 중단 후 다시 실행하면 남은 것만 처리합니다.
+#   (모델 / 차원 / 텍스트 해시를 함께 저장해서, 설정이나 텍스트가 바뀐 id는 다시 요청)
+#   실행이 끝나면 체크포인트를 파일 하나로 합치고 지난 파일(설정/텍스트가 바뀐 것 포함)은 삭제
+# - cache(embedding_cache.EmbeddingCache)를 주면 캐시에 있는 텍스트는 요청하지 않고,
+#   같은 텍스트가 여러 번 있으면 한 번만 요청합니다.
+#   (캐시 키는 전처리 / 자르기까지 끝난, 실제로 보내는 텍스트)
+#
+# 노트북에서는 이벤트 루프가 이미 돌고 있으므로 await로 바로 호출합니다.
+#   pipeline = EmbeddingPipeline(AsyncOpenAI(), "text-embedding-3-small",
+#                                checkpoint_dir="output/embeddings_ckpt")
+#   ids, vectors = await pipeline.run(df.index.tolist(), df.combined.tolist())
+#
+# 로컬 대체 서버로 시험:
+#   python fake_embeddings_server.py --port 8767
+#   python embedding_pipeline.py --base-url http://127.0.0.1:8767/v1 --rows 5000
+#   python embedding_pipeline.py --rows 5000 --cache /tmp/embedding_cache.db   # 두 번 실행해서 비교
+# ---------------------------------------------------------
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import os
+import random
+import sys
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import tiktoken
+from openai import (APIConnectionError, APITimeoutError, AsyncOpenAI,
+                    InternalServerError, RateLimitError)
+
+from embedding_cache import normalize_text
+
+EMBEDDING_ENCODING = "cl100k_base"
+MAX_INPUT_TOKENS = 8191         # text-embedding-3-* 입력 하나의 최대 토큰 수
+MAX_BATCH_INPUTS = 2048         # 요청 하나에 넣을 수 있는 최대 입력 수
+MAX_BATCH_TOKENS = 250_000      # 요청 하나의 전체 토큰 수 (API 제한 300k보다 여유 있게)
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+def text_digest(text: str) -> str:
+    """체크포인트에 id와 함께 저장하는 원문 텍스트 해시"""
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def prepare_texts(texts: Iterable[str], encoding=None, long_text: str = "truncate",
+                  keys: Optional[Sequence] = None) -> Tuple[List[str], List[int]]:
+    """
+    전처리(embedding_cache.normalize_text) + 토큰 수 계산 + 긴 입력 자르기
+    EmbeddingPipeline과 embedding_cache.embed_texts가 같은 텍스트를 보내고
+    같은 캐시 키를 쓰도록 두 곳 모두 이 함수로 입력을 준비합니다.
+    전처리 후 빈 문자열은 API가 거부하므로 미리 ValueError (keys가 있으면 오류에 표시)
+    """
+    encoding = encoding or tiktoken.get_encoding(EMBEDDING_ENCODING)
+    prepared, counts = [], []
+    for i, text in enumerate(texts):
+        text = normalize_text(text)
+        if not text:
+            label = keys[i] if keys is not None else i
+            raise ValueError(f"빈 입력은 임베딩할 수 없습니다 (id: {label!r})")
+        tokens = encoding.encode(text)
+        if len(tokens) > MAX_INPUT_TOKENS:
+            if long_text == "error":
+                raise ValueError(f"입력이 {MAX_INPUT_TOKENS}토큰을 넘습니다 ({len(tokens)}토큰): {text[:60]!r}")
+            tokens = tokens[:MAX_INPUT_TOKENS]
+            text = encoding.decode(tokens)
+        prepared.append(text)
+        counts.append(len(tokens))
+    return prepared, counts
+
+
+def pack_batches(token_counts: Sequence[int], max_batch_tokens: int = MAX_BATCH_TOKENS,
+                 max_batch_inputs: int = MAX_BATCH_INPUTS) -> List[List[int]]:
+    """입력 순서를 유지하면서 토큰 수/입력 수 제한 안에 들어가도록 위치(index)를 묶음"""
+    batches, current, current_tokens = [], [], 0
+    for i, n in enumerate(token_counts):
+        if current and (current_tokens + n > max_batch_tokens or len(current) >= max_batch_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingPipeline:
+    """텍스트 묶음 임베딩 + 동시 요청 + 재시도 + 체크포인트"""
+
+    def __init__(self, client: AsyncOpenAI, model: str, checkpoint_dir: Optional[str] = None,
+                 concurrency: int = 4, max_batch_tokens: int = MAX_BATCH_TOKENS,
+                 max_batch_inputs: int = MAX_BATCH_INPUTS, dimensions: Optional[int] = None,
+                 max_retries: int = 8, long_text: str = "truncate", cache=None):
+        """
+        long_text: 8191토큰을 넘는 입력 처리 방법 - "truncate"(잘라서 임베딩) / "error"
+        (전처리 후 빈 텍스트는 ValueError)
+        cache: embedding_cache.EmbeddingCache (선택)
+        """
+        if long_text not in ("truncate", "error"):
+            raise ValueError(f"long_text는 'truncate' 또는 'error'여야 합니다: {long_text}")
+        self.client = client
+        self.model = model
+        self.checkpoint_dir = checkpoint_dir
+        self.concurrency = concurrency
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_inputs = max_batch_inputs
+        self.dimensions = dimensions
+        self.max_retries = max_retries
+        self.long_text = long_text
+        self.cache = cache
+        self.encoding = tiktoken.get_encoding(EMBEDDING_ENCODING)
+        self.stats = {"requests": 0, "retries": 0, "tokens": 0, "resumed": 0, "stale": 0,
+                      "cached": 0, "duplicates": 0, "compacted": 0}
+
+    # -----------------------------------------------------
+    # 입력 준비
+    # -----------------------------------------------------
+    def _prepare(self, texts: Iterable[str], keys: Optional[Sequence] = None) -> Tuple[List[str], List[int]]:
+        """prepare_texts와 같음 (이 파이프라인의 토크나이저 / long_text 설정 사용)"""
+        return prepare_texts(texts, self.encoding, self.long_text, keys)
+
+    # -----------------------------------------------------
+    # 체크포인트: 묶음마다 npz 파일 하나 (ids, vectors, 텍스트 해시, 모델, 차원)
+    # -----------------------------------------------------
+    def _load_checkpoints(self, digests: dict) -> Tuple[dict, List[str], dict]:
+        """
+        digests: id -> 이번 실행의 텍스트 해시
+        모델 / 차원이 다른 파일, 텍스트가 바뀐 id의 벡터는 사용하지 않음
+        반환: (이어받을 id -> 벡터, 읽은 파일 목록,
+               이번 실행에 없는 id -> (텍스트 해시, 벡터) - 합칠 때 그대로 보존)
+        """
+        done, paths, others, stale = {}, [], {}, 0
+        if not self.checkpoint_dir:
+            return done, paths, others
+        for path in sorted(glob.glob(os.path.join(self.checkpoint_dir, "batch_*.npz"))):
+            paths.append(path)
+            with np.load(path, allow_pickle=False) as data:
+                keys = data["ids"].tolist()
+                if ("model" not in data.files or str(data["model"]) != self.model
+                        or int(data["dimensions"]) != (self.dimensions or 0)):
+                    stale += len(keys)      # 이전 형식이거나 다른 설정으로 만든 파일
+                    continue
+                for key, digest, vector in zip(keys, data["text_sha256"].tolist(), data["vectors"]):
+                    if key not in digests:
+                        others[key] = (digest, vector)      # 나중 파일이 앞 파일을 대체
+                    elif digests[key] == digest:
+                        done[key] = vector
+                    else:
+                        stale += 1
+        self.stats["stale"] = stale
+        return done, paths, others
+
+    def _save_checkpoint(self, batch_no: int, ids: List, digests: List[str],
+                         vectors: np.ndarray) -> Optional[str]:
+        if not self.checkpoint_dir:
+            return None
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = os.path.join(self.checkpoint_dir, f"batch_{time.time_ns()}_{batch_no:06d}.npz")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, ids=np.asarray(ids), vectors=vectors, text_sha256=np.asarray(digests),
+                     model=np.asarray(self.model), dimensions=np.asarray(self.dimensions or 0))
+        os.replace(tmp_path, path)     # 다 쓴 파일만 보이도록
+        return path
+
+    def _compact_checkpoints(self, old_paths: List[str], digests: dict, done: dict, others: dict):
+        """
+        실행이 끝난 뒤 유효한 벡터(이번 실행의 id + 이번 실행에 없는 id)를 파일 하나로 합치고
+        나머지 파일(설정/텍스트가 바뀐 것, 합쳐진 묶음 파일)은 삭제
+        새 파일을 다 쓴 다음에 지우므로 중간에 멈춰도 이어받을 벡터는 남아 있음
+        """
+        if not old_paths or (len(old_paths) == 1 and not self.stats["stale"]):
+            return      # 이미 파일 하나
+        keys = list(done) + [key for key in others if key not in done]
+        if keys:
+            vectors = np.stack([done[key] if key in done else others[key][1] for key in keys])
+            hashes = [digests[key] if key in done else others[key][0] for key in keys]
+            self._save_checkpoint(0, keys, hashes, vectors)
+        for path in old_paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.stats["compacted"] = len(old_paths)
+
+    # -----------------------------------------------------
+    # 요청
+    # -----------------------------------------------------
+    async def _embed(self, inputs: List[str]) -> np.ndarray:
+        kwargs = {"model": self.model, "input": inputs}
+        if self.dimensions:
+            kwargs["dimensions"] = self.dimensions
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.embeddings.create(**kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                retry_after = getattr(getattr(e, "response", None), "headers", {}).get("retry-after")
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = random.uniform(0, min(60.0, 0.5 * 2 ** attempt))
+                await asyncio.sleep(delay)
+        self.stats["requests"] += 1
+        self.stats["tokens"] += response.usage.total_tokens if response.usage else 0
+        data = sorted(response.data, key=lambda d: d.index)
+        return np.asarray([d.embedding for d in data], dtype=np.float32)
+
+    async def run(self, ids: Sequence, texts: Sequence[str]) -> Tuple[list, np.ndarray]:
+        """
+        ids와 같은 순서의 임베딩 행렬(float32, N x 차원)을 반환
+        checkpoint_dir에 이미 있는 id, 캐시에 있는 텍스트는 다시 요청하지 않음
+        """
+        ids = list(ids)
+        if len(ids) != len(texts):
+            raise ValueError("ids와 texts의 길이가 다릅니다.")
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids에 중복이 있습니다.")
+
+        digests = {key: text_digest(text) for key, text in zip(ids, texts)}
+        done, loaded_paths, others = self._load_checkpoints(digests)
+        written_paths = []
+        todo = [i for i, key in enumerate(ids) if key not in done]
+        self.stats["resumed"] = len(ids) - len(todo)
+        prepared, counts = self._prepare([texts[i] for i in todo], [ids[i] for i in todo])
+        if self.cache is not None:
+            # 실제로 보낼 텍스트로 조회 (embed_texts로 저장한 벡터와도 같은 키)
+            cached = self.cache.get_many(self.model, prepared, self.dimensions)
+            for i, vector in zip(todo, cached):
+                if vector is not None:
+                    done[ids[i]] = vector
+            missing = [j for j, vector in enumerate(cached) if vector is None]
+            todo = [todo[j] for j in missing]
+            prepared = [prepared[j] for j in missing]
+            counts = [counts[j] for j in missing]
+            self.stats["cached"] = len(cached) - len(todo)
+
+        # 같은 텍스트는 한 번만 요청: 텍스트 -> 해당 위치(todo의 원소)들
+        groups, unique_counts = {}, {}
+        for i, text, n in zip(todo, prepared, counts):
+            groups.setdefault(text, []).append(i)
+            unique_counts[text] = n
+        unique = list(groups)
+        self.stats["duplicates"] = len(todo) - len(unique)
+        batches = pack_batches([unique_counts[text] for text in unique],
+                               self.max_batch_tokens, self.max_batch_inputs)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        finished = 0
+        started = time.perf_counter()
+
+        async def run_batch(batch_no: int, positions: List[int]):
+            nonlocal finished
+            inputs = [unique[p] for p in positions]
+            async with semaphore:
+                vectors = await self._embed(inputs)
+            members = [(i, vector) for p, vector in zip(positions, vectors) for i in groups[unique[p]]]
+            batch_ids = [ids[i] for i, _ in members]
+            batch_vectors = np.stack([vector for _, vector in members])
+            path = self._save_checkpoint(batch_no, batch_ids, [digests[key] for key in batch_ids], batch_vectors)
+            if path:
+                written_paths.append(path)
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.put_many, self.model, inputs, vectors, self.dimensions)
+            for key, vector in zip(batch_ids, batch_vectors):
+                done[key] = vector
+            finished += len(members)
+            elapsed = time.perf_counter() - started
+            print(f"  {finished}/{len(todo)}개 완료 ({finished / elapsed:.0f}개/s)", file=sys.stderr)
+
+        if batches:
+            print(f"임베딩 {len(todo)}개 (이어받음 {self.stats['resumed']}개, 캐시 {self.stats['cached']}개, "
+                  f"중복 {self.stats['duplicates']}개, 설정/텍스트가 바뀐 체크포인트 {self.stats['stale']}개), "
+                  f"요청 {len(batches)}개", file=sys.stderr)
+            await asyncio.gather(*(run_batch(n, b) for n, b in enumerate(batches)))
+        if self.checkpoint_dir:
+            await asyncio.to_thread(self._compact_checkpoints, loaded_paths + written_paths,
+                                    digests, done, others)
+        if not ids:
+            return ids, np.zeros((0, self.dimensions or 0), dtype=np.float32)
+        return ids, np.stack([done[key] for key in ids])
+
+
+async def _demo(args):
+    rng = random.Random(0)
+    words = "맛있는 콩 커피 과자 배송 포장 가격 품질 강아지 사료 차 초콜릿 추천 재구매 실망".split()
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(20, 400))) for _ in range(args.rows)]
+    client = AsyncOpenAI(base_url=args.base_url, api_key=os.environ.get("OPENAI_API_KEY", "test"),
+                         max_retries=0)
+    cache = None
+    if args.cache:
+        from embedding_cache import EmbeddingCache
+        cache = EmbeddingCache(args.cache)
+    pipeline = EmbeddingPipeline(client, args.model, checkpoint_dir=args.checkpoint_dir,
+                                 concurrency=args.concurrency, max_batch_inputs=args.batch_inputs,
+                                 cache=cache)
+    started = time.perf_counter()
+    try:
+        ids, vectors = await pipeline.run(list(range(len(texts))), texts)
+    finally:
+        await client.close()
+    elapsed = time.perf_counter() - started
+    print(f"{len(ids)}개 -> {vectors.shape}, {elapsed:.2f}초 ({len(ids) / elapsed:.0f}개/s), {pipeline.stats}")
+    if cache is not None:
+        print(cache.stats_line())
+        cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="임베딩 파이프라인 시험 실행")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8767/v1")
+    parser.add_argument("--model", default="text-embedding-3-small")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-inputs", type=int, default=MAX_BATCH_INPUTS)
+    parser.add_argument("--checkpoint-dir", help="지정하면 중단 후 이어서 실행 가능")
+    parser.add_argument("--cache", help="임베딩 캐시 파일 (두 번째 실행부터 요청이 거의 없음)")
+    asyncio.run(_demo(parser.parse_args()))
@@ -0,0 +1,201 @@
+# ---------------------------------------------------------
+# 임베딩 유사도 검색 (340_Embeddings.ipynb용)
+# ---------------------------------------------------------
+# df.embedding.apply(lambda x: cosine_similarity(x, embedding)) + sort_values는
+# 행마다 파이썬에서 두 벡터의 노름을 다시 계산하고 전체를 정렬합니다.
+# 여기서는 임베딩 행렬을 한 번만 정규화해 두고
+# - 검색은 행렬곱 한 번 + np.argpartition (상위 k개만 정렬)
+# - 여러 질의를 한 번에 (질의 행렬 x 임베딩 행렬, 메모리에 맞게 나눠서)
+# - 메타데이터 필터 (pandas 조건식 문자열 / 함수 / bool 배열)
+# - 큰 데이터용 근사 검색 IVFIndex (k-means로 나눈 목록 중 nprobe개만 탐색)
+#
+# 사용 예:
+#   index = VectorIndex(np.array(df.embedding.to_list()), metadata=df)
+#   index.search_frame(embedding, k=3, where="Score >= 4")[["Summary", "Text", "similarities"]]
+#   scores, rows = index.search(query_matrix, k=10)      # (질의 수, k)
+#
+#   ivf = IVFIndex(vectors, metadata=df, nprobe=8)        # 근사 검색
+#   python bench_embedding_search.py --rows 200000        # 정확도(recall) / 지연 비교
+# ---------------------------------------------------------
+
+from typing import Callable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Where = Union[None, str, Callable[[pd.DataFrame], "np.ndarray"], np.ndarray]
+
+MAX_SCORE_CELLS = 32_000_000    # 한 번에 만드는 (질의 x 문서) 점수 행렬 크기 상한 (float32 약 128MB)
+
+
+def normalize(vectors) -> np.ndarray:
+    """행마다 단위 벡터로 (float32, 노름 0인 행은 그대로 0)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (질의 수, 후보 수) 점수에서 질의마다 상위 k개 (점수 내림차순)
+    후보가 k개보다 적으면 나머지는 점수 -inf, 위치 -1
+    """
+    n_queries, n_items = scores.shape
+    kk = min(k, n_items)
+    out_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    out_index = np.full((n_queries, k), -1, dtype=np.int64)
+    if kk == 0:
+        return out_scores, out_index
+    part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    out_index[:, :kk] = np.take_along_axis(part, order, axis=1)
+    out_scores[:, :kk] = np.take_along_axis(part_scores, order, axis=1)
+    return out_scores, out_index
+
+
+def _to_rows(rows: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    """후보 안의 위치(pos) -> 원래 행 번호 (-1은 그대로)"""
+    if len(rows) == 0:
+        return pos
+    return np.where(pos >= 0, rows[np.maximum(pos, 0)], -1)
+
+
+class VectorIndex:
+    """정확한 코사인 유사도 검색 (정규화된 행렬곱)"""
+
+    def __init__(self, vectors, metadata: Optional[pd.DataFrame] = None,
+                 assume_normalized: bool = False):
+        """
+        vectors: (N, 차원) - EmbeddingStore.vectors(memmap)도 가능
+        metadata: 행 순서가 vectors와 같은 DataFrame (필터, search_frame에 사용)
+        assume_normalized: 이미 단위 벡터면 True (복사 없이 그대로 사용)
+        """
+        self.vectors = np.asarray(vectors, dtype=np.float32) if assume_normalized else normalize(vectors)
+        if self.vectors.ndim != 2:
+            raise ValueError(f"vectors는 2차원이어야 합니다: {self.vectors.shape}")
+        if metadata is not None and len(metadata) != len(self.vectors):
+            raise ValueError("metadata와 vectors의 행 수가 다릅니다.")
+        self.metadata = metadata
+
+    @classmethod
+    def from_store(cls, store, **kwargs) -> "VectorIndex":
+        """embedding_store.EmbeddingStore에서 만들기"""
+        return cls(store.vectors, metadata=store.metadata, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    # -----------------------------------------------------
+    # 필터
+    # -----------------------------------------------------
+    def _mask(self, where: Where) -> Optional[np.ndarray]:
+        if where is None:
+            return None
+        if isinstance(where, str) or callable(where):
+            if self.metadata is None:
+                raise ValueError("메타데이터 필터를 쓰려면 metadata가 필요합니다.")
+            mask = self.metadata.eval(where) if isinstance(where, str) else where(self.metadata)
+        else:
+            mask = where
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self),):
+            raise ValueError(f"필터 결과의 모양이 ({len(self)},)이 아닙니다: {mask.shape}")
+        return mask
+
+    # -----------------------------------------------------
+    # 검색
+    # -----------------------------------------------------
+    def search(self, queries, k: int = 10, where: Where = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        queries: (차원,) 또는 (질의 수, 차원)
+        반환: (scores, rows) - 모양 (질의 수, k), rows는 vectors의 행 번호
+        """
+        queries = normalize(np.atleast_2d(queries))
+        mask = self._mask(where)
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        candidates = self.vectors if mask is None else self.vectors[rows]
+
+        scores_out, rows_out = [], []
+        step = max(1, MAX_SCORE_CELLS // max(1, len(rows)))
+        for start in range(0, len(queries), step):
+            scores, pos = top_k(queries[start:start + step] @ candidates.T, k)
+            scores_out.append(scores)
+            rows_out.append(_to_rows(rows, pos))
+        return np.concatenate(scores_out), np.concatenate(rows_out)
+
+    def search_frame(self, query, k: int = 10, where: Where = None) -> pd.DataFrame:
+        """질의 하나의 결과를 메타데이터 행 + 'similarities' 컬럼으로 (노트북의 기존 출력과 같은 모양)"""
+        if self.metadata is None:
+            raise ValueError("search_frame을 쓰려면 metadata가 필요합니다.")
+        scores, rows = self.search(query, k, where)
+        found = rows[0] >= 0
+        result = self.metadata.iloc[rows[0][found]].copy()
+        result["similarities"] = scores[0][found]
+        return result
+
+
+class IVFIndex(VectorIndex):
+    """
+    근사 검색 (IVF): 벡터를 k-means(구면) 군집 nlist개로 나눠 두고,
+    질의와 가까운 군집 nprobe개 안에서만 정확히 계산합니다.
+    nprobe를 키우면 정확도(recall)가 오르고 느려집니다.
+    필터를 쓰면 탐색한 군집 안의 후보만 남으므로 결과가 k개보다 적을 수 있습니다.
+    """
+
+    def __init__(self, vectors, metadata: Optional[pd.DataFrame] = None,
+                 assume_normalized: bool = False, nlist: Optional[int] = None,
+                 nprobe: int = 8, n_iter: int = 10, train_size: Optional[int] = None, seed: int = 0):
+        super().__init__(vectors, metadata, assume_normalized)
+        n = len(self.vectors)
+        if n == 0:
+            raise ValueError("빈 데이터로는 IVFIndex를 만들 수 없습니다.")
+        self.nlist = max(1, min(n, nlist or int(4 * np.sqrt(n))))
+        self.nprobe = nprobe
+        rng = np.random.default_rng(seed)
+        train_size = min(n, train_size or self.nlist * 64)
+        sample = self.vectors[np.sort(rng.choice(n, train_size, replace=False))]
+        self.centroids = self._kmeans(sample, n_iter, rng)
+
+        assign = self._assign(self.vectors)
+        # 군집 번호순으로 행 번호를 정렬해 두고, 군집 c의 행은 order[offsets[c]:offsets[c + 1]]
+        self.order = np.argsort(assign, kind="stable")
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=self.nlist))])
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        step = max(1, MAX_SCORE_CELLS // self.nlist)
+        return np.concatenate([np.argmax(vectors[s:s + step] @ self.centroids.T, axis=1)
+                               for s in range(0, len(vectors), step)])
+
+    def _kmeans(self, sample: np.ndarray, n_iter: int, rng: np.random.Generator) -> np.ndarray:
+        self.centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy()
+        for _ in range(n_iter):
+            assign = self._assign(sample)
+            counts = np.bincount(assign, minlength=self.nlist)
+            starts = np.cumsum(counts) - counts
+            sums = np.zeros_like(self.centroids)
+            empty = counts == 0
+            # 군집 번호순으로 정렬한 뒤 구간 합 (np.add.at보다 훨씬 빠름)
+            sums[~empty] = np.add.reduceat(sample[np.argsort(assign, kind="stable")], starts[~empty], axis=0)
+            # 빈 군집은 임의의 점으로 다시 시작
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            self.centroids = normalize(sums)
+        return self.centroids
+
+    def search(self, queries, k: int = 10, where: Where = None,
+               nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize(np.atleast_2d(queries))
+        mask = self._mask(where)
+        nprobe = min(self.nlist, nprobe or self.nprobe)
+        _, probes = top_k(queries @ self.centroids.T, nprobe)
+
+        scores_out = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        rows_out = np.full((len(queries), k), -1, dtype=np.int64)
+        for i, (query, probe) in enumerate(zip(queries, probes)):
+            rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+            if mask is not None:
+                rows = rows[mask[rows]]
+            scores, pos = top_k((self.vectors[rows] @ query)[None, :], k)
+            scores_out[i] = scores[0]
+            rows_out[i] = _to_rows(rows, pos[0])
+        return scores_out, rows_out
@@ -0,0 +1,173 @@
+# ---------------------------------------------------------
+# float32 임베딩 저장소 (CSV + eval 대체)
+# ---------------------------------------------------------
+# 임베딩을 문자열 리스트로 CSV에 저장하고 df.embedding.apply(eval)로 읽으면
+# 느리고(파싱), 안전하지 않고(eval), 원본 float32보다 몇 배 큽니다.
+# EmbeddingStore는 폴더 하나에 다음 파일을 둡니다.
+# - vectors.f32 : float32 행렬 (행 우선, 헤더 없음) -> np.memmap으로 복사 없이 열기
+# - meta.csv    : id + 메타데이터 컬럼 (행 순서 = vectors.f32 행 순서)
+# - store.json  : 차원, 행 수, 컬럼 목록, 각 파일의 유효 크기
+#
+# append()는 벡터 -> 메타데이터 -> store.json(교체) 순서로 쓰므로,
+# 중간에 종료되어도 store.json에 기록된 행까지만 유효하고
+# 다음 append 때 남은 꼬리 부분은 잘라냅니다.
+#
+# 사용 예:
+#   store = EmbeddingStore.create("output/reviews_store", dim=1536, columns=["ProductId", "Score"])
+#   store.append(vectors, ids=df.index, metadata=df[["ProductId", "Score"]])
+#   store = EmbeddingStore.open("output/reviews_store")
+#   store.vectors        # (N, 1536) float32 memmap
+#   store.metadata       # pandas DataFrame (id + 메타데이터)
+# ---------------------------------------------------------
+
+import json
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.csv"
+HEADER_FILE = "store.json"
+FORMAT_VERSION = 1
+
+
+class EmbeddingStore:
+    """메모리 매핑 float32 행렬 + 메타데이터 CSV"""
+
+    def __init__(self, path: str, header: dict):
+        self.path = path
+        self.header = header
+        self._vectors = None
+        self._metadata = None
+
+    # -----------------------------------------------------
+    # 만들기 / 열기
+    # -----------------------------------------------------
+    @classmethod
+    def create(cls, path: str, dim: int, columns: Sequence[str] = ()) -> "EmbeddingStore":
+        if os.path.exists(os.path.join(path, HEADER_FILE)):
+            raise FileExistsError(f"이미 임베딩 저장소가 있습니다: {path}")
+        os.makedirs(path, exist_ok=True)
+        columns = list(columns)
+        if "id" in columns:
+            raise ValueError("'id'는 예약된 컬럼 이름입니다.")
+        open(os.path.join(path, VECTORS_FILE), "wb").close()
+        meta_header = pd.DataFrame(columns=["id"] + columns).to_csv(index=False).encode("utf-8")
+        with open(os.path.join(path, META_FILE), "wb") as f:
+            f.write(meta_header)
+        store = cls(path, {
+            "version": FORMAT_VERSION,
+            "dtype": "float32",
+            "dim": int(dim),
+            "count": 0,
+            "columns": columns,
+            "meta_bytes": len(meta_header),
+        })
+        store._write_header()
+        return store
+
+    @classmethod
+    def open(cls, path: str) -> "EmbeddingStore":
+        with open(os.path.join(path, HEADER_FILE), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 저장소 버전입니다: {header.get('version')}")
+        return cls(path, header)
+
+    def _write_header(self):
+        tmp_path = os.path.join(self.path, HEADER_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.header, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, HEADER_FILE))
+
+    # -----------------------------------------------------
+    # 조회
+    # -----------------------------------------------------
+    @property
+    def dim(self) -> int:
+        return self.header["dim"]
+
+    @property
+    def columns(self) -> List[str]:
+        return self.header["columns"]
+
+    def __len__(self) -> int:
+        return self.header["count"]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """(N, dim) float32, 읽기 전용 memmap (파일 내용을 복사하지 않음)"""
+        if self._vectors is None:
+            if len(self) == 0:
+                self._vectors = np.empty((0, self.dim), dtype=np.float32)
+            else:
+                self._vectors = np.memmap(os.path.join(self.path, VECTORS_FILE), dtype=np.float32,
+                                          mode="r", shape=(len(self), self.dim))
+        return self._vectors
+
+    @property
+    def metadata(self) -> pd.DataFrame:
+        """id + 메타데이터 컬럼 (행 순서 = vectors 행 순서)"""
+        if self._metadata is None:
+            self._metadata = pd.read_csv(os.path.join(self.path, META_FILE), nrows=len(self))
+        return self._metadata
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.metadata["id"].to_numpy()
+
+    # -----------------------------------------------------
+    # 추가
+    # -----------------------------------------------------
+    def append(self, vectors, ids: Sequence, metadata: Optional[pd.DataFrame] = None):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"벡터 모양이 (N, {self.dim})이 아닙니다: {vectors.shape}")
+        ids = list(ids)
+        if len(ids) != len(vectors):
+            raise ValueError("ids와 vectors의 행 수가 다릅니다.")
+        if metadata is None:
+            metadata = pd.DataFrame(index=range(len(ids)), columns=self.columns)
+        else:
+            missing = set(self.columns) - set(metadata.columns)
+            if missing:
+                raise ValueError(f"메타데이터 컬럼이 없습니다: {sorted(missing)}")
+            if len(metadata) != len(ids):
+                raise ValueError("metadata와 vectors의 행 수가 다릅니다.")
+        table = metadata[self.columns].reset_index(drop=True)
+        table.insert(0, "id", ids)
+        meta_bytes = table.to_csv(index=False, header=False).encode("utf-8")
+
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        meta_path = os.path.join(self.path, META_FILE)
+        row_bytes = self.dim * 4
+        for path, valid, data in ((vectors_path, len(self) * row_bytes, vectors.tobytes()),
+                                  (meta_path, self.header["meta_bytes"], meta_bytes)):
+            with open(path, "r+b") as f:
+                f.truncate(valid)       # 지난번에 중단된 append의 꼬리 제거
+                f.seek(valid)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.header["count"] += len(ids)
+        self.header["meta_bytes"] += len(meta_bytes)
+        self._write_header()
+        self._vectors = None
+        self._metadata = None
+
+    # -----------------------------------------------------
+    # 변환
+    # -----------------------------------------------------
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, path: str, embedding_column: str = "embedding",
+                       columns: Sequence[str] = ()) -> "EmbeddingStore":
+        """임베딩 컬럼(리스트/배열)이 있는 DataFrame을 저장소로 변환 (id = df.index)"""
+        vectors = np.asarray(df[embedding_column].to_list(), dtype=np.float32)
+        store = cls.create(path, dim=vectors.shape[1], columns=columns)
+        store.append(vectors, ids=df.index, metadata=df[list(columns)])
+        return store
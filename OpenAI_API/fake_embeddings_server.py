@@ -0,0 +1,141 @@
+# ---------------------------------------------------------
+# Embeddings API 로컬 대체 서버 (테스트/벤치마크용)
+# ---------------------------------------------------------
+# POST /v1/embeddings 를 흉내 냅니다. API 키나 비용 없이
+# embedding_pipeline.py / embedding_cache.py를 시험할 때 사용합니다.
+# - 같은 텍스트 -> 항상 같은 벡터 (텍스트 해시로 만든 단위 벡터)
+# - encoding_format "float"/"base64" 모두 지원 (openai SDK 기본값은 base64)
+# - 실제 API처럼 입력 수(2048), 입력당 토큰(8191), 요청당 토큰(300k) 제한을 검사
+# - --latency: 요청마다 고정 지연 + 입력 수에 비례한 지연
+# - --rate-limit-rate: 429 (Retry-After 포함)를 돌려줄 확률
+# - GET /stats: 받은 요청 수 / 입력 수
+#
+# 실행 예:
+#   python fake_embeddings_server.py --port 8767 --latency 0.2
+# ---------------------------------------------------------
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+try:
+    import tiktoken
+    _ENC = tiktoken.get_encoding("cl100k_base")
+except ImportError:     # 토큰 수를 글자 수로 추정
+    _ENC = None
+
+MAX_INPUTS = 2048
+MAX_INPUT_TOKENS = 8191
+MAX_REQUEST_TOKENS = 300_000
+
+
+def count_tokens(item) -> int:
+    if isinstance(item, list):      # 토큰 ID 배열
+        return len(item)
+    return len(_ENC.encode(item)) if _ENC else len(item) // 4 + 1
+
+
+def fake_vector(item, dims: int) -> np.ndarray:
+    key = json.dumps(item, ensure_ascii=False).encode("utf-8")
+    seed = int.from_bytes(hashlib.sha256(key).digest()[:8], "little")
+    vec = np.random.default_rng(seed).standard_normal(dims).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def make_handler(args, counter: dict):
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload: dict, headers: dict = None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _error(self, status: int, message: str, headers: dict = None):
+            self._send(status, {"error": {"message": message, "type": "invalid_request_error"}}, headers)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                return self._send(200, counter)
+            self._error(404, f"not found: {self.path}")
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/embeddings"):
+                return self._error(404, f"not found: {self.path}")
+            if random.random() < args.rate_limit_rate:
+                return self._error(429, "rate limited (stand-in)", {"Retry-After": "0.1"})
+
+            inputs = body.get("input")
+            if isinstance(inputs, str) or (isinstance(inputs, list) and inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            if not inputs:
+                return self._error(400, "input is empty")
+            if len(inputs) > MAX_INPUTS:
+                return self._error(400, f"too many inputs: {len(inputs)} > {MAX_INPUTS}")
+            tokens = [count_tokens(item) for item in inputs]
+            if max(tokens) > MAX_INPUT_TOKENS:
+                return self._error(400, f"input too long: {max(tokens)} tokens > {MAX_INPUT_TOKENS}")
+            if sum(tokens) > MAX_REQUEST_TOKENS:
+                return self._error(400, f"request too large: {sum(tokens)} tokens > {MAX_REQUEST_TOKENS}")
+
+            with lock:
+                counter["requests"] += 1
+                counter["inputs"] += len(inputs)
+            time.sleep(args.latency + args.per_input_latency * len(inputs))
+
+            dims = int(body.get("dimensions") or args.dimensions)
+            as_base64 = body.get("encoding_format") == "base64"
+            data = []
+            for i, item in enumerate(inputs):
+                vec = fake_vector(item, dims)
+                embedding = base64.b64encode(vec.tobytes()).decode("ascii") if as_base64 else vec.tolist()
+                data.append({"object": "embedding", "index": i, "embedding": embedding})
+            self._send(200, {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "stand-in"),
+                "usage": {"prompt_tokens": sum(tokens), "total_tokens": sum(tokens)},
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embeddings API 로컬 대체 서버")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--latency", type=float, default=0.2, help="요청마다 고정 지연(초)")
+    parser.add_argument("--per-input-latency", type=float, default=0.0005, help="입력 하나당 추가 지연(초)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    counter = {"requests": 0, "inputs": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args, counter))
+    server.daemon_threads = True
+    print(f"Embeddings 대체 서버: http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n종료 (요청 {counter['requests']}건, 입력 {counter['inputs']}개)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# ---------------------------------------------------------
+# GPT-2 생성 속도 벤치마크 (gpt2_generation.py)
+# ---------------------------------------------------------
+# 노트북의 생성 루프(매 단계 전체 문장을 다시 계산 + torch.cat)와
+# GPT2Engine(KV 캐시, 배치)의 초당 생성 토큰 수를 CPU에서 비교합니다.
+# 기본은 작은 GPT-2 설정을 무작위로 초기화해서 사용하므로 모델을 내려받지 않습니다.
+#
+# 먼저 결과가 같은지 확인합니다.
+# - 프롬프트 계산(prefill) logits가 model(input_ids)와 같은지
+# - 길이가 다른 프롬프트를 한 번에 생성(왼쪽 패딩)한 결과가 하나씩 생성한 결과와 같은지 (greedy)
+#
+# 실행 예:
+#   python bench_gpt2_generation.py --prompts 8 --new-tokens 128
+#   python bench_gpt2_generation.py --pretrained gpt2 --prompts 4 --new-tokens 64
+# ---------------------------------------------------------
+
+import argparse
+import time
+
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+
+from gpt2_generation import GPT2Engine
+
+
+def naive_generate(model, prompt, new_tokens: int):
+    """110_autoregressive_language_generation.ipynb의 루프와 같은 방식"""
+    input_ids_concat = torch.tensor([prompt])
+    for _ in range(new_tokens):
+        logits = model(input_ids_concat).logits
+        predicted_token = torch.argmax(logits[0, -1]).item()
+        input_ids_concat = torch.cat([input_ids_concat, torch.tensor([[predicted_token]])], dim=1)
+    return input_ids_concat[0, len(prompt):].tolist()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GPT-2 생성: 단순 루프 vs KV 캐시 배치 엔진")
+    parser.add_argument("--pretrained", help="예: gpt2, gpt2-medium (지정하지 않으면 작은 무작위 모델)")
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--heads", type=int, default=8)
+    parser.add_argument("--embd", type=int, default=512)
+    parser.add_argument("--vocab", type=int, default=50257)
+    parser.add_argument("--prompts", type=int, default=8)
+    parser.add_argument("--prompt-len", type=int, default=32, help="가장 긴 프롬프트 길이 (짧은 것은 절반)")
+    parser.add_argument("--new-tokens", type=int, default=128)
+    parser.add_argument("--threads", type=int, help="torch CPU 스레드 수")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    if args.pretrained:
+        model = GPT2LMHeadModel.from_pretrained(args.pretrained)
+    else:
+        config = GPT2Config(n_layer=args.layers, n_head=args.heads, n_embd=args.embd,
+                            vocab_size=args.vocab, n_positions=1024)
+        model = GPT2LMHeadModel(config)
+    model.eval()
+    vocab = model.config.vocab_size
+    lengths = torch.linspace(args.prompt_len // 2, args.prompt_len, args.prompts).long().tolist()
+    prompts = [torch.randint(0, vocab, (n,)).tolist() for n in lengths]
+    engine = GPT2Engine(model)
+    greedy = dict(max_new_tokens=args.new_tokens, stop_at_eos=False)
+
+    # 결과 확인
+    with torch.inference_mode():
+        ids = torch.tensor([prompts[0]])
+        expected = model(ids).logits[0, -1]
+        kv = engine._kv_buffers(1, ids.shape[1])
+        causal = torch.ones((ids.shape[1], ids.shape[1]), dtype=torch.bool).tril_()
+        actual = engine._forward(kv, ids, torch.arange(ids.shape[1])[None], 0, causal)[0]
+    print(f"prefill logits 최대 차이: {(expected - actual).abs().max().item():.2e}")
+
+    single = [engine.generate([p], **greedy)[0] for p in prompts]
+    batched = engine.generate(prompts, **greedy)
+    same = sum(a == b for a, b in zip(single, batched))
+    print(f"배치(왼쪽 패딩) 결과 = 하나씩 생성한 결과: {same}/{len(prompts)}개 프롬프트")
+
+    total_tokens = len(prompts) * args.new_tokens
+    rows = []
+    with torch.inference_mode():
+        naive, seconds = timed(lambda: [naive_generate(model, p, args.new_tokens) for p in prompts])
+    rows.append(("단순 루프 (노트북, 하나씩)", seconds))
+    same_as_naive = sum(a == b for a, b in zip(naive, single))
+
+    _, seconds = timed(lambda: [engine.generate([p], **greedy) for p in prompts])
+    rows.append(("KV 캐시 (하나씩)", seconds))
+    _, seconds = timed(lambda: engine.generate(prompts, **greedy))
+    rows.append((f"KV 캐시 + 배치 {len(prompts)}개", seconds))
+    _, seconds = timed(lambda: engine.generate(prompts, temperature=0.8, top_k=50, top_p=0.9, seed=0, **greedy))
+    rows.append((f"KV 캐시 + 배치 {len(prompts)}개 + 샘플링", seconds))
+
+    print(f"\n프롬프트 {len(prompts)}개 (길이 {lengths[0]}~{lengths[-1]}), 프롬프트당 {args.new_tokens}토큰 생성, "
+          f"torch 스레드 {torch.get_num_threads()}개")
+    print(f"단순 루프와 greedy 결과가 같은 프롬프트: {same_as_naive}/{len(prompts)}개")
+    base = rows[0][1]
+    for name, seconds in rows:
+        print(f"  {name:<28} {seconds:7.2f}s  {total_tokens / seconds:8.1f} tokens/s  (x{base / seconds:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# ---------------------------------------------------------
+# 실습용 template_*.ipynb 증분 / 병렬 생성 (Template_Creation.ipynb 대체)
+# ---------------------------------------------------------
+# Template_Creation.ipynb는 실행할 때마다 폴더의 모든 노트북을 순서대로 읽고 다시 씁니다.
+# 여기서는 같은 규칙(markdown 셀은 그대로, code 셀은 주석 / def / class 줄만 남김)으로
+# - 원본 노트북의 내용 해시를 manifest(.template_manifest.json)에 기록해 두고
+#   원본이 바뀌었거나 template 파일이 없는 노트북만 다시 생성
+#   (수정 시각 + 크기가 같으면 파일을 읽지도 않으므로, 바뀐 것이 없으면 수 ms 안에 끝남)
+# - 다시 생성할 노트북은 프로세스 풀에서 병렬로 처리
+# - 루트와 OpenAI_API 폴더를 한 번에 처리, .ipynb_checkpoints는 건너뜀
+#
+# 실행 예 (저장소 루트에서):
+#   python build_templates.py                 # 바뀐 노트북만
+#   python build_templates.py --dry-run       # 다시 생성할 노트북 목록만 출력
+#   python build_templates.py --force --jobs 8
+# ---------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOTS = (BASE_DIR, os.path.join(BASE_DIR, "OpenAI_API"))
+MANIFEST_NAME = ".template_manifest.json"
+RULES_VERSION = 1       # 변환 규칙을 바꾸면 올려서 전체를 다시 생성
+
+EXCLUDED = {"Merging_Notebooks.ipynb", "empty_page.ipynb", "Untitled.ipynb",
+            "Template_Creation.ipynb", "Template_PY_Creation.ipynb"}
+EXCLUDED_PREFIXES = ("combine", "template_", "문제풀이")
+SKIP_DIRS = {".ipynb_checkpoints", ".git", "__pycache__"}
+
+
+def is_source_notebook(name: str) -> bool:
+    return name.endswith(".ipynb") and name not in EXCLUDED and not name.startswith(EXCLUDED_PREFIXES)
+
+
+def find_notebooks(roots: Sequence[str], recursive: bool = False) -> List[str]:
+    """원본 노트북 경로 (roots 바로 아래, recursive면 하위 폴더까지)"""
+    found = []
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS) if recursive else []
+            found.extend(os.path.join(dirpath, f) for f in sorted(filenames) if is_source_notebook(f))
+    return sorted(set(found))
+
+
+def template_path(src: str) -> str:
+    folder, name = os.path.split(src)
+    return os.path.join(folder, "template_" + name)
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# -----------------------------------------------------
+# 변환 (작업 프로세스에서 실행)
+# -----------------------------------------------------
+def make_template(src: str) -> Tuple[str, dict]:
+    """src -> template_src, 반환: (src, manifest 항목)"""
+    import nbformat as nbf      # 바뀐 것이 없을 때는 import 비용도 들지 않도록
+
+    # 읽기 전에 stat: 생성 중에 원본이 바뀌면 다음 실행에서 다시 생성되도록
+    st = os.stat(src)
+    with open(src, "rb") as f:
+        raw = f.read()
+    ntbk = nbf.reads(raw.decode("utf-8"), nbf.NO_CONVERT)
+    new_ntbk = nbf.v4.new_notebook()
+    new_ntbk["metadata"] = ntbk["metadata"]
+
+    new_cells = []
+    for cell in ntbk.cells:
+        if cell.cell_type == "markdown":
+            new_cells.append(cell)
+        elif cell.cell_type == "code":
+            # code 셀의 주석과 함수 정의(def), 클래스 정의(class)만 남기고 실제 코드는 제거
+            new_source = []
+            for line in cell.source.split("\n"):
+                stripped_line = line.strip()
+                if stripped_line.startswith("#") or stripped_line.startswith("def ") or stripped_line.startswith("class "):
+                    new_source.append(line)
+            new_cells.append(nbf.v4.new_code_cell("\n".join(new_source)))
+    new_ntbk.cells = new_cells
+
+    dst = template_path(src)
+    tmp = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.{os.getpid()}.tmp")
+    nbf.write(new_ntbk, tmp, version=nbf.NO_CONVERT)
+    os.replace(tmp, dst)        # 다 쓴 파일만 보이도록
+    return src, {"sha256": hashlib.sha256(raw).hexdigest(), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+# -----------------------------------------------------
+# manifest
+# -----------------------------------------------------
+def load_manifest(path: str) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return data.get("entries", {}) if data.get("rules_version") == RULES_VERSION else {}
+
+
+def save_manifest(path: str, entries: Dict[str, dict]):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"rules_version": RULES_VERSION, "entries": entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def stale_notebooks(sources: Sequence[str], entries: Dict[str, dict], base: str,
+                    force: bool = False) -> Tuple[List[str], bool]:
+    """
+    다시 생성할 노트북 목록, manifest를 고쳐 써야 하는지
+    수정 시각 / 크기가 기록과 같으면 내용을 읽지 않고, 다르면 해시를 비교
+    """
+    stale, touched = [], False
+    for src in sources:
+        key = os.path.relpath(src, base)
+        st = os.stat(src)
+        entry = entries.get(key)
+        if force or entry is None or not os.path.exists(template_path(src)):
+            stale.append(src)
+        elif (entry["mtime_ns"], entry["size"]) != (st.st_mtime_ns, st.st_size):
+            if file_sha256(src) != entry["sha256"]:
+                stale.append(src)
+            else:       # 내용은 같고 수정 시각만 바뀜 (git checkout 등)
+                entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+                touched = True
+    return stale, touched
+
+
+def build(roots: Sequence[str] = DEFAULT_ROOTS, manifest_path: Optional[str] = None,
+          jobs: Optional[int] = None, force: bool = False, recursive: bool = False,
+          dry_run: bool = False) -> dict:
+    """반환: {"sources": 원본 수, "stale": 다시 생성할 목록, "built", "failed", "seconds"}"""
+    started = time.perf_counter()
+    manifest_path = manifest_path or os.path.join(BASE_DIR, MANIFEST_NAME)
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    entries = load_manifest(manifest_path)
+    sources = find_notebooks(roots, recursive)
+    stale, touched = stale_notebooks(sources, entries, base, force)
+
+    # 더 이상 없는 원본은 manifest에서 제거 (template 파일은 그대로 둠)
+    removed = [key for key in entries if not os.path.exists(os.path.join(base, key))]
+
+    result = {"sources": len(sources), "stale": [os.path.relpath(s, base) for s in stale],
+              "built": [], "failed": {}}
+    if dry_run:
+        result["seconds"] = time.perf_counter() - started
+        return result
+
+    def record(src: str, entry: dict):
+        entries[os.path.relpath(src, base)] = entry
+        result["built"].append(os.path.relpath(src, base))
+
+    jobs = min(jobs or os.cpu_count() or 1, len(stale))
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = {executor.submit(make_template, src): src for src in stale}
+            for future in as_completed(futures):
+                try:
+                    record(*future.result())
+                except Exception as e:
+                    result["failed"][os.path.relpath(futures[future], base)] = repr(e)
+    else:
+        for src in stale:
+            try:
+                record(*make_template(src))
+            except Exception as e:
+                result["failed"][os.path.relpath(src, base)] = repr(e)
+
+    for key in removed:
+        del entries[key]
+    if result["built"] or touched or removed:
+        save_manifest(manifest_path, entries)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="template_*.ipynb 증분 / 병렬 생성")
+    parser.add_argument("roots", nargs="*", default=list(DEFAULT_ROOTS), help="노트북 폴더 (기본: 루트, OpenAI_API)")
+    parser.add_argument("--jobs", type=int, help="작업 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--force", action="store_true", help="바뀌지 않은 노트북도 모두 다시 생성")
+    parser.add_argument("--recursive", action="store_true", help="하위 폴더까지 (.ipynb_checkpoints 제외)")
+    parser.add_argument("--dry-run", action="store_true", help="다시 생성할 노트북 목록만 출력")
+    parser.add_argument("--manifest", help=f"manifest 파일 (기본: 저장소 루트의 {MANIFEST_NAME})")
+    args = parser.parse_args()
+
+    result = build(args.roots, args.manifest, args.jobs, args.force, args.recursive, args.dry_run)
+    if args.dry_run:
+        print(f"원본 {result['sources']}개 중 다시 생성할 노트북 {len(result['stale'])}개")
+        for path in result["stale"]:
+            print(f"  {path}")
+        return
+    print(f"원본 {result['sources']}개 중 {len(result['built'])}개 다시 생성, "
+          f"실패 {len(result['failed'])}개, {result['seconds'] * 1000:.1f}ms")
+    for path in sorted(result["built"]):
+        print(f"  {path} -> template_{os.path.basename(path)}")
+    for path, error in result["failed"].items():
+        print(f"  실패 {path}: {error}", file=sys.stderr)
+    if result["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# ---------------------------------------------------------
+# CLIP 이미지 색인 / 검색 파이프라인 (260_Interacting_CLIP.ipynb용, CPU 가능)
+# ---------------------------------------------------------
+# 노트북은 model.cuda()를 전제로 하고, 이미지를 파이썬 루프에서 하나씩 전처리하며,
+# 실행할 때마다 encode_image / encode_text를 다시 계산합니다. ClipPipeline은
+# - CPU에서도 실행 (torch 스레드 수 지정 가능, GPU가 있으면 device="cuda")
+# - 이미지 읽기 + 전처리를 여러 프로세스에서 병렬로 (프로세스마다 torch 스레드 1개)
+# - batch_size 단위로 묶어서 encode_image
+# - 정규화한 feature를 SQLite 파일 하나에 캐시
+#   이미지 키 = 파일 내용의 sha256 (이름이 바뀌어도 재사용), 텍스트 키 = 프롬프트 문자열
+# - 제로샷 분류 / 텍스트 -> 이미지 검색은 (이미지 수 x 차원) 행렬과의 행렬곱 한 번
+# - 전처리 / 인코딩 처리량(images/s)을 stats에 기록
+#
+# 사용 예:
+#   pipeline = ClipPipeline("ViT-B/32", threads=4, workers=4)
+#   paths, features = pipeline.index_folder("photos/")
+#   labels, probs = pipeline.zero_shot(features, ["cat", "dog", "car"])
+#   pipeline.search("a red motorcycle", paths, features, k=5)
+#
+# 명령행:
+#   python clip_pipeline.py photos/ --classes cat dog car --query "a red motorcycle" --threads 4
+# ---------------------------------------------------------
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import clip
+import numpy as np
+import torch
+from PIL import Image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    key     TEXT PRIMARY KEY,       -- sha256(모델 이름, 종류, 파일 해시 또는 프롬프트)
+    vector  BLOB NOT NULL           -- 정규화한 float32 feature
+);
+"""
+
+# -----------------------------------------------------
+# 작업 프로세스 (이미지 해시 / 전처리)
+# -----------------------------------------------------
+_worker_preprocess = None
+
+
+def _init_worker(preprocess, limit_threads: bool = True):
+    global _worker_preprocess
+    _worker_preprocess = preprocess
+    if limit_threads:
+        torch.set_num_threads(1)    # 프로세스 여러 개가 CPU를 나눠 쓰도록
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _preprocess_file(path: str) -> Optional[np.ndarray]:
+    """(3, 해상도, 해상도) float32, 읽을 수 없는 이미지는 None"""
+    try:
+        with Image.open(path) as image:
+            return _worker_preprocess(image.convert("RGB")).numpy()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # DecompressionBombError: 픽셀 수가 PIL 한도의 2배를 넘는 이미지 (OSError가 아님)
+        return None
+
+
+def list_images(folder: str, extensions: Sequence[str] = IMAGE_EXTENSIONS) -> List[str]:
+    """폴더 아래 이미지 파일 (하위 폴더 포함, 경로순)"""
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        paths.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith(tuple(extensions)))
+    return paths
+
+
+class ClipPipeline:
+    """CLIP feature 색인 + 캐시 + 제로샷 분류 / 검색"""
+
+    def __init__(self, model_name: str = "ViT-B/32", device: str = "cpu", threads: Optional[int] = None,
+                 workers: Optional[int] = None, batch_size: int = 32,
+                 cache_path: Optional[str] = "clip_features.db"):
+        """
+        threads: 인코딩에 쓸 torch 스레드 수 (기본: torch 기본값)
+        workers: 전처리 프로세스 수 (기본: CPU 수, 0이면 현재 프로세스에서 처리)
+        cache_path: feature 캐시 파일 (None이면 캐시 사용 안 함)
+        """
+        if threads:
+            torch.set_num_threads(threads)
+        self.model_name = model_name
+        self.device = device
+        self.model, self.preprocess = clip.load(model_name, device=device, jit=False)
+        self.model.eval()
+        self.workers = os.cpu_count() if workers is None else workers
+        self.batch_size = batch_size
+        self.conn = None
+        if cache_path:
+            self.conn = sqlite3.connect(cache_path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SCHEMA)
+        self.stats = {}
+
+    # -----------------------------------------------------
+    # 캐시
+    # -----------------------------------------------------
+    def _key(self, kind: str, value: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{kind}\0{value}".encode("utf-8")).hexdigest()
+
+    def _cache_get(self, keys: List[str]) -> dict:
+        found = {}
+        if self.conn is None:
+            return found
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM features WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+        return found
+
+    def _cache_put(self, keys: List[str], vectors: np.ndarray):
+        if self.conn is None:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO features VALUES (?, ?)",
+                                  [(key, vector.tobytes()) for key, vector in zip(keys, vectors)])
+
+    # -----------------------------------------------------
+    # 인코딩
+    # -----------------------------------------------------
+    @torch.inference_mode()
+    def _encode_images(self, batch: List[np.ndarray]) -> np.ndarray:
+        features = self.model.encode_image(torch.from_numpy(np.stack(batch)).to(self.device)).float()
+        return (features / features.norm(dim=-1, keepdim=True)).cpu().numpy()
+
+    @torch.inference_mode()
+    def encode_texts(self, prompts: Sequence[str]) -> np.ndarray:
+        """정규화한 텍스트 feature (프롬프트 수 x 차원), 캐시에 없는 것만 계산"""
+        prompts = list(prompts)
+        keys = [self._key("text", p) for p in prompts]
+        found = self._cache_get(keys)
+        missing = list(dict.fromkeys(p for p, key in zip(prompts, keys) if key not in found))
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            features = self.model.encode_text(clip.tokenize(chunk, truncate=True).to(self.device)).float()
+            vectors = (features / features.norm(dim=-1, keepdim=True)).cpu().numpy()
+            chunk_keys = [self._key("text", p) for p in chunk]
+            self._cache_put(chunk_keys, vectors)
+            found.update(zip(chunk_keys, vectors))
+        return np.stack([found[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
+
+    def encode_images(self, paths: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        정규화한 이미지 feature (읽은 이미지 수 x 차원)
+        반환: (읽은 이미지 경로들, feature 행렬) - 읽을 수 없는 이미지는 빠짐
+        """
+        paths = list(paths)
+        stats = self.stats = {"images": len(paths), "cached": 0, "encoded": 0, "failed": 0}
+        executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                       initargs=(self.preprocess,)) if self.workers else None
+        chunksize = max(1, min(32, len(paths) // (4 * max(1, self.workers or 1))))
+        try:
+            started = time.perf_counter()
+            hashes = list(executor.map(file_hash, paths, chunksize=chunksize) if executor
+                          else map(file_hash, paths))
+            keys = [self._key("image", h) for h in hashes]
+            found = self._cache_get(keys)
+            stats["hash_seconds"] = time.perf_counter() - started
+
+            missing = [i for i, key in enumerate(keys) if key not in found]
+            stats["cached"] = len(paths) - len(missing)
+            if executor:
+                images = executor.map(_preprocess_file, [paths[i] for i in missing], chunksize=chunksize)
+            else:
+                _init_worker(self.preprocess, limit_threads=False)
+                images = map(_preprocess_file, (paths[i] for i in missing))
+
+            started = time.perf_counter()
+            encode_seconds = 0.0
+            batch, batch_keys = [], []
+
+            def flush():
+                nonlocal encode_seconds
+                encode_started = time.perf_counter()
+                vectors = self._encode_images(batch)
+                encode_seconds += time.perf_counter() - encode_started
+                self._cache_put(batch_keys, vectors)
+                found.update(zip(batch_keys, vectors))
+                stats["encoded"] += len(batch)
+                batch.clear()
+                batch_keys.clear()
+
+            for i, image in zip(missing, images):
+                if image is None:
+                    stats["failed"] += 1
+                    continue
+                batch.append(image)
+                batch_keys.append(keys[i])
+                if len(batch) == self.batch_size:
+                    flush()
+            if batch:
+                flush()
+            elapsed = time.perf_counter() - started
+        finally:
+            if executor:
+                executor.shutdown()
+
+        stats["seconds"] = stats["hash_seconds"] + elapsed
+        stats["encode_seconds"] = encode_seconds
+        stats["images_per_second"] = stats["encoded"] / elapsed if stats["encoded"] else 0.0
+        ok = [i for i, key in enumerate(keys) if key in found]
+        features = np.stack([found[keys[i]] for i in ok]) if ok else np.zeros((0, 0), dtype=np.float32)
+        return [paths[i] for i in ok], features
+
+    def index_folder(self, folder: str, extensions: Sequence[str] = IMAGE_EXTENSIONS) -> Tuple[List[str], np.ndarray]:
+        return self.encode_images(list_images(folder, extensions))
+
+    # -----------------------------------------------------
+    # 분류 / 검색
+    # -----------------------------------------------------
+    def zero_shot(self, image_features: np.ndarray, classes: Sequence[str],
+                  template: str = "a photo of a {}.") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        반환: (이미지별 예측 클래스 번호, 이미지 x 클래스 확률)
+        """
+        text_features = self.encode_texts([template.format(c) for c in classes])
+        logits = float(self.model.logit_scale.exp()) * (image_features @ text_features.T)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs.argmax(axis=1), probs
+
+    def search(self, query: str, paths: Sequence[str], image_features: np.ndarray,
+               k: int = 5) -> List[Tuple[str, float]]:
+        """텍스트와 가장 비슷한 이미지 k개 (경로, 코사인 유사도)"""
+        scores = image_features @ self.encode_texts([query])[0]
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(paths[i], float(scores[i])) for i in top]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLIP 이미지 폴더 색인 + 제로샷 분류 / 검색")
+    parser.add_argument("folder")
+    parser.add_argument("--model", default="ViT-B/32")
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--threads", type=int, help="인코딩 torch 스레드 수")
+    parser.add_argument("--workers", type=int, help="전처리 프로세스 수 (0: 현재 프로세스)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--cache", default="clip_features.db", help="feature 캐시 파일 ('' 이면 사용 안 함)")
+    parser.add_argument("--classes", nargs="*", default=[], help="제로샷 분류 클래스")
+    parser.add_argument("--query", action="append", default=[], help="텍스트 -> 이미지 검색 (여러 번 가능)")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    pipeline = ClipPipeline(args.model, device=args.device, threads=args.threads, workers=args.workers,
+                            batch_size=args.batch_size, cache_path=args.cache or None)
+    paths, features = pipeline.index_folder(args.folder)
+    s = pipeline.stats
+    print(f"이미지 {s['images']}개: 캐시 {s['cached']}개, 새로 계산 {s['encoded']}개, 실패 {s['failed']}개, "
+          f"{s['seconds']:.2f}초 (파일 해시 {s['hash_seconds']:.2f}초)")
+    if s["encoded"]:
+        print(f"  전처리 + 인코딩 {s['images_per_second']:.1f} images/s "
+              f"(인코딩만 {s['encoded'] / s['encode_seconds']:.1f} images/s, "
+              f"batch {args.batch_size}, torch 스레드 {torch.get_num_threads()}개, 전처리 프로세스 {pipeline.workers}개)")
+
+    if args.classes and len(paths):
+        predictions, probs = pipeline.zero_shot(features, args.classes)
+        for path, label, p in zip(paths, predictions, probs):
+            print(f"  {os.path.relpath(path, args.folder)}: {args.classes[label]} ({p[label]:.0%})")
+    for query in args.query:
+        print(f"검색: {query}")
+        for path, score in pipeline.search(query, paths, features, args.k):
+            print(f"  {score:.3f}  {os.path.relpath(path, args.folder)}")
+    pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# ---------------------------------------------------------
+# GPT-2 문장 생성 엔진 (110_autoregressive_language_generation.ipynb용, CPU)
+# ---------------------------------------------------------
+# 노트북의 생성 루프는 매 단계 model(input_ids_concat)로 지금까지의 문장 전체를 다시 계산하고
+# torch.cat으로 입력을 늘려서, 길이에 대해 제곱으로 느려집니다. 이 엔진은
+# - 프롬프트는 한 번만 계산(prefill)하고, 이후에는 새 토큰 하나만 계산 (KV 캐시)
+# - KV 캐시 / attention mask 버퍼를 미리 할당 (torch.cat 없음, KV 버퍼는 다음 호출에서 재사용)
+# - 여러 프롬프트를 한 번에: 왼쪽 패딩 + attention mask + 위치(position) 보정
+# - temperature / top-k / top-p 샘플링을 배치 전체에 한 번에 (temperature=0이면 argmax)
+# - stream(): 단계마다 새 토큰을 바로 돌려주는 generator
+# - stream_text(): 토큰 오프셋 기준으로 최근 몇 토큰만 decode해서, 글자가 완성된 부분만 내보냄
+#   (한 글자가 여러 토큰에 걸친 경우 중간에 깨진 글자(U+FFFD)를 내보내지 않음)
+#
+# GPT2LMHeadModel의 모듈(wte, wpe, h[i].ln_1/attn/ln_2/mlp, ln_f, lm_head)을 그대로 사용하고,
+# attention만 미리 할당한 KV 버퍼로 직접 계산합니다.
+#
+# 사용 예:
+#   engine = GPT2Engine(model, tokenizer)
+#   for tokens in engine.stream_text(["Once upon a time", "The weather"], max_new_tokens=30):
+#       print(tokens)                     # 프롬프트별 새 조각 (끝난 프롬프트는 "")
+#   engine.generate_text(["Once upon a time"], max_new_tokens=50, temperature=0.8, top_p=0.9)
+#
+# 벤치마크: python bench_gpt2_generation.py
+# ---------------------------------------------------------
+
+import math
+from typing import Iterator, List, Optional, Sequence
+
+import torch
+import torch.nn.functional as F
+
+
+def sample_next(logits: torch.Tensor, temperature: float = 0.0, top_k: int = 0, top_p: float = 1.0,
+                generator: Optional[torch.Generator] = None) -> torch.Tensor:
+    """
+    logits (배치, 어휘 수) -> 다음 토큰 (배치,)
+    temperature=0이면 argmax, top_k=0 / top_p=1.0이면 해당 필터 사용 안 함
+    """
+    if temperature <= 0:
+        return logits.argmax(dim=-1)
+    logits = logits.float() / temperature
+    if 0 < top_k < logits.shape[-1]:
+        kth = torch.topk(logits, top_k, dim=-1).values[:, -1:]
+        logits = logits.masked_fill(logits < kth, float("-inf"))
+    if top_p < 1.0:
+        sorted_logits, sorted_index = torch.sort(logits, dim=-1, descending=True)
+        probs = sorted_logits.softmax(dim=-1)
+        # 앞 토큰들의 누적 확률이 이미 top_p 이상이면 제거 (가장 높은 토큰은 항상 남음)
+        remove = probs.cumsum(dim=-1) - probs >= top_p
+        remove = torch.zeros_like(remove).scatter(1, sorted_index, remove)
+        logits = logits.masked_fill(remove, float("-inf"))
+    return torch.multinomial(logits.softmax(dim=-1), 1, generator=generator).squeeze(1)
+
+
+def decode_step(tokenizer, tokens: List[int], prefix_offset: int, read_offset: int):
+    """
+    증분 decode: tokens[prefix_offset:read_offset]은 이미 내보낸 부분(앞 문맥)
+    반환: (새 문자열 조각, 새 prefix_offset, 새 read_offset)
+    앞 문맥과 함께 decode해야 공백 / 여러 토큰에 걸친 글자가 올바르게 이어지고,
+    결과가 U+FFFD로 끝나면 글자가 아직 완성되지 않은 것이므로 다음 토큰까지 기다림
+    """
+    prefix_text = tokenizer.decode(tokens[prefix_offset:read_offset], skip_special_tokens=True)
+    new_text = tokenizer.decode(tokens[prefix_offset:], skip_special_tokens=True)
+    if len(new_text) > len(prefix_text) and not new_text.endswith("\ufffd"):
+        return new_text[len(prefix_text):], read_offset, len(tokens)
+    return "", prefix_offset, read_offset
+
+
+class GPT2Engine:
+    """
+    KV 캐시 + 배치 생성 (GPT2LMHeadModel)
+    KV 버퍼를 호출 사이에 재사용하므로 엔진 하나에서 stream()을 동시에 두 개 돌리지 않습니다.
+    """
+
+    def __init__(self, model, tokenizer=None, pad_token_id: Optional[int] = None,
+                 eos_token_id: Optional[int] = None):
+        config = model.config
+        if getattr(config, "add_cross_attention", False):
+            raise ValueError("cross attention이 있는 GPT-2 설정은 지원하지 않습니다.")
+        self.model = model.eval()
+        self.tokenizer = tokenizer
+        self.config = config
+        self.eos_token_id = eos_token_id if eos_token_id is not None else config.eos_token_id
+        self.pad_token_id = pad_token_id if pad_token_id is not None else (self.eos_token_id or 0)
+        self.n_layer = config.n_layer
+        self.n_head = config.n_head
+        self.embed_dim = config.n_embd
+        self.head_dim = config.n_embd // config.n_head
+        self._kv = None     # (2, 층 수, 배치, 헤드 수, 길이, 헤드 차원) - 필요할 때 키워서 재사용
+
+    # -----------------------------------------------------
+    # 버퍼
+    # -----------------------------------------------------
+    def _kv_buffers(self, batch: int, length: int) -> torch.Tensor:
+        param = next(self.model.parameters())
+        if self._kv is None or self._kv.shape[2] < batch or self._kv.shape[4] < length:
+            if self._kv is not None:
+                batch, length = max(batch, self._kv.shape[2]), max(length, self._kv.shape[4])
+            shape = (2, self.n_layer, batch, self.n_head, length, self.head_dim)
+            self._kv = torch.empty(shape, dtype=param.dtype, device=param.device)
+        return self._kv[:, :, :batch, :, :length]
+
+    def _attn_scale(self, layer: int) -> float:
+        scale = 1.0 / math.sqrt(self.head_dim) if getattr(self.config, "scale_attn_weights", True) else 1.0
+        if getattr(self.config, "scale_attn_by_inverse_layer_idx", False):
+            scale /= layer + 1
+        return scale
+
+    # -----------------------------------------------------
+    # 순전파: input_ids를 kv의 [start, start + T) 위치에 넣고 마지막 위치의 logits 반환
+    # -----------------------------------------------------
+    def _forward(self, kv: torch.Tensor, input_ids: torch.Tensor, position_ids: torch.Tensor,
+                 start: int, attn_mask: torch.Tensor) -> torch.Tensor:
+        transformer = self.model.transformer
+        batch, steps = input_ids.shape
+        end = start + steps
+        x = transformer.wte(input_ids) + transformer.wpe(position_ids)
+        for layer, block in enumerate(transformer.h):
+            q, k, v = block.attn.c_attn(block.ln_1(x)).split(self.embed_dim, dim=2)
+            q, k, v = (t.view(batch, steps, self.n_head, self.head_dim).transpose(1, 2) for t in (q, k, v))
+            kv[0, layer, :, :, start:end] = k
+            kv[1, layer, :, :, start:end] = v
+            out = F.scaled_dot_product_attention(q, kv[0, layer, :, :, :end], kv[1, layer, :, :, :end],
+                                                 attn_mask=attn_mask, scale=self._attn_scale(layer))
+            x = x + block.attn.c_proj(out.transpose(1, 2).reshape(batch, steps, self.embed_dim))
+            x = x + block.mlp(block.ln_2(x))
+        return self.model.lm_head(transformer.ln_f(x[:, -1]))
+
+    # -----------------------------------------------------
+    # 생성
+    # -----------------------------------------------------
+    @torch.inference_mode()
+    def stream(self, prompts: Sequence[Sequence[int]], max_new_tokens: int = 50,
+               temperature: float = 0.0, top_k: int = 0, top_p: float = 1.0,
+               seed: Optional[int] = None, stop_at_eos: bool = True) -> Iterator[List[Optional[int]]]:
+        """
+        prompts: 토큰 ID 리스트들 (길이가 달라도 됨)
+        단계마다 프롬프트별 새 토큰 ID 리스트를 yield (이미 끝난 프롬프트는 None)
+        """
+        if not prompts or any(len(p) == 0 for p in prompts):
+            raise ValueError("빈 프롬프트는 생성할 수 없습니다.")
+        batch, prompt_len = len(prompts), max(len(p) for p in prompts)
+        total = prompt_len + max_new_tokens
+        if total > self.config.n_positions:
+            raise ValueError(f"프롬프트 + 생성 길이({total})가 최대 위치 수({self.config.n_positions})를 넘습니다.")
+        device = next(self.model.parameters()).device
+        generator = torch.Generator(device=device).manual_seed(seed) if seed is not None else None
+
+        # 왼쪽 패딩: 모든 프롬프트의 마지막 토큰이 같은 열(prompt_len - 1)에 오도록
+        input_ids = torch.full((batch, prompt_len), self.pad_token_id, dtype=torch.long, device=device)
+        mask = torch.zeros((batch, total), dtype=torch.bool, device=device)
+        for i, prompt in enumerate(prompts):
+            input_ids[i, prompt_len - len(prompt):] = torch.as_tensor(prompt, dtype=torch.long)
+            mask[i, prompt_len - len(prompt):prompt_len] = True
+        position_ids = (mask[:, :prompt_len].long().cumsum(-1) - 1).clamp_(min=0)
+        kv = self._kv_buffers(batch, total)
+
+        # prefill: 인과(causal) mask + 패딩 mask (패딩 위치도 자기 자신은 보도록 해서 NaN 방지)
+        causal = torch.ones((prompt_len, prompt_len), dtype=torch.bool, device=device).tril_()
+        prefill_mask = (causal & mask[:, None, None, :prompt_len]) | torch.eye(prompt_len, dtype=torch.bool,
+                                                                             device=device)
+        logits = self._forward(kv, input_ids, position_ids, 0, prefill_mask)
+
+        next_position = position_ids[:, -1:] + 1
+        finished = torch.zeros(batch, dtype=torch.bool, device=device)
+        for step in range(max_new_tokens):
+            tokens = sample_next(logits, temperature, top_k, top_p, generator)
+            tokens = tokens.masked_fill(finished, self.pad_token_id)
+            emitted = [None if done else token for token, done in zip(tokens.tolist(), finished.tolist())]
+            if stop_at_eos and self.eos_token_id is not None:
+                finished |= tokens == self.eos_token_id
+            yield emitted
+            if step == max_new_tokens - 1 or bool(finished.all()):
+                break
+            t = prompt_len + step
+            mask[:, t] = True
+            logits = self._forward(kv, tokens[:, None], next_position, t, mask[:, None, None, :t + 1])
+            next_position += 1
+
+    def generate(self, prompts: Sequence[Sequence[int]], **kwargs) -> List[List[int]]:
+        """프롬프트별 새로 생성한 토큰 ID 리스트"""
+        outputs = [[] for _ in prompts]
+        for tokens in self.stream(prompts, **kwargs):
+            for out, token in zip(outputs, tokens):
+                if token is not None:
+                    out.append(token)
+        return outputs
+
+    # -----------------------------------------------------
+    # 문자열 입출력 (tokenizer 필요)
+    # -----------------------------------------------------
+    def _encode(self, prompts: Sequence[str]) -> List[List[int]]:
+        if self.tokenizer is None:
+            raise ValueError("문자열 입력에는 tokenizer가 필요합니다.")
+        return [self.tokenizer.encode(p) for p in prompts]
+
+    def stream_text(self, prompts: Sequence[str], **kwargs) -> Iterator[List[str]]:
+        """
+        단계마다 프롬프트별 새 문자열 조각 (끝난 프롬프트, 아직 완성되지 않은 글자는 "")
+        조각을 모두 이어 붙이면 generate_text의 생성 부분과 같음
+        """
+        generated = [[] for _ in prompts]
+        offsets = [(0, 0)] * len(prompts)       # 프롬프트별 (prefix_offset, read_offset)
+        for tokens in self.stream(self._encode(prompts), **kwargs):
+            pieces = []
+            for i, token in enumerate(tokens):
+                piece = ""
+                if token is not None and token != self.eos_token_id:
+                    generated[i].append(token)
+                    piece, *offset = decode_step(self.tokenizer, generated[i], *offsets[i])
+                    offsets[i] = tuple(offset)
+                pieces.append(piece)
+            yield pieces
+        # 끝까지 완성되지 않은 글자가 남았으면 마지막에 한 번 내보냄
+        rest = []
+        for tokens, (prefix_offset, read_offset) in zip(generated, offsets):
+            prefix_text = self.tokenizer.decode(tokens[prefix_offset:read_offset], skip_special_tokens=True)
+            rest.append(self.tokenizer.decode(tokens[prefix_offset:], skip_special_tokens=True)[len(prefix_text):])
+        if any(rest):
+            yield rest
+
+    def generate_text(self, prompts: Sequence[str], **kwargs) -> List[str]:
+        """프롬프트 + 생성한 문장"""
+        outputs = self.generate(self._encode(prompts), **kwargs)
+        return [prompt + self.tokenizer.decode(out, skip_special_tokens=True)
+                for prompt, out in zip(prompts, outputs)]